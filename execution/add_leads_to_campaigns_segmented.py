@@ -16,6 +16,8 @@ import requests
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from lead_io import read_leads
+from lead_store import LeadStore
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -107,7 +109,7 @@ def upload_single_batch(batch_num, batch, campaign_id, api_key, total_batches):
         return {"uploaded": 0, "failed": len(formatted_leads)}
 
 
-def add_leads_to_campaign(leads, campaign_id, campaign_name, api_key, batch_size=100):
+def add_leads_to_campaign(leads, campaign_id, campaign_name, api_key, batch_size=100, store=None):
     """
     Add leads to a single Instantly campaign using the V2 API with parallel batch uploads.
 
@@ -117,6 +119,7 @@ def add_leads_to_campaign(leads, campaign_id, campaign_name, api_key, batch_size
         campaign_name (str): Campaign name for logging
         api_key (str): Instantly API key
         batch_size (int): Number of leads per batch (max 100)
+        store (LeadStore, optional): Lead store to record each batch's upload outcome in
 
     Returns:
         dict: Upload result
@@ -159,7 +162,7 @@ def add_leads_to_campaign(leads, campaign_id, campaign_name, api_key, batch_size
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all batch upload tasks
         future_to_batch = {
-            executor.submit(upload_single_batch, batch_num, batch, campaign_id, api_key, len(batches)): batch_num
+            executor.submit(upload_single_batch, batch_num, batch, campaign_id, api_key, len(batches)): batch
             for batch_num, batch in enumerate(batches, 1)
         }
 
@@ -168,6 +171,8 @@ def add_leads_to_campaign(leads, campaign_id, campaign_name, api_key, batch_size
             result = future.result()
             total_uploaded += result["uploaded"]
             total_failed += result["failed"]
+            if store:
+                store.record_uploads(campaign_id, future_to_batch[future], "uploaded" if not result["failed"] else "failed")
 
     print(f"   📊 Upload complete: {total_uploaded} successful, {total_failed} failed")
 
@@ -209,7 +214,7 @@ def extract_segment_from_campaign_name(campaign_name, segment_mapping):
     return None
 
 
-def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, output_file):
+def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, output_file, store_file=None, segment_leads=None):
     """
     Upload leads to campaigns with segment matching.
 
@@ -220,6 +225,10 @@ def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, o
         segments_file (str): Path to segment mapping JSON file
         leads_dir (str): Directory containing segment lead files
         output_file (str): Path to upload report output file
+        store_file (str, optional): SQLite lead store to read segment leads from (instead of
+            leads_dir files) and record uploads in
+        segment_leads (dict, optional): {segment_id: leads} already in memory (run_pipeline.py),
+            used instead of the segment lead files
 
     Returns:
         dict: Upload results with statistics
@@ -275,6 +284,8 @@ def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, o
     print(f"🚀 Adding segment-specific leads to {len(successful_campaigns)} campaign(s)...")
     print(f"   Segments available: {len(segment_mapping.get('segments', []))}")
 
+    store = LeadStore(store_file) if store_file else None
+
     results = []
     total_uploaded = 0
     total_failed = 0
@@ -300,34 +311,40 @@ def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, o
             continue
 
         # Load segment leads
-        segment_file = os.path.join(leads_dir, f"segment_{segment_id}_leads.json")
-
-        if not os.path.exists(segment_file):
-            print(f"\n❌ Segment file not found: {segment_file}")
-            results.append({
-                "campaign_name": campaign_name,
-                "campaign_id": campaign_id,
-                "status": "error",
-                "reason": f"Segment file not found: {segment_file}"
-            })
-            total_failed += 1
-            continue
-
-        try:
-            with open(segment_file, 'r', encoding='utf-8') as f:
-                segment_leads = json.load(f)
-        except json.JSONDecodeError:
-            print(f"\n❌ Invalid JSON in segment file: {segment_file}")
-            results.append({
-                "campaign_name": campaign_name,
-                "campaign_id": campaign_id,
-                "status": "error",
-                "reason": f"Invalid JSON in segment file"
-            })
-            total_failed += 1
-            continue
-
-        if not segment_leads:
+        if segment_leads is not None:
+            segment_file = f"in-memory segment '{segment_id}'"
+            leads = segment_leads.get(segment_id) or []
+        elif store:
+            segment_file = f"{store_file} (job_title segment '{segment_id}')"
+            leads = list(store.iter_stage_leads("all", segment_kind="job_title", segment_id=segment_id))
+        else:
+            segment_file = os.path.join(leads_dir, f"segment_{segment_id}_leads.json")
+
+            if not os.path.exists(segment_file):
+                print(f"\n❌ Segment file not found: {segment_file}")
+                results.append({
+                    "campaign_name": campaign_name,
+                    "campaign_id": campaign_id,
+                    "status": "error",
+                    "reason": f"Segment file not found: {segment_file}"
+                })
+                total_failed += 1
+                continue
+
+            try:
+                leads = read_leads(segment_file)
+            except ValueError:
+                print(f"\n❌ Invalid JSON in segment file: {segment_file}")
+                results.append({
+                    "campaign_name": campaign_name,
+                    "campaign_id": campaign_id,
+                    "status": "error",
+                    "reason": f"Invalid JSON in segment file"
+                })
+                total_failed += 1
+                continue
+
+        if not leads:
             print(f"\n⚠️  No leads in segment file: {segment_file}")
             results.append({
                 "campaign_name": campaign_name,
@@ -340,10 +357,11 @@ def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, o
 
         # Upload leads to campaign
         result = add_leads_to_campaign(
-            leads=segment_leads,
+            leads=leads,
             campaign_id=campaign_id,
             campaign_name=campaign_name,
-            api_key=api_key
+            api_key=api_key,
+            store=store
         )
 
         results.append(result)
@@ -354,6 +372,9 @@ def add_leads_to_campaigns_segmented(campaigns_file, segments_file, leads_dir, o
         if len(successful_campaigns) > 1:
             time.sleep(2)
 
+    if store:
+        store.close()
+
     # Print summary
     print("\n" + "="*50)
     print(f"📊 Upload Summary:")
@@ -398,6 +419,7 @@ def main():
     parser.add_argument("--segments", required=True, help="Path to segment mapping JSON file")
     parser.add_argument("--leads-dir", default=".tmp", help="Directory containing segment lead files")
     parser.add_argument("--output", default=".tmp/upload_report.json", help="Output file path")
+    parser.add_argument("--store", help="Read segment leads from (and record uploads in) this SQLite lead store instead of --leads-dir files")
 
     args = parser.parse_args()
 
@@ -405,7 +427,8 @@ def main():
         campaigns_file=args.campaigns,
         segments_file=args.segments,
         leads_dir=args.leads_dir,
-        output_file=args.output
+        output_file=args.output,
+        store_file=args.store
     )
 
     # Print result
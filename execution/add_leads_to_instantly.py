@@ -12,6 +12,7 @@ import argparse
 import requests
 import time
 from dotenv import load_dotenv
+from lead_io import read_leads
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -179,14 +180,13 @@ def add_leads_to_campaigns(leads_file, campaigns_file, output_file="upload_repor
 
     # Load leads
     try:
-        with open(leads_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
+        leads = read_leads(leads_file)
     except FileNotFoundError:
         return {
             "status": "error",
             "message": f"Leads file not found: {leads_file}"
         }
-    except json.JSONDecodeError:
+    except ValueError:
         return {
             "status": "error",
             "message": f"Invalid JSON in leads file: {leads_file}"
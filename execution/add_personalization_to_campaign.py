@@ -15,6 +15,7 @@ import argparse
 import requests
 import time
 from dotenv import load_dotenv
+from lead_io import read_leads
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -24,13 +25,14 @@ if sys.platform == 'win32':
 load_dotenv()
 
 
-def add_personalized_leads_to_campaign(input_file, campaign_id):
+def add_personalized_leads_to_campaign(input_file, campaign_id, leads=None):
     """
     Add personalized leads to Instantly campaign.
 
     Args:
         input_file (str): Path to JSON file with personalized leads
         campaign_id (str): Instantly campaign ID
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of reading input_file
 
     Returns:
         dict: Results with upload statistics
@@ -45,19 +47,19 @@ def add_personalized_leads_to_campaign(input_file, campaign_id):
         }
 
     # Load personalized leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": f"Input file not found: {input_file}"
-        }
-    except json.JSONDecodeError:
-        return {
-            "status": "error",
-            "message": f"Invalid JSON in file: {input_file}"
-        }
+    if leads is None:
+        try:
+            leads = read_leads(input_file)
+        except FileNotFoundError:
+            return {
+                "status": "error",
+                "message": f"Input file not found: {input_file}"
+            }
+        except ValueError:
+            return {
+                "status": "error",
+                "message": f"Invalid JSON in file: {input_file}"
+            }
 
     if not leads:
         return {
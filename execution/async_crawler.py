@@ -0,0 +1,407 @@
+"""
+Asyncio website crawler for personalization enrichment.
+
+One event loop crawls hundreds of company websites at once. Each site is still
+crawled the way scrape_website() does it: the homepage, then the best pages its own
+links (or sitemap.xml) point to, guessing paths only if discovery finds nothing, and
+stopping once the homepage and one more page came back. Politeness is enforced per
+host rather than per worker thread: at most `per_host` requests are in flight to a
+host and consecutive requests to it are spaced `delay` seconds apart, however many
+leads share that website.
+
+The loop runs on its own thread, so synchronous code submits sites and gets
+concurrent.futures.Future objects back (and can keep feeding leads to other
+thread pools meanwhile).
+
+Usage (from enrich_personalization.py):
+    with AsyncCrawler(COMMON_PATHS, html_to_text, fallback=firecrawl_homepage,
+                      concurrency=200, delay=0.2) as crawler:
+        future = crawler.submit("acme-hvac.co.uk")
+        scraped = future.result()   # same shape as scrape_website()
+    print(crawler.stats())          # includes domains_per_second
+"""
+
+import time
+import asyncio
+import threading
+import aiohttp
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin, urlparse
+from link_discovery import extract_links, parse_sitemap, rank_links, SITEMAP_PATH, MAX_CANDIDATES
+from page_cache import cache_key, conditional_headers, page_result, TIMEOUT_ERROR
+
+# Recently submitted sites whose futures are reused for leads at the same website
+RECENT_SITES = 1000
+
+# Statuses that mean the site is refusing us; the crawl falls back or stops
+BLOCKED_STATUSES = ("blocked", "rate_limited")
+
+
+class HostThrottle:
+    """
+    Per-host politeness for the crawler's event loop.
+
+    Args:
+        delay (float): Minimum seconds between requests to the same host
+        per_host (int): Maximum concurrent requests to the same host
+    """
+
+    def __init__(self, delay=0.5, per_host=1):
+        self.delay = delay
+        self.per_host = per_host
+        self._semaphores = {}
+        self._locks = {}
+        self._next_at = {}
+
+    @asynccontextmanager
+    async def slot(self, host):
+        """Hold a request slot for host, waiting for its concurrency limit and spacing."""
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                now = asyncio.get_running_loop().time()
+                start_at = max(now, self._next_at.get(host, now))
+                self._next_at[host] = start_at + self.delay
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            try:
+                yield
+            finally:
+                # Space the next request from when this one finished, not just when it started
+                self._next_at[host] = max(self._next_at[host], asyncio.get_running_loop().time() + self.delay)
+
+
+class AsyncCrawler:
+    """
+    Crawls websites concurrently on a background event loop.
+
+    Args:
+        paths (list): Paths to try on each site, in priority order (the first is the homepage);
+            with discover_links, the ones after the homepage are only guessed when
+            discovery finds nothing
+        to_text (callable): Turns a page's HTML into clean text; run off the event loop
+        fallback (callable, optional): fallback(base_url) -> page dict or None, tried once
+            per site when it blocks us (e.g. the Firecrawl homepage scrape)
+        concurrency (int): Sites crawled at once (default: 200)
+        delay (float): Seconds between requests to the same host (default: 0.5)
+        per_host (int): Concurrent requests per host (default: 1)
+        timeout (float): Per-request timeout in seconds (default: 5)
+        headers (dict, optional): Request headers
+        pages_wanted (int): Stop a site once this many pages, homepage included, came back
+        discover_links (bool): Pick the pages after the homepage from its links and sitemap
+        max_candidates (int): Discovered pages to try at most per site
+        page_cache (PageCache, optional): On-disk page cache keyed by normalised URL (fresh
+            entries skip the network, stale ones are revalidated with conditional GETs)
+        parse_pool (ParsePool, optional): Worker processes that decode and parse bodies;
+            without one, to_text runs on a thread of this process
+    """
+
+    def __init__(self, paths, to_text, fallback=None, concurrency=200, delay=0.5, per_host=1,
+                 timeout=5, headers=None, pages_wanted=2, discover_links=True, max_candidates=MAX_CANDIDATES,
+                 page_cache=None, parse_pool=None):
+        self.paths = list(paths)
+        self.to_text = to_text
+        self.fallback = fallback
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.pages_wanted = pages_wanted
+        self.discover_links = discover_links
+        self.max_candidates = max_candidates
+        self.page_cache = page_cache
+        self.parse_pool = parse_pool
+        self.throttle = HostThrottle(delay=delay, per_host=per_host)
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._site_slots = None
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"domains": 0, "domains_succeeded": 0, "requests": 0, "pages": 0, "fallbacks": 0,
+                       "cache_hits": 0, "revalidated": 0}
+        self._statuses = {}
+        self._discovered_via = {}
+        self._busy_seconds = 0.0
+        self._started_at = None
+        self._finished_at = None
+
+    def start(self):
+        """Start the event loop thread and open the HTTP session."""
+        ready = threading.Event()
+
+        def run_loop():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(ready.set)
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, daemon=True)
+        self._thread.start()
+        ready.wait()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+        self._started_at = time.monotonic()
+        return self
+
+    async def _open(self):
+        self._site_slots = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        )
+
+    def close(self):
+        """Close the session and stop the event loop (after in-flight sites finish)."""
+        if not self._loop:
+            return
+        self._finished_at = time.monotonic()
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def submit(self, base_url):
+        """
+        Queue a site for crawling.
+
+        Args:
+            base_url (str): Normalized site URL (https://...)
+
+        Returns:
+            concurrent.futures.Future: Resolves to the scrape_website()-shaped result; a
+                site submitted again while recent shares the same future
+        """
+        with self._lock:
+            future = self._recent.get(base_url)
+            if future is not None:
+                self._recent.move_to_end(base_url)
+                return future
+            future = asyncio.run_coroutine_threadsafe(self.crawl_site(base_url), self._loop)
+            self._recent[base_url] = future
+            if len(self._recent) > RECENT_SITES:
+                self._recent.popitem(last=False)
+            return future
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _parse(self, body, final_url, with_links, sitemap):
+        """Clean text and links for a fetched body (CPU work, run off the loop)."""
+        if sitemap:
+            return "", parse_sitemap(body, final_url)
+        return self.to_text(body), extract_links(body, final_url) if with_links else None
+
+    async def _cache(self, method, *args, **kwargs):
+        """Call a page cache method off the loop (SQLite commits block)."""
+        return await asyncio.to_thread(getattr(self.page_cache, method), *args, **kwargs)
+
+    async def fetch(self, url, with_links=False, sitemap=False):
+        """
+        Fetch one page, politely, and return it as scrape_page() does (page cache included).
+
+        Args:
+            url (str): Page URL
+            with_links (bool): Also return the page's same-site links (for link discovery)
+            sitemap (bool): The URL is a sitemap.xml: return its page links instead of text
+
+        Returns:
+            dict: Result with status and content/error; 'cached': True if served from the
+                cache without a request
+        """
+        key = cache_key(url)
+        cached = await self._cache("lookup", key) if self.page_cache else None
+        if cached and (with_links or sitemap) and cached["status"] == 200 and cached["links"] is None:
+            # Cached without its links (not fetched as a homepage before)
+            cached = None
+        if cached and cached["fresh"]:
+            self._count("cache_hits")
+            return {**page_result(url, cached), 'cached': True}
+
+        host = (urlparse(url).hostname or "").lower()
+        self._count("requests")
+        try:
+            async with self.throttle.slot(host):
+                async with self._session.get(url, headers=conditional_headers(cached), allow_redirects=True) as response:
+                    status_code = response.status
+                    final_url = str(response.url)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    charset = response.charset
+                    if status_code != 200:
+                        body = None
+                    elif self.parse_pool:
+                        body = await response.read()
+                    else:
+                        body = await response.text(errors="replace")
+        except asyncio.TimeoutError:
+            result, status_code = {'status': 'timeout', 'url': url, 'error': TIMEOUT_ERROR}, 0
+        except Exception as e:
+            result, status_code = {'status': 'error', 'url': url, 'error': str(e)[:100] or type(e).__name__}, 0
+        else:
+            if status_code == 304 and cached:
+                self._count("revalidated")
+                await self._cache("touch", key)
+                return page_result(url, cached)
+            if status_code == 429:
+                # Rate limits are about this moment, not the page: never cached
+                return {'status': 'rate_limited', 'url': url, 'error': 'Rate limited (429)'}
+
+            if status_code == 200:
+                try:
+                    # HTML parsing is CPU work; keep it off the loop so other sites keep fetching
+                    if self.parse_pool:
+                        clean_text, links = await asyncio.wrap_future(
+                            self.parse_pool.submit(body, charset, final_url, with_links=with_links, sitemap=sitemap))
+                    else:
+                        clean_text, links = await asyncio.to_thread(self._parse, body, final_url, with_links, sitemap)
+                except Exception as e:
+                    return {'status': 'error', 'url': url, 'error': str(e)[:100] or type(e).__name__}
+                result = {'status': 'success', 'url': url, 'content': clean_text, 'length': len(clean_text)}
+                if links is not None:
+                    result['links'] = links
+                if self.page_cache:
+                    await self._cache("put", key, url, 200, clean_text, etag=etag, last_modified=last_modified, links=links)
+                return result
+
+            if status_code == 403:
+                result = {'status': 'blocked', 'url': url, 'error': 'Access forbidden (403)'}
+            else:
+                result = {'status': 'failed', 'url': url, 'error': f'HTTP {status_code}'}
+
+        # Negative caching: dead paths and unreachable sites aren't re-probed until the short TTL passes
+        if self.page_cache:
+            await self._cache("put", key, url, status_code, result['error'])
+        return result
+
+    async def discover(self, base_url, homepage_links):
+        """
+        Rank the pages worth fetching after the homepage.
+
+        Args:
+            base_url (str): Normalized site URL
+            homepage_links (list): (url, link text) pairs from the homepage
+
+        Returns:
+            tuple: (candidate URLs, "anchors" or "sitemap"); no URLs if nothing matched
+        """
+        candidates = rank_links(homepage_links, self.max_candidates)
+        if candidates:
+            return [url for url, _ in candidates], 'anchors'
+
+        sitemap = await self.fetch(urljoin(base_url, SITEMAP_PATH), sitemap=True)
+        candidates = rank_links(sitemap.get('links') or [], self.max_candidates)
+        return [url for url, _ in candidates], 'sitemap'
+
+    async def crawl_site(self, base_url):
+        """
+        Crawl one site: the homepage, then discovered (or guessed) pages until one more came back.
+
+        Args:
+            base_url (str): Normalized site URL
+
+        Returns:
+            dict: {"status", "base_url", "pages_scraped", "pages"} as scrape_website() returns
+        """
+        async with self._site_slots:
+            started = time.monotonic()
+            scraped_pages = []
+            homepage_scraped = False
+            fallback_attempted = False
+            discovered_via = None
+
+            # The homepage first; the rest of the list is decided once it is in
+            urls = [urljoin(base_url, self.paths[0])]
+            i = 0
+            while i < len(urls):
+                result = await self.fetch(urls[i], with_links=self.discover_links and i == 0)
+                result.pop('cached', None)
+                homepage_links = result.pop('links', None)
+                with self._lock:
+                    self._statuses[result['status']] = self._statuses.get(result['status'], 0) + 1
+
+                if result['status'] == 'success':
+                    scraped_pages.append(result)
+                    if i == 0:
+                        homepage_scraped = True
+
+                if result['status'] in BLOCKED_STATUSES:
+                    if fallback_attempted or not self.fallback:
+                        break
+                    fallback_attempted = True
+                    self._count("fallbacks")
+                    page = await asyncio.to_thread(self.fallback, base_url)
+                    if not page:
+                        break
+                    scraped_pages.append(page)
+                    homepage_scraped = True
+
+                # Stop after homepage + 1 additional good page
+                if homepage_scraped and len(scraped_pages) >= self.pages_wanted:
+                    break
+
+                if i == 0:
+                    candidates = []
+                    if homepage_links is not None:
+                        candidates, discovered_via = await self.discover(base_url, homepage_links)
+                    if not candidates:
+                        candidates = [urljoin(base_url, path) for path in self.paths[1:]]
+                        discovered_via = 'guessed'
+                    urls += candidates
+                    with self._lock:
+                        self._discovered_via[discovered_via] = self._discovered_via.get(discovered_via, 0) + 1
+                i += 1
+
+            with self._lock:
+                self._busy_seconds += time.monotonic() - started
+
+        self._count("domains")
+        self._count("pages", len(scraped_pages))
+        if scraped_pages:
+            self._count("domains_succeeded")
+
+        return {
+            'status': 'success' if scraped_pages else 'failed',
+            'base_url': base_url,
+            'pages_scraped': len(scraped_pages),
+            'pages': scraped_pages,
+            'discovered_via': discovered_via
+        }
+
+    def stats(self):
+        """
+        Crawl throughput so far.
+
+        Returns:
+            dict: Domain, network request and page counts, cache hits (no request) and 304
+                revalidations, requests_per_domain, per-status result counts, how each site's
+                pages were chosen, elapsed seconds, domains_per_second and slot_utilisation
+                (share of the concurrency slots that had a site in progress, 0-1)
+        """
+        end = self._finished_at or time.monotonic()
+        seconds = end - self._started_at if self._started_at else 0
+        with self._lock:
+            stats = dict(self._stats)
+            statuses = dict(self._statuses)
+            discovered_via = dict(self._discovered_via)
+            busy_seconds = self._busy_seconds
+        return {
+            **stats,
+            "requests_per_domain": round(stats["requests"] / stats["domains"], 2) if stats["domains"] else 0,
+            "statuses": statuses,
+            "discovered_via": discovered_via,
+            "concurrency": self.concurrency,
+            "seconds": round(seconds, 2),
+            "domains_per_second": round(stats["domains"] / seconds, 2) if seconds else 0,
+            "slot_utilisation": round(busy_seconds / (seconds * self.concurrency), 3) if seconds else 0
+        }
@@ -0,0 +1,198 @@
+"""
+Benchmark the HTML -> text backends in html_extract.py.
+
+Runs every backend over a corpus of saved HTML pages, reports pages/s and MB/s, and
+checks each backend's text against the BeautifulSoup reference ("bs4"): how many
+pages come out identical, the mean line similarity, and the pages that differ most.
+
+The default corpus (fixtures/html_corpus/) is a small set of pages in the shapes
+enrichment meets on small-business sites: WordPress and Wix/Squarespace-style
+builders, script-heavy pages, malformed markup. For numbers that reflect your own
+leads, snapshot real pages into a corpus first.
+
+Usage:
+    python benchmark_html_extract.py
+    python benchmark_html_extract.py --backends lxml stream --repeat 10
+
+    # Save real pages (one URL per line) into a corpus, then benchmark it
+    python benchmark_html_extract.py --snapshot urls.txt --corpus .tmp/html_corpus
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import difflib
+import argparse
+import requests
+from html_extract import BACKENDS, get_extractor
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html_corpus")
+
+REFERENCE_BACKEND = "bs4"
+
+
+def load_corpus(corpus_dir):
+    """
+    Read every .html/.htm file in a corpus directory.
+
+    Args:
+        corpus_dir (str): Directory of saved pages
+
+    Returns:
+        list: (file name, html) tuples, sorted by file name
+    """
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.lower().endswith(('.html', '.htm')):
+            with open(os.path.join(corpus_dir, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def snapshot_pages(urls_file, corpus_dir, timeout=10):
+    """
+    Download pages into a corpus directory, one file per URL.
+
+    Args:
+        urls_file (str): Text file with one URL per line
+        corpus_dir (str): Directory to save the pages in
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        int: Number of pages saved
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    with open(urls_file, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    saved = 0
+    for url in urls:
+        try:
+            response = requests.get(url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"   ⚠️  {url}: {e}")
+            continue
+        if response.status_code != 200:
+            print(f"   ⚠️  {url}: HTTP {response.status_code}")
+            continue
+
+        name = re.sub(r"[^a-z0-9]+", "-", url.lower().split("://", 1)[-1]).strip("-")[:100] + ".html"
+        with open(os.path.join(corpus_dir, name), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        saved += 1
+
+    print(f"📥 Saved {saved}/{len(urls)} pages to {corpus_dir}")
+    return saved
+
+
+def time_backend(extract, pages, repeat):
+    """Best wall time of `repeat` passes of one backend over the corpus, and its outputs."""
+    best = None
+    outputs = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [extract(html) for _, html in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+
+def similarity(reference, text):
+    """Line-level similarity of two extracted texts (1.0 = identical)."""
+    if reference == text:
+        return 1.0
+    return difflib.SequenceMatcher(None, reference.splitlines(), text.splitlines(), autojunk=False).ratio()
+
+
+def run_benchmark(pages, backends=None, repeat=5):
+    """
+    Time each backend over the corpus and compare its text with the reference backend.
+
+    Args:
+        pages (list): (name, html) tuples from load_corpus()
+        backends (list, optional): Backend names (default: all)
+        repeat (int): Passes per backend; the fastest one is reported
+
+    Returns:
+        dict: Per-backend speed and parity
+    """
+    backends = backends or list(BACKENDS)
+    total_mb = sum(len(html.encode('utf-8')) for _, html in pages) / 1e6
+
+    reference_seconds, reference = time_backend(get_extractor(REFERENCE_BACKEND), pages, repeat)
+
+    results = {}
+    for backend in backends:
+        print(f"⏱️  {backend}...")
+        if backend == REFERENCE_BACKEND:
+            seconds, outputs = reference_seconds, reference
+        else:
+            try:
+                seconds, outputs = time_backend(get_extractor(backend), pages, repeat)
+            except ImportError as e:
+                print(f"   ⚠️  Skipping {backend}: {e}")
+                continue
+
+        scores = [similarity(ref, out) for ref, out in zip(reference, outputs)]
+        worst = sorted(zip(scores, (name for name, _ in pages)))[:3]
+
+        results[backend] = {
+            "seconds": round(seconds, 4),
+            "pages_per_second": round(len(pages) / seconds, 1) if seconds else None,
+            "mb_per_second": round(total_mb / seconds, 2) if seconds else None,
+            "speedup_vs_reference": round(reference_seconds / seconds, 1) if seconds else None,
+            "identical_pages": sum(1 for score in scores if score == 1.0),
+            "identical_rate": round(sum(1 for score in scores if score == 1.0) / len(pages) * 100, 1),
+            "mean_similarity": round(sum(scores) / len(scores), 4),
+            "least_similar": [{"page": name, "similarity": round(score, 4)} for score, name in worst if score < 1.0]
+        }
+
+    return {
+        "pages": len(pages),
+        "corpus_mb": round(total_mb, 2),
+        "repeat": repeat,
+        "reference": REFERENCE_BACKEND,
+        "backends": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML -> text backends in html_extract.py")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of .html pages (default: fixtures/html_corpus)")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), help="Backends to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per backend, fastest reported (default: 5)")
+    parser.add_argument("--snapshot", help="Download the URLs in this file (one per line) into --corpus first")
+
+    args = parser.parse_args()
+
+    if args.snapshot:
+        snapshot_pages(args.snapshot, args.corpus)
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"❌ No .html pages in {args.corpus}")
+        sys.exit(1)
+
+    print(f"🧪 {len(pages)} pages from {args.corpus}")
+    result = run_benchmark(pages, backends=args.backends, repeat=args.repeat)
+
+    print("\n" + "="*60)
+    print(f"📊 HTML extraction benchmark ({result['pages']} pages, {result['corpus_mb']} MB, vs {result['reference']}):")
+    for backend, stats in result["backends"].items():
+        print(f"   {backend}: {stats['pages_per_second']} pages/s ({stats['mb_per_second']} MB/s, "
+              f"{stats['speedup_vs_reference']}x), identical {stats['identical_rate']}%, "
+              f"similarity {stats['mean_similarity']}")
+    print("="*60)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
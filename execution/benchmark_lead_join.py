@@ -0,0 +1,155 @@
+"""
+Benchmark the lead <-> validation report join used by filter_validated_leads.py.
+
+Synthesizes N leads (several contacts per company) and a validation report for them,
+then times the old linear scan (company name, then email, against every detail)
+against the lead-ID hash index. The linear scan is timed on a sample and
+extrapolated, since running it over 50k x 50k takes far too long.
+
+Usage:
+    python benchmark_lead_join.py --leads 50000
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from lead_store import lead_id_for
+from filter_validated_leads import build_validation_index, find_validation_for_lead
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def synthesize_leads(count, contacts_per_company=3, seed=0):
+    """
+    Build synthetic leads and a matching validation_details list.
+
+    Args:
+        count (int): Number of leads
+        contacts_per_company (int): Contacts sharing each company
+        seed (int): Random seed for the verdicts
+
+    Returns:
+        tuple: (leads, validation_details)
+    """
+    rng = random.Random(seed)
+    leads = []
+    validation_details = []
+    for i in range(count):
+        company = i // contacts_per_company
+        lead = {
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"contact{i}@company{company}.com",
+            "company_name": f"Company {company}",
+            "company_domain": f"company{company}.com",
+        }
+        lead["lead_id"] = lead_id_for(lead)
+        leads.append(lead)
+
+        percentage = rng.randint(0, 100)
+        validation_details.append({
+            "lead_id": lead["lead_id"],
+            "company": lead["company_name"],
+            "valid": percentage >= 80,
+            "match_percentage": percentage,
+            "reason": "synthetic",
+            "data": lead
+        })
+
+    # Reports are not in lead order once validation runs concurrently
+    rng.shuffle(validation_details)
+    return leads, validation_details
+
+
+def linear_scan(lead, validation_details):
+    """The pre-index join: first detail matching company name, then email."""
+    company_name = lead.get('company_name') or ''
+    email = lead.get('email') or ''
+
+    for detail in validation_details:
+        if company_name and company_name.lower() == detail.get('company', '').lower():
+            return detail
+        if email and email.lower() == detail.get('data', {}).get('email', '').lower():
+            return detail
+
+    return None
+
+
+def run_benchmark(lead_count, sample_size=200):
+    """
+    Time both joins over the same synthetic data.
+
+    Args:
+        lead_count (int): Number of leads and validation details
+        sample_size (int): Leads to time the linear scan on
+
+    Returns:
+        dict: Timings and match-accuracy comparison
+    """
+    print(f"🧪 Synthesizing {lead_count} leads and validation details...")
+    leads, validation_details = synthesize_leads(lead_count)
+    sample = random.Random(1).sample(leads, min(sample_size, lead_count))
+
+    print(f"⏱️  Linear scan on {len(sample)} sampled leads...")
+    start = time.perf_counter()
+    linear_matches = [linear_scan(lead, validation_details) for lead in sample]
+    linear_sample_seconds = time.perf_counter() - start
+    linear_estimated_seconds = linear_sample_seconds / len(sample) * lead_count
+
+    print(f"⏱️  Indexed join on all {lead_count} leads...")
+    start = time.perf_counter()
+    index = build_validation_index(validation_details)
+    index_build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for lead in leads:
+        find_validation_for_lead(lead, index)
+    index_lookup_seconds = time.perf_counter() - start
+    indexed_seconds = index_build_seconds + index_lookup_seconds
+
+    # How often the linear scan handed a lead another contact's verdict
+    wrong_matches = sum(1 for lead, detail in zip(sample, linear_matches)
+                        if detail is None or detail["lead_id"] != lead["lead_id"])
+    indexed_wrong = sum(1 for lead in sample
+                        if find_validation_for_lead(lead, index)["lead_id"] != lead["lead_id"])
+
+    return {
+        "leads": lead_count,
+        "linear_sample_size": len(sample),
+        "linear_sample_seconds": round(linear_sample_seconds, 3),
+        "linear_estimated_seconds": round(linear_estimated_seconds, 1),
+        "index_build_seconds": round(index_build_seconds, 3),
+        "index_lookup_seconds": round(index_lookup_seconds, 3),
+        "indexed_seconds": round(indexed_seconds, 3),
+        "speedup": round(linear_estimated_seconds / indexed_seconds, 1) if indexed_seconds else None,
+        "linear_wrong_match_rate": round(wrong_matches / len(sample) * 100, 1),
+        "indexed_wrong_match_rate": round(indexed_wrong / len(sample) * 100, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation report join in filter_validated_leads.py")
+    parser.add_argument("--leads", type=int, default=50000, help="Number of synthetic leads (default: 50000)")
+    parser.add_argument("--sample", type=int, default=200, help="Leads to time the linear scan on (default: 200)")
+
+    args = parser.parse_args()
+
+    result = run_benchmark(args.leads, sample_size=args.sample)
+
+    print("\n" + "="*60)
+    print(f"📊 Join benchmark ({result['leads']} leads):")
+    print(f"   Linear scan (estimated): {result['linear_estimated_seconds']}s")
+    print(f"   Indexed join: {result['indexed_seconds']}s "
+          f"(build {result['index_build_seconds']}s + lookups {result['index_lookup_seconds']}s)")
+    print(f"   Speedup: {result['speedup']}x")
+    print(f"   Wrong verdicts: linear {result['linear_wrong_match_rate']}%, indexed {result['indexed_wrong_match_rate']}%")
+    print("="*60)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
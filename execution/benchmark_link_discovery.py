@@ -0,0 +1,163 @@
+"""
+Benchmark link discovery against guessing the fixed list of common paths.
+
+Crawls every site in a fixture twice with enrich_personalization.scrape_website(),
+once picking pages from the homepage's links and sitemap (the default) and once with
+--no-link-discovery's fixed path list, and reports requests per domain, how many
+sites ended up with a page beyond the homepage, and which pages each mode read.
+Requests are answered from the fixture instead of the network, so the numbers are
+exact and repeatable.
+
+The default fixture (fixtures/link_sites.json) is a small set of sites in the shapes
+enrichment meets: useful anchors, anchors whose text is the only clue, look-alike links
+(network, preview, client login), a useful sitemap, nothing to discover, a blocked site.
+
+Usage:
+    python benchmark_link_discovery.py
+    python benchmark_link_discovery.py --fixture my_sites.json --details
+"""
+
+import os
+import sys
+import json
+import argparse
+from unittest import mock
+from urllib.parse import urlparse
+import requests
+import enrich_personalization
+from enrich_personalization import scrape_website
+from link_discovery import SITEMAP_PATH
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "link_sites.json")
+
+MODES = {"discovery": True, "guessed": False}
+
+
+class FixtureResponse:
+    """The parts of requests.Response the crawler reads."""
+
+    def __init__(self, url, status_code, text="", content_type="text/html; charset=utf-8"):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = {"Content-Type": content_type} if status_code == 200 else {}
+
+
+def load_fixture(fixture_file):
+    """
+    Read a site fixture.
+
+    Args:
+        fixture_file (str): JSON file with a "sites" list ({"domain", "pages", "sitemap"?, "status"?})
+
+    Returns:
+        dict: domain -> site
+    """
+    with open(fixture_file, 'r', encoding='utf-8') as f:
+        return {site["domain"]: site for site in json.load(f)["sites"]}
+
+
+def fixture_get(sites, log):
+    """
+    A requests.get stand-in that serves the fixture and logs every request.
+
+    Args:
+        sites (dict): domain -> site, from load_fixture()
+        log (list): Receives (domain, path) for each request
+
+    Returns:
+        callable: get(url, **kwargs) -> FixtureResponse
+    """
+    def get(url, **kwargs):
+        parsed = urlparse(url)
+        domain = parsed.hostname or ""
+        path = parsed.path or "/"
+        log.append((domain, path))
+
+        site = sites.get(domain)
+        if site is None:
+            raise requests.exceptions.ConnectionError(f"No fixture site for {domain}")
+        if site.get("status", 200) != 200:
+            return FixtureResponse(url, site["status"])
+        if path == SITEMAP_PATH and site.get("sitemap"):
+            return FixtureResponse(url, 200, site["sitemap"], "application/xml")
+        for candidate in (path, path.rstrip("/") or "/", path + "/"):
+            if candidate in site["pages"]:
+                return FixtureResponse(url, 200, site["pages"][candidate])
+        return FixtureResponse(url, 404, "Not found")
+
+    return get
+
+
+def crawl_fixture(sites, discover_links):
+    """
+    Crawl every fixture site the way enrichment does.
+
+    Args:
+        sites (dict): domain -> site, from load_fixture()
+        discover_links (bool): Pick pages from links and sitemap (False: guess COMMON_PATHS)
+
+    Returns:
+        dict: Totals plus a per-site breakdown
+    """
+    log = []
+    details = []
+    # Blocked sites stay blocked: no Firecrawl fallback outside the fixture
+    with mock.patch.object(requests, "get", fixture_get(sites, log)), \
+            mock.patch.object(enrich_personalization, "firecrawl_homepage", lambda base_url: None):
+        for domain in sites:
+            start = len(log)
+            result = scrape_website(f"https://{domain}", delay=0, discover_links=discover_links)
+            details.append({
+                "domain": domain,
+                "shape": sites[domain].get("shape"),
+                "requests": len(log) - start,
+                "pages": [urlparse(page["url"]).path for page in result.get("pages", [])],
+                "discovered_via": result.get("discovered_via")
+            })
+
+    via = {}
+    for site in details:
+        if site["discovered_via"]:
+            via[site["discovered_via"]] = via.get(site["discovered_via"], 0) + 1
+    return {
+        "sites": len(details),
+        "requests": len(log),
+        "requests_per_domain": round(len(log) / len(details), 2) if details else 0,
+        "sites_with_content_page": sum(1 for site in details if len(site["pages"]) >= 2),
+        "discovered_via": via,
+        "details": details
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark link discovery against guessing common paths")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="Site fixture JSON (default: fixtures/link_sites.json)")
+    parser.add_argument("--details", action="store_true", help="Include every site's requests and pages in the JSON output")
+
+    args = parser.parse_args()
+
+    sites = load_fixture(args.fixture)
+    print(f"🧪 {len(sites)} sites from {args.fixture}")
+    results = {mode: crawl_fixture(sites, discover_links) for mode, discover_links in MODES.items()}
+
+    print("\n" + "="*60)
+    print(f"📊 Link discovery benchmark ({len(sites)} sites):")
+    for mode, stats in results.items():
+        print(f"   {mode}: {stats['requests']} requests ({stats['requests_per_domain']}/domain), "
+              f"{stats['sites_with_content_page']} sites with a page beyond the homepage")
+    print("="*60)
+
+    if not args.details:
+        for stats in results.values():
+            stats.pop("details")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
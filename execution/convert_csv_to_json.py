@@ -4,6 +4,9 @@ Convert Instantly CSV export to workflow JSON format.
 This script converts a CSV file (exported from Instantly or other sources) into the
 JSON format expected by the lead generation workflow.
 
+Rows are streamed straight to the output, so memory stays flat for any CSV size.
+Use a .ndjson output path for newline-delimited JSON.
+
 Usage:
     python convert_csv_to_json.py --input file.csv --output .tmp/leads.json
 """
@@ -13,19 +16,22 @@ import sys
 import csv
 import json
 import argparse
+from lead_io import LeadWriter, iter_leads
+from lead_store import LeadStore, lead_id_for
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 
-def convert_csv_to_json(input_file, output_file):
+def convert_csv_to_json(input_file, output_file, store_file=None):
     """
     Convert CSV file to JSON format expected by workflow.
 
     Args:
         input_file (str): Path to input CSV file
-        output_file (str): Path to output JSON file
+        output_file (str): Path to output JSON file (.ndjson for NDJSON)
+        store_file (str, optional): SQLite lead store to add the imported leads to
 
     Returns:
         dict: Conversion summary with statistics
@@ -38,7 +44,8 @@ def convert_csv_to_json(input_file, output_file):
             "message": f"Input file not found: {input_file}"
         }
 
-    leads = []
+    writer = None
+    sample = None
     skipped = 0
 
     print(f"📄 Converting CSV to JSON format...")
@@ -46,6 +53,8 @@ def convert_csv_to_json(input_file, output_file):
     print()
 
     try:
+        writer = LeadWriter(output_file)
+
         # Read CSV file
         with open(input_file, 'r', encoding='utf-8-sig') as f:  # utf-8-sig handles BOM
             reader = csv.DictReader(f)
@@ -97,50 +106,53 @@ def convert_csv_to_json(input_file, output_file):
                     "_source": "csv_import",
                     "_csv_row": row_num
                 }
+                lead["lead_id"] = lead_id_for(lead)
 
-                leads.append(lead)
+                writer.write(lead)
+                if sample is None:
+                    sample = lead
 
                 # Print progress every 100 leads
-                if len(leads) % 100 == 0:
-                    print(f"   ✅ Processed {len(leads)} leads...")
+                if writer.count % 100 == 0:
+                    print(f"   ✅ Processed {writer.count} leads...")
 
     except Exception as e:
+        if writer:
+            writer.abort()
         return {
             "status": "error",
-            "message": f"Error reading CSV: {str(e)}"
+            "message": f"Error converting CSV: {str(e)}"
         }
 
-    if not leads:
+    if not writer.count:
+        writer.abort()
         return {
             "status": "error",
             "message": "No valid leads found in CSV (all rows missing email)"
         }
 
-    # Save to JSON
-    os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
+    writer.close()
 
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(leads, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Error writing JSON: {str(e)}"
-        }
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            store.upsert_leads(iter_leads(output_file), source="csv_import")
+        finally:
+            store.close()
+        print(f"🗄️  Added {writer.count} leads to lead store: {store_file}")
 
     # Print summary
     print()
     print("=" * 60)
     print(f"✅ Conversion Complete!")
-    print(f"   Total leads: {len(leads)}")
+    print(f"   Total leads: {writer.count}")
     print(f"   Skipped (no email): {skipped}")
     print(f"   Output: {output_file}")
     print()
 
     # Show sample lead
-    if leads:
+    if sample:
         print("📋 Sample lead:")
-        sample = leads[0]
         print(f"   Name: {sample.get('full_name') or 'N/A'}")
         print(f"   Email: {sample.get('email') or 'N/A'}")
         print(f"   Company: {sample.get('company_name') or 'N/A'}")
@@ -148,7 +160,7 @@ def convert_csv_to_json(input_file, output_file):
 
     return {
         "status": "success",
-        "total_leads": len(leads),
+        "total_leads": writer.count,
         "skipped": skipped,
         "output_file": output_file
     }
@@ -158,12 +170,14 @@ def main():
     parser = argparse.ArgumentParser(description="Convert CSV to workflow JSON format")
     parser.add_argument("--input", required=True, help="Input CSV file")
     parser.add_argument("--output", required=True, help="Output JSON file")
+    parser.add_argument("--store", help="Also record results in this SQLite lead store (e.g. .tmp/leads.sqlite)")
 
     args = parser.parse_args()
 
     result = convert_csv_to_json(
         input_file=args.input,
-        output_file=args.output
+        output_file=args.output,
+        store_file=args.store
     )
 
     # Print result
@@ -1,12 +1,28 @@
 """
 Enrich leads with personalization data by scraping company websites.
 
-This script scrapes common pages (homepage, about, testimonials, etc.) from each lead's
-website and uses AI to extract a 1-sentence personalization referencing recent projects,
+This script scrapes each lead's company website (the homepage plus its most promising
+pages, such as case studies, testimonials or portfolio, found from the homepage's own
+links) and uses AI to extract a 1-sentence personalization referencing recent projects,
 testimonials, clients, or achievements.
 
+Leads are streamed from the input (JSON array or NDJSON) with a bounded number of
+enrichments in flight, and each enriched lead is written as soon as it completes.
+Websites are crawled by an asyncio crawler (async_crawler.py) that keeps hundreds of
+sites in flight with per-host politeness; the AI extraction runs on worker threads.
+Fetched pages are decoded and parsed in a process pool sized to the core count
+(parse_pool.py), so HTML cleanup never holds up the network side. Only the async
+crawler fully separates the two: with --crawler threads the parse runs off the GIL,
+but each fetch thread still waits for its page's text before its next request.
+
 Usage:
     python enrich_personalization.py --input .tmp/full_leads_verified.json --output .tmp/full_leads_personalized.json --report .tmp/personalization_report.json
+
+    # Original thread-per-lead crawling
+    python enrich_personalization.py --input ... --output ... --crawler threads
+
+    # 40 fetch threads, 4 parser processes (0 parses in the fetching threads)
+    python enrich_personalization.py --input ... --output ... --crawler threads --fetch-workers 40 --parse-workers 4
 """
 
 import os
@@ -17,12 +33,19 @@ import requests
 import time
 from dotenv import load_dotenv
 from anthropic import Anthropic
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import urljoin, urlparse
 import random
-from bs4 import BeautifulSoup
 import re
+import threading
 from firecrawl import FirecrawlApp
+from lead_io import iter_leads, LeadWriter, LeadFileError
+from lead_store import LeadStore
+from async_crawler import AsyncCrawler
+from link_discovery import extract_links, parse_sitemap, rank_links, SITEMAP_PATH, MAX_CANDIDATES
+from page_cache import PageCache, cache_key, conditional_headers, page_result, TIMEOUT_ERROR
+from html_extract import html_to_text
+from parse_pool import ParsePool, response_charset
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -31,6 +54,39 @@ if sys.platform == 'win32':
 # Load environment variables
 load_dotenv()
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+DEFAULT_PAGE_CACHE_FILE = ".tmp/enrich_page_cache.sqlite"
+
+# Common page paths prioritized by personalization value (scrape until we get 1 good page + homepage)
+COMMON_PATHS = [
+    '/',                  # Homepage (ALWAYS scrape)
+    '/case-studies',      # Best: specific client work and results
+    '/casestudies',       # Best: alternate spelling
+    '/testimonials',      # Best: client names and outcomes
+    '/reviews',           # Good: client feedback and ratings
+    '/portfolio',         # Good: recent projects and clients
+    '/clients',           # Good: notable client names
+    '/our-clients',       # Good: alternate naming
+    '/projects',          # Good: specific work examples
+    '/our-work',          # Good: alternate naming
+    '/work',              # Medium: examples of work
+    '/success-stories',   # Good: detailed client outcomes
+    '/success',           # Good: alternate naming
+    '/about',             # Medium: company background
+    '/about-us',          # Medium: alternate naming
+    '/customer-stories',  # Good: customer case studies
+    '/case-study',        # Good: singular form
+    '/client-success'     # Good: client outcomes
+]
+
 
 def normalize_url(url):
     """
@@ -52,130 +108,218 @@ def normalize_url(url):
     return url
 
 
-def scrape_page(url, timeout=5):
+def scrape_page(url, timeout=5, with_links=False, page_cache=None, delay=0, parse_pool=None):
     """
     Scrape a single page and return its HTML content.
 
+    With a page cache, a fresh cached result is returned without touching the network;
+    a stale good page is revalidated with a conditional GET (304 keeps the cached text),
+    and every result except a rate limit is cached, failures for the shorter negative TTL.
+
     Args:
         url (str): URL to scrape
         timeout (int): Request timeout in seconds
+        with_links (bool): Also return the page's same-site links (for link discovery)
+        page_cache (PageCache, optional): On-disk page cache keyed by normalised URL
+        delay (float): Seconds to wait first if the request goes to the network (polite scraping)
+        parse_pool (ParsePool, optional): Worker processes to decode and parse the page in;
+            without one it is parsed in this thread. Either way this thread waits for the
+            result: the crawl needs the homepage's links to choose the next request
 
     Returns:
-        dict: Result with status and content/error
+        dict: Result with status and content/error; 'cached': True if served from the
+            cache without a request
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
+    key = cache_key(url)
+    cached = page_cache.lookup(key) if page_cache else None
+    if cached and with_links and cached["status"] == 200 and cached["links"] is None:
+        # Cached without its links (not fetched as a homepage before)
+        cached = None
+    if cached and cached["fresh"]:
+        return {**page_result(url, cached), 'cached': True}
 
-    try:
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+    if delay:
+        time.sleep(delay)
 
-        if response.status_code == 200:
-            # Extract clean text from HTML using BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-                script.decompose()
-
-            # Get text and clean it up
-            text = soup.get_text()
-
-            # Break into lines and remove leading/trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    try:
+        response = requests.get(url, headers={**REQUEST_HEADERS, **conditional_headers(cached)},
+                                timeout=timeout, allow_redirects=True)
 
-            # Drop blank lines and join
-            clean_text = '\n'.join(chunk for chunk in chunks if chunk)
+        if response.status_code == 304 and cached:
+            page_cache.touch(key)
+            return page_result(url, cached)
 
-            # Limit to 10KB of clean text per page
-            clean_text = clean_text[:10000]
+        if response.status_code == 200:
+            if parse_pool:
+                # Only the raw bytes cross over; the thread waits for the text without
+                # holding the GIL, but can't fetch again until it is back
+                clean_text, links = parse_pool.parse(response.content, response_charset(response.headers.get('Content-Type')),
+                                                     response.url, with_links=with_links)
+            else:
+                clean_text = html_to_text(response.text)
+                links = extract_links(response.text, response.url) if with_links else None
 
-            return {
+            result = {
                 'status': 'success',
                 'url': url,
                 'content': clean_text,
                 'length': len(clean_text)
             }
+            if links is not None:
+                result['links'] = links
+            if page_cache:
+                page_cache.put(key, url, 200, clean_text, etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'), links=result.get('links'))
+            return result
         elif response.status_code == 403:
-            return {
+            result = {
                 'status': 'blocked',
                 'url': url,
                 'error': 'Access forbidden (403)'
             }
         elif response.status_code == 429:
+            # Rate limits are about this moment, not the page: never cached
             return {
                 'status': 'rate_limited',
                 'url': url,
                 'error': 'Rate limited (429)'
             }
         else:
-            return {
+            result = {
                 'status': 'failed',
                 'url': url,
                 'error': f'HTTP {response.status_code}'
             }
+        status_code = response.status_code
 
     except requests.exceptions.Timeout:
-        return {
+        result = {
             'status': 'timeout',
             'url': url,
-            'error': 'Request timed out'
+            'error': TIMEOUT_ERROR
         }
+        status_code = 0
     except requests.exceptions.RequestException as e:
-        return {
+        result = {
             'status': 'error',
             'url': url,
             'error': str(e)[:100]
         }
+        status_code = 0
     except Exception as e:
-        return {
+        result = {
             'status': 'error',
             'url': url,
             'error': str(e)[:100]
         }
+        status_code = 0
+
+    # Negative caching: dead paths and unreachable sites aren't re-probed until the short TTL passes
+    if page_cache:
+        page_cache.put(key, url, status_code, result['error'])
+    return result
+
+
+def firecrawl_homepage(base_url):
+    """
+    Scrape a site's homepage through Firecrawl (headless browser, bypasses anti-bot blocks).
+
+    Args:
+        base_url (str): Normalized site URL
+
+    Returns:
+        dict or None: Page result like scrape_page()'s, or None if there is no
+            FIRECRAWL_API_KEY or Firecrawl returned nothing
+    """
+    try:
+        firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY')
+        if not firecrawl_api_key:
+            return None
+
+        firecrawl = FirecrawlApp(api_key=firecrawl_api_key)
+        homepage_url = urljoin(base_url, '/')
+        scrape_result = firecrawl.scrape(homepage_url, formats=['markdown'])
+
+        if scrape_result and hasattr(scrape_result, 'markdown') and scrape_result.markdown:
+            clean_text = scrape_result.markdown[:10000]  # Limit to 10KB
+            return {
+                'status': 'success',
+                'url': homepage_url,
+                'content': clean_text,
+                'length': len(clean_text)
+            }
+        return None
+    except Exception as e:
+        print(f"   ⚠️  Firecrawl fallback failed: {str(e)}")
+        return None
 
 
-def scrape_website(base_url, delay=0.5):
+def fetch_sitemap_links(base_url, timeout=5, page_cache=None, delay=0):
     """
-    Scrape common pages from a website.
+    Same-site page links from a site's sitemap.xml.
+
+    Args:
+        base_url (str): Normalized site URL
+        timeout (int): Request timeout in seconds
+        page_cache (PageCache, optional): On-disk page cache (the parsed links are cached,
+            a missing sitemap is cached as a failure)
+        delay (float): Seconds to wait first if the request goes to the network
+
+    Returns:
+        tuple: ((url, "") tuples, empty if there is no readable sitemap; whether a request was made)
+    """
+    url = urljoin(base_url, SITEMAP_PATH)
+    key = cache_key(url)
+    cached = page_cache.lookup(key) if page_cache else None
+    if cached and cached["fresh"]:
+        return cached["links"] or [], False
+
+    if delay:
+        time.sleep(delay)
+
+    try:
+        response = requests.get(url, headers={**REQUEST_HEADERS, **conditional_headers(cached)}, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        if page_cache:
+            page_cache.put(key, url, 0, TIMEOUT_ERROR if isinstance(e, requests.exceptions.Timeout) else str(e)[:100])
+        return [], True
+
+    if response.status_code == 304 and cached:
+        page_cache.touch(key)
+        return cached["links"] or [], True
+    if response.status_code != 200:
+        if page_cache and response.status_code != 429:
+            page_cache.put(key, url, response.status_code, f'HTTP {response.status_code}')
+        return [], True
+
+    links = parse_sitemap(response.text, base_url)
+    if page_cache:
+        page_cache.put(key, url, 200, "", etag=response.headers.get('ETag'),
+                       last_modified=response.headers.get('Last-Modified'), links=links)
+    return links, True
+
+
+def scrape_website(base_url, delay=0.5, discover_links=True, max_candidates=MAX_CANDIDATES, page_cache=None,
+                   parse_pool=None):
+    """
+    Scrape the homepage and the most promising other pages of a website.
+
+    With discover_links, the pages tried after the homepage are the best matches among
+    its own links (or its sitemap.xml if the links show nothing), and COMMON_PATHS
+    are only guessed when discovery finds nothing.
 
     Args:
         base_url (str): Base URL of the website
         delay (float): Delay between requests in seconds
+        discover_links (bool): Find candidate pages from the homepage's links and sitemap
+        max_candidates (int): Discovered pages to try at most
+        page_cache (PageCache, optional): On-disk page cache (see scrape_page())
+        parse_pool (ParsePool, optional): Worker processes to parse pages in (see scrape_page())
 
     Returns:
-        dict: Scraped pages with content
+        dict: Scraped pages with content, plus the number of network requests made and
+            how the pages after the homepage were chosen ("anchors", "sitemap" or "guessed")
     """
-    # Common page paths prioritized by personalization value (scrape until we get 1 good page + homepage)
-    common_paths = [
-        '/',                  # Homepage (ALWAYS scrape)
-        '/case-studies',      # Best: specific client work and results
-        '/casestudies',       # Best: alternate spelling
-        '/testimonials',      # Best: client names and outcomes
-        '/reviews',           # Good: client feedback and ratings
-        '/portfolio',         # Good: recent projects and clients
-        '/clients',           # Good: notable client names
-        '/our-clients',       # Good: alternate naming
-        '/projects',          # Good: specific work examples
-        '/our-work',          # Good: alternate naming
-        '/work',              # Medium: examples of work
-        '/success-stories',   # Good: detailed client outcomes
-        '/success',           # Good: alternate naming
-        '/about',             # Medium: company background
-        '/about-us',          # Medium: alternate naming
-        '/customer-stories',  # Good: customer case studies
-        '/case-study',        # Good: singular form
-        '/client-success'     # Good: client outcomes
-    ]
-
     base_url = normalize_url(base_url)
     if not base_url:
         return {'status': 'error', 'error': 'Invalid URL'}
@@ -183,54 +327,36 @@ def scrape_website(base_url, delay=0.5):
     scraped_pages = []
     homepage_scraped = False
     firecrawl_fallback_attempted = False
-
-    for i, path in enumerate(common_paths):
-        url = urljoin(base_url, path)
-
-        # Add delay between requests (polite scraping)
-        if i > 0:  # Skip delay for first request
-            time.sleep(delay)
-
-        result = scrape_page(url)
+    requests_made = 0
+    discovered_via = None
+
+    # The homepage first; the rest of the list is decided once it is in
+    urls = [urljoin(base_url, COMMON_PATHS[0])]
+    i = 0
+    while i < len(urls):
+        url = urls[i]
+
+        # Delay between requests (polite scraping); skipped for the first request and cache hits
+        result = scrape_page(url, with_links=discover_links and i == 0, page_cache=page_cache,
+                             delay=delay if i > 0 else 0, parse_pool=parse_pool)
+        if not result.pop('cached', False):
+            requests_made += 1
+        homepage_links = result.pop('links', None)
 
         if result['status'] == 'success':
             scraped_pages.append(result)
-            if path == '/':
+            if i == 0:
                 homepage_scraped = True
 
-        # If blocked, try Firecrawl fallback (bypasses anti-bot protection)
+        # If blocked, try Firecrawl fallback for the homepage (most important page)
         if result['status'] in ['blocked', 'rate_limited'] and not firecrawl_fallback_attempted:
             firecrawl_fallback_attempted = True
-
-            try:
-                # Try Firecrawl for the homepage only (most important page)
-                firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY')
-                if firecrawl_api_key:
-                    firecrawl = FirecrawlApp(api_key=firecrawl_api_key)
-                    homepage_url = urljoin(base_url, '/')
-
-                    # Scrape with Firecrawl (uses headless browser to bypass blocks)
-                    scrape_result = firecrawl.scrape(homepage_url, formats=['markdown'])
-
-                    if scrape_result and hasattr(scrape_result, 'markdown') and scrape_result.markdown:
-                        clean_text = scrape_result.markdown[:10000]  # Limit to 10KB
-                        scraped_pages.append({
-                            'status': 'success',
-                            'url': homepage_url,
-                            'content': clean_text,
-                            'length': len(clean_text)
-                        })
-                        homepage_scraped = True
-                    else:
-                        # Firecrawl failed, stop trying
-                        break
-                else:
-                    # No Firecrawl API key, stop trying
-                    break
-            except Exception as e:
-                # Firecrawl failed, stop trying
-                print(f"   ⚠️  Firecrawl fallback failed: {str(e)}")
+            page = firecrawl_homepage(base_url)
+            if not page:
+                # No API key or Firecrawl failed, stop trying
                 break
+            scraped_pages.append(page)
+            homepage_scraped = True
         elif result['status'] in ['blocked', 'rate_limited']:
             # Already tried Firecrawl, stop
             break
@@ -239,11 +365,30 @@ def scrape_website(base_url, delay=0.5):
         if homepage_scraped and len(scraped_pages) >= 2:
             break
 
+        if i == 0:
+            candidates = []
+            if homepage_links is not None:
+                candidates = rank_links(homepage_links, max_candidates)
+                discovered_via = 'anchors'
+                if not candidates:
+                    sitemap_links, requested = fetch_sitemap_links(base_url, page_cache=page_cache, delay=delay)
+                    requests_made += requested
+                    candidates = rank_links(sitemap_links, max_candidates)
+                    discovered_via = 'sitemap'
+            if candidates:
+                urls += [candidate for candidate, _ in candidates]
+            else:
+                urls += [urljoin(base_url, path) for path in COMMON_PATHS[1:]]
+                discovered_via = 'guessed'
+        i += 1
+
     return {
         'status': 'success' if scraped_pages else 'failed',
         'base_url': base_url,
         'pages_scraped': len(scraped_pages),
-        'pages': scraped_pages
+        'pages': scraped_pages,
+        'requests': requests_made,
+        'discovered_via': discovered_via
     }
 
 
@@ -384,7 +529,7 @@ Return ONLY the JSON, no other text."""
         }
 
 
-def enrich_lead(lead, api_key, delay=0.5):
+def enrich_lead(lead, api_key, delay=0.5, scraped_data=None, discover_links=True, page_cache=None):
     """
     Enrich a single lead with personalization data.
 
@@ -392,6 +537,10 @@ def enrich_lead(lead, api_key, delay=0.5):
         lead (dict): Lead data
         api_key (str): Anthropic API key
         delay (float): Delay between page requests
+        scraped_data (dict, optional): The website already crawled (AsyncCrawler);
+            scraped here with scrape_website() if not given
+        discover_links (bool): Pick pages from the homepage's links (see scrape_website())
+        page_cache (PageCache, optional): On-disk page cache (see scrape_page())
 
     Returns:
         dict: Enriched lead with personalization
@@ -407,7 +556,8 @@ def enrich_lead(lead, api_key, delay=0.5):
         }
 
     # Scrape website
-    scraped_data = scrape_website(website, delay=delay)
+    if scraped_data is None:
+        scraped_data = scrape_website(website, delay=delay, discover_links=discover_links, page_cache=page_cache)
 
     if scraped_data['status'] != 'success':
         return {
@@ -430,19 +580,43 @@ def enrich_lead(lead, api_key, delay=0.5):
     }
 
 
-def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5):
+def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5, store_file=None, leads=None,
+                 crawler="async", crawl_concurrency=200, discover_links=True,
+                 page_cache_file=DEFAULT_PAGE_CACHE_FILE, page_cache_ttl=7, page_cache_negative_ttl=1,
+                 fetch_workers=20, parse_workers=None):
     """
     Enrich all leads with personalization data.
 
+    With crawler="async", websites are crawled by one AsyncCrawler event loop
+    (crawl_concurrency sites at once, politeness per host); crawler="threads" runs
+    scrape_website() on fetch_workers threads. Either way the AI extraction runs on
+    the batch_size worker threads, and fetched pages are parsed on parse_workers
+    processes.
+
     Args:
         input_file (str): Path to input JSON file with leads
         output_file (str): Path to output JSON file with enriched leads
         report_file (str): Path to enrichment report JSON file
-        batch_size (int): Number of concurrent enrichment tasks
-        delay (float): Delay between page requests
+        batch_size (int): Number of concurrent AI extractions
+        delay (float): Delay between page requests (to the same host, with the async crawler)
+        store_file (str, optional): SQLite lead store to record each lead's personalization in
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; the enriched leads are then returned in result["leads"]
+        crawler (str): "async" (default) or "threads"
+        crawl_concurrency (int): Websites crawled at once by the async crawler
+        discover_links (bool): Pick pages from each homepage's links and sitemap instead
+            of probing COMMON_PATHS (see scrape_website())
+        page_cache_file (str, optional): On-disk page cache shared across runs and retries,
+            None to disable
+        page_cache_ttl (float): Days a cached page is used before it is revalidated
+        page_cache_negative_ttl (float): Days a failed fetch (404, timeout...) is cached
+        fetch_workers (int): Threads fetching websites with the threads crawler
+        parse_workers (int, optional): Processes decoding and parsing pages (default: the
+            number of cores); 0 parses in the fetching threads
 
     Returns:
-        dict: Enrichment summary with statistics
+        dict: Enrichment summary with statistics, fetch/parse utilisation (and crawl
+            throughput with the async crawler)
     """
     # Check API key
     api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -452,54 +626,29 @@ def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5):
             "message": "ANTHROPIC_API_KEY not found in .env file"
         }
 
-    # Load leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
+    if leads is None and not os.path.exists(input_file):
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
-        return {
-            "status": "error",
-            "message": f"Invalid JSON in file: {input_file}"
-        }
 
-    if not leads:
-        return {
-            "status": "error",
-            "message": "No leads found in input file"
-        }
-
-    # Pre-filter: separate leads with and without websites
-    leads_with_website = []
-    leads_without_website = []
-
-    for lead in leads:
-        website = lead.get("company_website") or lead.get("website") or ""
-        if website and website.strip():
-            leads_with_website.append(lead)
-        else:
-            # Mark as no_website upfront
-            leads_without_website.append({
-                **lead,
-                'personalization': None,
-                'personalization_status': 'no_website'
-            })
-
-    print(f"🎯 Enriching {len(leads)} leads with personalization data...")
-    print(f"   Leads with websites: {len(leads_with_website)}")
-    print(f"   Leads without websites: {len(leads_without_website)} (skipped)")
-    print(f"   Batch size: {batch_size} concurrent tasks")
-    print(f"   Page delay: {delay}s between requests")
+    print(f"🎯 Enriching leads from {input_file} with personalization data...")
+    if page_cache_file:
+        print(f"   Page cache: {page_cache_file} ({page_cache_ttl}d, failures {page_cache_negative_ttl}d)")
+    if crawler == "async":
+        print(f"   Crawler: async, {crawl_concurrency} websites at once, {delay}s between requests per host")
+    else:
+        print(f"   Crawler: {fetch_workers} fetch threads, {delay}s between requests")
+    print(f"   AI extraction: {batch_size} concurrent tasks")
+    if parse_workers == 0:
+        print("   HTML parsing: in the fetching threads")
+    else:
+        print(f"   HTML parsing: {parse_workers or os.cpu_count()} worker processes")
     print()
 
-    enriched_leads = []
     enrichment_details = []
     stats = {
-        "total": len(leads),
+        "total": 0,
         "success": 0,
         "no_website": 0,
         "scrape_failed": 0,
@@ -508,75 +657,152 @@ def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5):
         "medium_confidence": 0,
         "low_confidence": 0
     }
+    completed = 0
+
+    def record_enriched(enriched_lead, writer):
+        nonlocal completed
+        completed += 1
+        writer.write(enriched_lead)
+
+        company_name = enriched_lead.get("company_name_normalized") or enriched_lead.get("company_name") or "Unknown"
+        status = enriched_lead.get('personalization_status', 'unknown')
+        personalization = enriched_lead.get('personalization')
+        confidence = enriched_lead.get('personalization_confidence', 'none')
+
+        # Update stats
+        if status == 'no_website':
+            stats['no_website'] += 1
+            icon = "⚠️"
+        elif status == 'scrape_failed':
+            stats['scrape_failed'] += 1
+            icon = "❌"
+        elif status == 'success' and personalization:
+            stats['success'] += 1
+            if confidence == 'high':
+                stats['high_confidence'] += 1
+                icon = "✅"
+            elif confidence == 'medium':
+                stats['medium_confidence'] += 1
+                icon = "✅"
+            else:
+                stats['low_confidence'] += 1
+                icon = "⚠️"
+        else:
+            stats['no_personalization'] += 1
+            icon = "⚠️"
 
-    # Add no_website leads to enriched_leads and details (already processed)
-    for lead in leads_without_website:
-        company_name = lead.get("company_name_normalized") or lead.get("company_name") or "Unknown"
-        stats['no_website'] += 1
+        # Store enrichment details
         enrichment_details.append({
             'company': company_name,
-            'status': 'no_website',
-            'personalization': None,
-            'confidence': 'none',
-            'pages_scraped': 0
+            'status': status,
+            'personalization': personalization,
+            'confidence': confidence,
+            'pages_scraped': enriched_lead.get('pages_scraped', 0)
         })
 
-    # Process leads with websites in parallel
-    with ThreadPoolExecutor(max_workers=batch_size) as executor:
-        future_to_lead = {
-            executor.submit(enrich_lead, lead, api_key, delay): lead
-            for lead in leads_with_website
-        }
-
-        for i, future in enumerate(as_completed(future_to_lead), 1):
-            enriched_lead = future.result()
-            enriched_leads.append(enriched_lead)
+        # Print progress
+        preview = personalization[:60] + "..." if personalization and len(personalization) > 60 else personalization or "None"
+        print(f"   {icon} [{completed}] {company_name}: {preview}")
+
+    # Process leads with websites in parallel, keeping only a few batches in flight
+    # so the input is streamed rather than loaded whole
+    started_at = time.monotonic()
+    cpu_started_at = time.process_time()
+    page_cache = PageCache(page_cache_file, ttl_days=page_cache_ttl,
+                           negative_ttl_days=page_cache_negative_ttl) if page_cache_file else None
+    parse_pool = ParsePool(parse_workers, to_text=html_to_text) if parse_workers != 0 else None
+    site_crawler = None
+    fetch_executor = None
+    if crawler == "async":
+        site_crawler = AsyncCrawler(COMMON_PATHS, html_to_text, fallback=firecrawl_homepage,
+                                    concurrency=crawl_concurrency, delay=delay, headers=REQUEST_HEADERS,
+                                    discover_links=discover_links, page_cache=page_cache, parse_pool=parse_pool)
+        max_in_flight = max(crawl_concurrency * 2, batch_size * 4)
+    else:
+        fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers)
+        max_in_flight = max(fetch_workers * 2, batch_size * 4)
+
+    # Seconds the fetch threads spent on websites (threads crawler)
+    fetch_busy = {"seconds": 0.0}
+    fetch_lock = threading.Lock()
+
+    def fetch_site(website):
+        started = time.monotonic()
+        try:
+            return scrape_website(website, delay=delay, discover_links=discover_links, page_cache=page_cache,
+                                  parse_pool=parse_pool)
+        finally:
+            with fetch_lock:
+                fetch_busy["seconds"] += time.monotonic() - started
+
+    # Crawl futures still running -> their leads (with the async crawler, leads at the same
+    # website share one crawl); once a crawl is done each lead goes to the executor for AI extraction
+    crawling = {}
 
-            company_name = enriched_lead.get("company_name_normalized") or enriched_lead.get("company_name") or "Unknown"
-            status = enriched_lead.get('personalization_status', 'unknown')
-            personalization = enriched_lead.get('personalization')
-            confidence = enriched_lead.get('personalization_confidence', 'none')
-
-            # Update stats
-            if status == 'no_website':
-                stats['no_website'] += 1
-                icon = "⚠️"
-            elif status == 'scrape_failed':
-                stats['scrape_failed'] += 1
-                icon = "❌"
-            elif status == 'success' and personalization:
-                stats['success'] += 1
-                if confidence == 'high':
-                    stats['high_confidence'] += 1
-                    icon = "✅"
-                elif confidence == 'medium':
-                    stats['medium_confidence'] += 1
-                    icon = "✅"
+    try:
+        with LeadWriter(output_file, keep=leads is not None) as writer, ThreadPoolExecutor(max_workers=batch_size) as executor:
+            if site_crawler:
+                site_crawler.start()
+
+            def handle_done(done):
+                for future in done:
+                    waiting = crawling.pop(future, None)
+                    if waiting is not None:
+                        for lead in waiting:
+                            pending.add(executor.submit(enrich_lead, lead, api_key, delay, future.result()))
+                    else:
+                        record_enriched(future.result(), writer)
+
+            pending = set()
+            for lead in (leads if leads is not None else iter_leads(input_file)):
+                stats["total"] += 1
+                website = lead.get("company_website") or lead.get("website") or ""
+                if not website or not website.strip():
+                    # No website: nothing to scrape, mark it and pass it through
+                    record_enriched({
+                        **lead,
+                        'personalization': None,
+                        'personalization_status': 'no_website'
+                    }, writer)
+                    continue
+
+                if site_crawler:
+                    future = site_crawler.submit(normalize_url(website))
                 else:
-                    stats['low_confidence'] += 1
-                    icon = "⚠️"
-            else:
-                stats['no_personalization'] += 1
-                icon = "⚠️"
-
-            # Store enrichment details
-            enrichment_details.append({
-                'company': company_name,
-                'status': status,
-                'personalization': personalization,
-                'confidence': confidence,
-                'pages_scraped': enriched_lead.get('pages_scraped', 0)
-            })
-
-            # Print progress
-            preview = personalization[:60] + "..." if personalization and len(personalization) > 60 else personalization or "None"
-            print(f"   {icon} [{i}/{len(leads_with_website)}] {company_name}: {preview}")
-
-    # Add no_website leads to final output
-    enriched_leads.extend(leads_without_website)
+                    future = fetch_executor.submit(fetch_site, website)
+                crawling.setdefault(future, []).append(lead)
+                pending.add(future)
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    handle_done(done)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                handle_done(done)
+    except LeadFileError:
+        return {
+            "status": "error",
+            "message": f"Invalid JSON in file: {input_file}"
+        }
+    finally:
+        if site_crawler:
+            site_crawler.close()
+        if fetch_executor:
+            fetch_executor.shutdown(wait=True)
+        if parse_pool:
+            parse_pool.close()
+        if page_cache:
+            page_cache.close()
+
+    if not stats["total"]:
+        os.remove(output_file)
+        return {
+            "status": "error",
+            "message": "No leads found in input file"
+        }
 
     # Calculate percentages
-    success_percentage = (stats['success'] / len(leads) * 100) if len(leads) > 0 else 0
+    success_percentage = (stats['success'] / stats['total'] * 100) if stats['total'] > 0 else 0
 
     # Create report
     report = {
@@ -587,17 +813,42 @@ def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5):
         },
         "enrichment_details": enrichment_details
     }
-
-    # Save enriched leads
-    os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(enriched_leads, f, indent=2, ensure_ascii=False)
+    if site_crawler:
+        report["crawl"] = site_crawler.stats()
+
+    # Utilisation: are the fetchers kept busy, and is parsing still the bottleneck?
+    seconds = time.monotonic() - started_at
+    parse_stats = parse_pool.stats() if parse_pool else {}
+    if site_crawler:
+        fetch_slots, fetch_utilisation = crawl_concurrency, report["crawl"]["slot_utilisation"]
+    else:
+        fetch_slots = fetch_workers
+        fetch_utilisation = round(fetch_busy["seconds"] / (seconds * fetch_workers), 3) if seconds else 0
+    main_cpu_seconds = time.process_time() - cpu_started_at
+    report["utilisation"] = {
+        "seconds": round(seconds, 2),
+        "fetch_workers": fetch_slots,
+        "fetch_utilisation": fetch_utilisation,
+        "parse_workers": parse_stats.get("workers", 0),
+        "parse_cpu_seconds": parse_stats.get("cpu_seconds", 0),
+        "parse_wait_seconds": parse_stats.get("wait_seconds", 0),
+        "parse_utilisation": parse_stats.get("utilisation", 0),
+        "main_process_cpu_seconds": round(main_cpu_seconds, 2),
+        "main_process_cpu_utilisation": round(main_cpu_seconds / seconds, 3) if seconds else 0
+    }
 
     # Save report
     os.makedirs(os.path.dirname(report_file) if os.path.dirname(report_file) else ".tmp", exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
 
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            store.record_personalization(writer.leads if writer.leads is not None else iter_leads(output_file))
+        finally:
+            store.close()
+
     # Print summary
     print("\n" + "="*60)
     print(f"📊 Personalization Enrichment Summary:")
@@ -609,8 +860,25 @@ def enrich_leads(input_file, output_file, report_file, batch_size=5, delay=0.5):
     print(f"   ⚠️  No personalization: {stats['no_personalization']}")
     print(f"   ⚠️  No website: {stats['no_website']}")
     print(f"   ❌ Scrape failed: {stats['scrape_failed']}")
+    if site_crawler:
+        crawl = report["crawl"]
+        print(f"   🌐 Crawled {crawl['domains']} websites ({crawl['pages']} pages, {crawl['requests']} requests) "
+              f"in {crawl['seconds']}s: {crawl['domains_per_second']} domains/s")
+        if page_cache_file:
+            print(f"      Page cache: {crawl['cache_hits']} hits, {crawl['revalidated']} revalidated (304)")
+        print(f"      {crawl['requests_per_domain']} requests/domain; pages chosen from "
+              f"{', '.join(f'{source}: {count}' for source, count in crawl['discovered_via'].items()) or 'none'}")
+    utilisation = report["utilisation"]
+    print(f"   ⚙️  Utilisation: fetch {utilisation['fetch_utilisation']:.0%} of {utilisation['fetch_workers']} "
+          f"{'slots' if site_crawler else 'threads'}, parse {utilisation['parse_utilisation']:.0%} of "
+          f"{utilisation['parse_workers']} processes, main process {utilisation['main_process_cpu_utilisation']:.0%} of a core")
     print(f"\n   Enriched leads saved to: {output_file}")
     print(f"   Report saved to: {report_file}")
+    if store_file:
+        print(f"   Personalization recorded in lead store: {store_file}")
+
+    if writer.leads is not None:
+        report["leads"] = writer.leads
 
     return report
 
@@ -622,6 +890,21 @@ def main():
     parser.add_argument("--report", default=".tmp/personalization_report.json", help="Enrichment report output file")
     parser.add_argument("--batch-size", type=int, default=15, help="Number of concurrent enrichment tasks (default: 15)")
     parser.add_argument("--delay", type=float, default=0.2, help="Delay between page requests in seconds (default: 0.2)")
+    parser.add_argument("--store", help="Also record results in this SQLite lead store (e.g. .tmp/leads.sqlite)")
+    parser.add_argument("--crawler", choices=["async", "threads"], default="async",
+                        help="Crawl websites on one asyncio loop (default) or on --fetch-workers threads")
+    parser.add_argument("--crawl-concurrency", type=int, default=200, help="Websites the async crawler crawls at once (default: 200)")
+    parser.add_argument("--no-link-discovery", action="store_true",
+                        help="Probe the fixed list of common paths instead of following the homepage's links")
+    parser.add_argument("--page-cache", default=DEFAULT_PAGE_CACHE_FILE, help=f"On-disk page cache (default: {DEFAULT_PAGE_CACHE_FILE})")
+    parser.add_argument("--no-page-cache", action="store_true", help="Always download every page")
+    parser.add_argument("--page-cache-ttl", type=float, default=7, help="Days before a cached page is revalidated (default: 7)")
+    parser.add_argument("--page-cache-negative-ttl", type=float, default=1,
+                        help="Days a failed fetch (404, timeout) is cached (default: 1)")
+    parser.add_argument("--fetch-workers", type=int, default=20,
+                        help="Threads fetching websites with --crawler threads (default: 20)")
+    parser.add_argument("--parse-workers", type=int,
+                        help="Processes decoding and parsing pages (default: number of cores; 0 parses in the fetching threads)")
 
     args = parser.parse_args()
 
@@ -630,7 +913,16 @@ def main():
         output_file=args.output,
         report_file=args.report,
         batch_size=args.batch_size,
-        delay=args.delay
+        delay=args.delay,
+        store_file=args.store,
+        crawler=args.crawler,
+        crawl_concurrency=args.crawl_concurrency,
+        discover_links=not args.no_link_discovery,
+        page_cache_file=None if args.no_page_cache else args.page_cache,
+        page_cache_ttl=args.page_cache_ttl,
+        page_cache_negative_ttl=args.page_cache_negative_ttl,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers
     )
 
     # Print result as JSON
@@ -11,6 +11,7 @@ import json
 import argparse
 from datetime import datetime
 from dotenv import load_dotenv
+from lead_io import read_leads
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -101,14 +102,13 @@ def export_to_sheets(input_file, sheet_title=None, segments_file=None):
 
     # Load leads
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
+        leads = read_leads(input_file)
     except FileNotFoundError:
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
+    except ValueError:
         return {
             "status": "error",
             "message": f"Invalid JSON in file: {input_file}"
@@ -4,6 +4,9 @@ Filter validated leads based on validation report.
 Removes leads that failed ICP validation (marked as valid: false in validation report).
 This is run after full scrape validation to ensure only quality leads proceed to next steps.
 
+Leads are streamed from input to output one at a time (JSON array or NDJSON in,
+format chosen by the output extension).
+
 Usage:
     python filter_validated_leads.py --input .tmp/full_leads.json --validation .tmp/full_validation_report.json --output .tmp/full_leads_filtered.json --report .tmp/filter_report.json
 """
@@ -12,40 +15,74 @@ import os
 import sys
 import json
 import argparse
+import itertools
 from collections import defaultdict
+from lead_io import iter_leads, LeadWriter, LeadFileError
+from lead_store import LeadStore, lead_id_for, LOOKUP_CHUNK
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 
-def find_validation_for_lead(lead, validation_details):
+def lead_email(lead):
     """
-    Find the validation entry for a given lead.
-
-    Match by company_name + email as unique identifier.
+    Lowercased email of a lead (email or contact_email), or '' if it has none.
 
     Args:
         lead (dict): Lead data
-        validation_details (list): List of validation results
 
     Returns:
-        dict: Matching validation detail or None
+        str: Normalized email
+    """
+    return (lead.get('email') or lead.get('contact_email') or '').strip().lower()
+
+
+def build_validation_index(validation_details):
     """
-    company_name = lead.get('company_name') or lead.get('companyName') or ''
-    email = lead.get('email') or lead.get('contact_email') or ''
+    Index validation details by lead ID, with an email index as fallback.
+
+    Reports written before lead IDs existed carry no "lead_id", so the ID is derived
+    from the detail's lead data the same way it is at ingest.
+
+    Args:
+        validation_details (list): List of validation results
 
+    Returns:
+        dict: {"by_id": {lead_id: detail}, "by_email": {email: detail}}
+    """
+    by_id = {}
+    by_email = {}
     for detail in validation_details:
-        detail_company = detail.get('company', '')
-        detail_email = detail.get('data', {}).get('email', '') or detail.get('data', {}).get('contact_email', '')
+        data = detail.get('data') or {}
+        by_id.setdefault(detail.get('lead_id') or lead_id_for(data), detail)
+        email = lead_email(data)
+        if email:
+            by_email.setdefault(email, detail)
+
+    return {"by_id": by_id, "by_email": by_email}
+
+
+def find_validation_for_lead(lead, validation_index):
+    """
+    Find the validation entry for a given lead.
+
+    Match by lead ID, falling back to email. Company name is not used: contacts at
+    the same company are validated (and kept or removed) individually.
 
-        # Match by company name (primary) or email (secondary)
-        if company_name and company_name.lower() == detail_company.lower():
-            return detail
-        if email and email.lower() == detail_email.lower():
-            return detail
+    Args:
+        lead (dict): Lead data
+        validation_index (dict): Index from build_validation_index()
 
-    return None
+    Returns:
+        dict: Matching validation detail or None
+    """
+    detail = validation_index["by_id"].get(lead_id_for(lead))
+    if detail is None:
+        email = lead_email(lead)
+        if email:
+            detail = validation_index["by_email"].get(email)
+    return detail
 
 
 def extract_primary_reason(reason_text):
@@ -74,101 +111,131 @@ def extract_primary_reason(reason_text):
         return 'other'
 
 
-def filter_validated_leads(input_file, validation_report_file, output_file, report_file):
+def filter_validated_leads(input_file, validation_report_file, output_file, report_file, store_file=None,
+                           leads=None, validation_details=None):
     """
     Filter leads based on validation report, keeping only valid leads.
 
+    Verdicts are joined by lead ID through a hash index over the report. With a lead
+    store, verdicts are looked up in the store first and the report is only consulted
+    for leads the store has no verdict for.
+
     Args:
         input_file (str): Path to input leads JSON file
-        validation_report_file (str): Path to validation report JSON file
+        validation_report_file (str): Path to validation report JSON file (optional with store_file)
         output_file (str): Path to output filtered leads JSON file
         report_file (str): Path to filter report JSON file
+        store_file (str, optional): SQLite lead store holding validation verdicts
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; the kept leads are then returned in result["leads"]
+        validation_details (list, optional): The validation report's details, already in memory
 
     Returns:
         dict: Filter results with statistics
     """
 
     # Check if validation report exists
-    if not os.path.exists(validation_report_file):
+    if not store_file and not validation_report_file and validation_details is None:
         return {
             "status": "error",
-            "message": f"Validation report file not found: {validation_report_file}"
+            "message": "Either a validation report or a lead store is required"
         }
-
-    # Load leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
+    if validation_details is None and validation_report_file and not os.path.exists(validation_report_file):
         return {
             "status": "error",
-            "message": f"Input file not found: {input_file}"
+            "message": f"Validation report file not found: {validation_report_file}"
         }
-    except json.JSONDecodeError:
+
+    if leads is None and not os.path.exists(input_file):
         return {
             "status": "error",
-            "message": f"Invalid JSON in input file: {input_file}"
+            "message": f"Input file not found: {input_file}"
         }
 
     # Load validation report
+    if validation_details is None and validation_report_file:
+        try:
+            with open(validation_report_file, 'r', encoding='utf-8') as f:
+                validation_report = json.load(f)
+        except json.JSONDecodeError:
+            return {
+                "status": "error",
+                "message": f"Invalid JSON in validation report: {validation_report_file}"
+            }
+        validation_details = validation_report.get('validation_details', [])
+    validation_details = validation_details or []
+    validation_index = build_validation_index(validation_details)
+
+    store = LeadStore(store_file) if store_file else None
+
+    original_count = 0
+    removal_reasons = defaultdict(int)
+
+    if store:
+        print(f"🔍 Filtering leads from {input_file} using verdicts in lead store {store_file}...")
+    elif not validation_details:
+        print("⚠️  Warning: No validation details found in report, keeping all leads")
+    else:
+        print(f"🔍 Filtering leads from {input_file} based on validation report...")
+
+    # Filter leads, streaming them straight to the output
     try:
-        with open(validation_report_file, 'r', encoding='utf-8') as f:
-            validation_report = json.load(f)
-    except json.JSONDecodeError:
+        with LeadWriter(output_file, keep=leads is not None) as writer:
+            source = iter(leads) if leads is not None else iter_leads(input_file)
+            while True:
+                chunk = list(itertools.islice(source, LOOKUP_CHUNK))
+                if not chunk:
+                    break
+                stored_verdicts = store.validation_for(lead_id_for(lead) for lead in chunk) if store else {}
+
+                for lead in chunk:
+                    original_count += 1
+
+                    if not store and not validation_details:
+                        writer.write(lead)
+                        continue
+
+                    # Find matching validation detail (store first, then the report)
+                    validation_detail = stored_verdicts.get(lead_id_for(lead)) if store else None
+                    if validation_detail is None and validation_details:
+                        validation_detail = find_validation_for_lead(lead, validation_index)
+
+                    if validation_detail and validation_detail.get('valid'):
+                        # Lead passed validation
+                        writer.write(lead)
+                        continue
+
+                    # Lead failed validation or not found in report
+                    if validation_detail and validation_detail.get('validation_error'):
+                        reason = 'validation_error'
+                    elif validation_detail:
+                        reason = extract_primary_reason(validation_detail.get('reason') or 'unknown')
+                    else:
+                        reason = 'not_in_validation_report'
+
+                    removal_reasons[reason] += 1
+    except LeadFileError:
         return {
             "status": "error",
-            "message": f"Invalid JSON in validation report: {validation_report_file}"
+            "message": f"Invalid JSON in input file: {input_file}"
         }
+    finally:
+        if store:
+            store.close()
 
-    validation_details = validation_report.get('validation_details', [])
-
-    if not validation_details:
-        print("⚠️  Warning: No validation details found in report, keeping all leads")
-        filtered_leads = leads
-        removed_leads = []
-        removal_reasons = {}
-    else:
-        # Filter leads
-        filtered_leads = []
-        removed_leads = []
-        removal_reasons = defaultdict(int)
-
-        print(f"🔍 Filtering {len(leads)} leads based on validation report...")
-
-        for lead in leads:
-            # Find matching validation detail
-            validation_detail = find_validation_for_lead(lead, validation_details)
-
-            if validation_detail and validation_detail.get('valid'):
-                # Lead passed validation
-                filtered_leads.append(lead)
-            else:
-                # Lead failed validation or not found in report
-                removed_leads.append(lead)
-
-                if validation_detail:
-                    reason = extract_primary_reason(validation_detail.get('reason', 'unknown'))
-                else:
-                    reason = 'not_in_validation_report'
-
-                removal_reasons[reason] += 1
-
-    # Save filtered leads
-    os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(filtered_leads, f, indent=2, ensure_ascii=False)
+    filtered_count = writer.count
 
     # Generate filter report
     filter_report = {
         "status": "success",
-        "original_count": len(leads),
-        "filtered_count": len(filtered_leads),
-        "removed_count": len(removed_leads),
+        "original_count": original_count,
+        "filtered_count": filtered_count,
+        "removed_count": original_count - filtered_count,
         "removal_reasons": dict(removal_reasons),
         "input_file": input_file,
         "output_file": output_file,
         "validation_report": validation_report_file,
-        "quality_percentage": round((len(filtered_leads) / len(leads)) * 100, 1) if leads else 0
+        "quality_percentage": round((filtered_count / original_count) * 100, 1) if original_count else 0
     }
 
     # Save filter report
@@ -179,9 +246,9 @@ def filter_validated_leads(input_file, validation_report_file, output_file, repo
     # Print summary
     print("\n" + "="*50)
     print(f"📊 Filter Results:")
-    print(f"   Original leads: {len(leads)}")
-    print(f"   Filtered leads: {len(filtered_leads)} ({filter_report['quality_percentage']}%)")
-    print(f"   Removed leads: {len(removed_leads)}")
+    print(f"   Original leads: {original_count}")
+    print(f"   Filtered leads: {filtered_count} ({filter_report['quality_percentage']}%)")
+    print(f"   Removed leads: {filter_report['removed_count']}")
 
     if removal_reasons:
         print(f"\n   Removal breakdown:")
@@ -196,15 +263,19 @@ def filter_validated_leads(input_file, validation_report_file, output_file, repo
         print(f"\n⚠️  WARNING: Less than 50% of leads passed validation!")
         print(f"   Consider reviewing your ICP criteria or scrape filters.")
 
+    if writer.leads is not None:
+        filter_report["leads"] = writer.leads
+
     return filter_report
 
 
 def main():
     parser = argparse.ArgumentParser(description="Filter validated leads based on validation report")
     parser.add_argument("--input", required=True, help="Input leads JSON file")
-    parser.add_argument("--validation", required=True, help="Validation report JSON file")
+    parser.add_argument("--validation", help="Validation report JSON file (optional with --store)")
     parser.add_argument("--output", default=".tmp/full_leads_filtered.json", help="Output filtered leads file")
     parser.add_argument("--report", default=".tmp/filter_report.json", help="Filter report output file")
+    parser.add_argument("--store", help="SQLite lead store to read validation verdicts from (e.g. .tmp/leads.sqlite)")
 
     args = parser.parse_args()
 
@@ -212,7 +283,8 @@ def main():
         input_file=args.input,
         validation_report_file=args.validation,
         output_file=args.output,
-        report_file=args.report
+        report_file=args.report,
+        store_file=args.store
     )
 
     # Print result
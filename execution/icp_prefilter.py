@@ -0,0 +1,251 @@
+"""
+Deterministic firmographic pre-filter for ICP validation.
+
+Parses the --icp-location, --icp-employees and --icp-revenue values once and rejects
+leads whose country, company size or revenue fall plainly outside them, so they never
+need a Claude call. Rules are deliberately conservative:
+- Missing or unparseable lead data always passes (Claude decides)
+- Location only filters when every ICP location resolves to a known country
+- Size and revenue ranges are widened by a tolerance before checking for overlap
+
+Usage (from validate_lead_quality.py):
+    prefilter = FirmographicPrefilter(icp_criteria)
+    rejection = prefilter.check(lead)  # None if plausible, otherwise (rule, reason)
+"""
+
+import re
+
+# Common ways leads/users write the same country
+COUNTRY_ALIASES = {
+    "uk": "united kingdom",
+    "u.k.": "united kingdom",
+    "gb": "united kingdom",
+    "great britain": "united kingdom",
+    "britain": "united kingdom",
+    "england": "united kingdom",
+    "scotland": "united kingdom",
+    "wales": "united kingdom",
+    "northern ireland": "united kingdom",
+    "us": "united states",
+    "u.s.": "united states",
+    "usa": "united states",
+    "u.s.a.": "united states",
+    "united states of america": "united states",
+    "america": "united states",
+    "uae": "united arab emirates",
+    "holland": "netherlands",
+    "the netherlands": "netherlands",
+    "deutschland": "germany",
+    "republic of ireland": "ireland",
+}
+
+KNOWN_COUNTRIES = {
+    "united kingdom", "united states", "canada", "australia", "new zealand", "ireland",
+    "germany", "france", "spain", "portugal", "italy", "netherlands", "belgium",
+    "luxembourg", "switzerland", "austria", "denmark", "sweden", "norway", "finland",
+    "iceland", "poland", "czech republic", "czechia", "slovakia", "hungary", "romania",
+    "bulgaria", "greece", "croatia", "slovenia", "serbia", "ukraine", "estonia", "latvia",
+    "lithuania", "turkey", "israel", "united arab emirates", "saudi arabia", "qatar",
+    "egypt", "south africa", "nigeria", "kenya", "india", "pakistan", "singapore",
+    "malaysia", "indonesia", "philippines", "thailand", "vietnam", "japan", "south korea",
+    "china", "hong kong", "taiwan", "mexico", "brazil", "argentina", "chile", "colombia",
+    "peru",
+}
+
+MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mm": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+    "t": 1e12,
+}
+
+
+def normalize_country(value):
+    """
+    Normalise a country name or alias to its canonical lowercase name.
+
+    Args:
+        value (str): Country as written by the user or data provider
+
+    Returns:
+        str: Canonical country name (lowercase)
+    """
+    text = re.sub(r"\s+", " ", str(value or "").strip().lower())
+    return COUNTRY_ALIASES.get(text, text)
+
+
+def parse_locations(location_text):
+    """
+    Parse an ICP location string into a set of canonical countries.
+
+    Args:
+        location_text (str): e.g. "UK", "United States, Canada", "UK or Ireland"
+
+    Returns:
+        set or None: Allowed countries, or None if any part is not a known country
+                     (regions/states/cities can't be checked locally)
+    """
+    if not location_text:
+        return None
+
+    parts = re.split(r",|/|;|\s+or\s+|\s+and\s+|&", str(location_text), flags=re.IGNORECASE)
+    countries = set()
+    for part in parts:
+        if not part.strip():
+            continue
+        country = normalize_country(part)
+        if country not in KNOWN_COUNTRIES:
+            return None
+        countries.add(country)
+
+    return countries or None
+
+
+def parse_quantity(text):
+    """
+    Parse a number with an optional K/M/B suffix (e.g. "$1.5M", "500k", "10,000").
+
+    Args:
+        text (str): Quantity text
+
+    Returns:
+        float or None: Parsed value
+    """
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(thousand|million|billion|bn|mm|[kmbt])?\b", str(text).replace(",", "").lower())
+    if not match:
+        return None
+
+    value = float(match.group(1))
+    suffix = match.group(2)
+    return value * MULTIPLIERS[suffix] if suffix else value
+
+
+def parse_range(value):
+    """
+    Parse a size or revenue range into (low, high) bounds.
+
+    Handles "10-50", "$1M - $10M", "10 to 50", "between 10 and 50", "500+", "under 10",
+    "<$1M" and single values ("25", 25).
+
+    Args:
+        value (str or int or float): Range text or number
+
+    Returns:
+        tuple or None: (low, high) with high possibly float('inf'), or None if unparseable
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return (float(value), float(value))
+
+    text = str(value).strip().lower()
+    text = re.sub(r"^(?:between|from)\s+", "", text)
+
+    # Two-sided range separated by a dash, "to" or "and" ("between 10 and 50")
+    parts = re.split(r"\s*(?:-|–|—|\bto\b|\band\b)\s*", text)
+    parts = [p for p in parts if p]
+    if len(parts) == 2:
+        low, high = parse_quantity(parts[0]), parse_quantity(parts[1])
+        if low is not None and high is not None:
+            # "$1-10M" style: carry the upper bound's suffix to the lower bound
+            if re.fullmatch(r"\$?\s*\d+(?:\.\d+)?", parts[0].strip()) and high >= 1000 and low < 1000:
+                suffix = re.search(r"(thousand|million|billion|bn|mm|[kmbt])\s*$", parts[1].strip())
+                if suffix:
+                    low *= MULTIPLIERS[suffix.group(1)]
+            return (min(low, high), max(low, high))
+
+    quantity = parse_quantity(text)
+    if quantity is None:
+        return None
+
+    if text.endswith("+") or "more than" in text or "over" in text or text.startswith(">"):
+        return (quantity, float("inf"))
+    if "under" in text or "less than" in text or text.startswith("<"):
+        return (0.0, quantity)
+
+    return (quantity, quantity)
+
+
+def ranges_plausibly_overlap(lead_range, icp_range, tolerance):
+    """
+    Check whether a lead's range overlaps the ICP range widened by a tolerance.
+
+    Args:
+        lead_range (tuple): (low, high) for the lead
+        icp_range (tuple): (low, high) from the ICP
+        tolerance (float): Fractional widening of the ICP range (0.5 = 50%)
+
+    Returns:
+        bool: True if the lead is plausibly within the ICP range
+    """
+    icp_low = icp_range[0] / (1 + tolerance)
+    icp_high = icp_range[1] * (1 + tolerance)
+    return lead_range[1] >= icp_low and lead_range[0] <= icp_high
+
+
+def format_range(bounds):
+    """Format a (low, high) range for reasons and reports."""
+    low, high = bounds
+    if high == float("inf"):
+        return f"{low:,.0f}+"
+    if low == high:
+        return f"{low:,.0f}"
+    return f"{low:,.0f}-{high:,.0f}"
+
+
+class FirmographicPrefilter:
+    """
+    Rule engine that rejects leads plainly outside the ICP's location, size or revenue.
+    """
+
+    def __init__(self, icp_criteria, tolerance=0.5):
+        self.tolerance = tolerance
+        self.allowed_countries = parse_locations(icp_criteria.get('location'))
+        self.employee_range = parse_range(icp_criteria.get('employees'))
+        self.revenue_range = parse_range(icp_criteria.get('revenue'))
+
+    @property
+    def active(self):
+        """True if at least one rule could be parsed from the ICP."""
+        return bool(self.allowed_countries or self.employee_range or self.revenue_range)
+
+    def describe(self):
+        """
+        Describe the parsed rules for the validation report.
+
+        Returns:
+            dict: Parsed rules (None where a criterion is not enforced locally)
+        """
+        return {
+            "countries": sorted(self.allowed_countries) if self.allowed_countries else None,
+            "employees": format_range(self.employee_range) if self.employee_range else None,
+            "revenue": format_range(self.revenue_range) if self.revenue_range else None,
+            "tolerance": self.tolerance
+        }
+
+    def check(self, lead):
+        """
+        Check a lead against the local rules.
+
+        Args:
+            lead (dict): Lead data
+
+        Returns:
+            tuple or None: (rule, reason) if the lead is rejected, otherwise None
+        """
+        if self.allowed_countries:
+            country = lead.get("company_country") or lead.get("country") or ""
+            if country and normalize_country(country) not in self.allowed_countries:
+                return ("location", f"Pre-filter: location '{country}' is outside ICP location ({', '.join(sorted(self.allowed_countries))})")
+
+        if self.employee_range:
+            employees = parse_range(lead.get("company_size") or lead.get("employees"))
+            if employees and not ranges_plausibly_overlap(employees, self.employee_range, self.tolerance):
+                return ("employees", f"Pre-filter: employee count {format_range(employees)} is far outside ICP range {format_range(self.employee_range)}")
+
+        if self.revenue_range:
+            revenue = parse_range(lead.get("company_annual_revenue_clean") or lead.get("revenue"))
+            if revenue and not ranges_plausibly_overlap(revenue, self.revenue_range, self.tolerance):
+                return ("revenue", f"Pre-filter: revenue {format_range(revenue)} is far outside ICP range {format_range(self.revenue_range)}")
+
+        return None
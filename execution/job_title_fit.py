@@ -0,0 +1,153 @@
+"""
+Local (no API) job title fit scoring for ICP validation.
+
+Company fit is scored by Claude once per company; each contact's job title is scored
+here against the --icp-job-title targets, then the two are merged into the lead's
+match percentage.
+
+Usage (from validate_lead_quality.py):
+    score, note = score_job_title("Managing Director", "CEO, Founder, Managing Director")
+"""
+
+import re
+
+# Abbreviations expanded before comparing titles
+TITLE_ABBREVIATIONS = {
+    "ceo": "chief executive officer",
+    "coo": "chief operating officer",
+    "cfo": "chief financial officer",
+    "cto": "chief technology officer",
+    "cmo": "chief marketing officer",
+    "cro": "chief revenue officer",
+    "md": "managing director",
+    "gm": "general manager",
+    "vp": "vice president",
+    "svp": "senior vice president",
+    "evp": "executive vice president",
+    "ops": "operations",
+    "mgr": "manager",
+    "dir": "director",
+    "biz": "business",
+    "bd": "business development",
+}
+
+# Seniority tiers, highest first: (tier, regex patterns)
+SENIORITY_TIERS = [
+    ("owner", [r"owner", r"founder", r"co-?founder", r"proprietor", r"partner", r"principal"]),
+    ("c_level", [r"chief", r"(?<!vice )president", r"managing director", r"general manager"]),
+    ("vp_director", [r"vice president", r"director", r"head"]),
+    ("manager", [r"manager", r"lead", r"supervisor", r"superintendent"]),
+]
+
+STOPWORDS = {"of", "and", "the", "&", "for", "at", "in", "a", "an", "-", "/"}
+
+
+def normalize_title(title):
+    """
+    Lowercase a job title, strip punctuation and expand common abbreviations.
+
+    Args:
+        title (str): Raw job title
+
+    Returns:
+        str: Normalised title
+    """
+    text = re.sub(r"[^a-z0-9&/\- ]+", " ", str(title or "").lower())
+    words = [TITLE_ABBREVIATIONS.get(word, word) for word in text.split()]
+    return " ".join(" ".join(words).split())
+
+
+def title_tokens(title):
+    """Return the significant words of a normalised title."""
+    return {word for word in title.split() if word not in STOPWORDS}
+
+
+def seniority_tier(title):
+    """
+    Classify a normalised title into a seniority tier.
+
+    Args:
+        title (str): Normalised job title
+
+    Returns:
+        str or None: Tier name, or None if no seniority keyword is present
+    """
+    for tier, patterns in SENIORITY_TIERS:
+        for pattern in patterns:
+            if re.search(rf"\b{pattern}\b", title):
+                return tier
+    return None
+
+
+def parse_target_titles(job_title_criteria):
+    """
+    Split the --icp-job-title value into normalised target titles.
+
+    Args:
+        job_title_criteria (str): e.g. "CEO, Founder, Managing Director"
+
+    Returns:
+        list: Normalised target titles
+    """
+    if not job_title_criteria:
+        return []
+    parts = re.split(r",|;|\|", str(job_title_criteria))
+    parts = [p for part in parts for p in re.split(r"\s+or\s+", part, flags=re.IGNORECASE)]
+    return [normalize_title(p) for p in parts if p.strip()]
+
+
+def score_job_title(job_title, job_title_criteria=None):
+    """
+    Score how well a contact's job title fits the target roles.
+
+    Without target roles, decision-makers score highest. With targets, an exact
+    or contained match scores highest, then word overlap, then matching seniority
+    and finally a shared function word.
+
+    Args:
+        job_title (str): Contact's job title
+        job_title_criteria (str, optional): --icp-job-title value
+
+    Returns:
+        tuple: (score 0-100, short explanation)
+    """
+    title = normalize_title(job_title)
+    if not title or title == "n/a":
+        return 50, "No job title (neutral)"
+
+    tier = seniority_tier(title)
+    targets = parse_target_titles(job_title_criteria)
+
+    if not targets:
+        tier_scores = {"owner": 100, "c_level": 100, "vp_director": 85, "manager": 65}
+        score = tier_scores.get(tier, 35)
+        return score, f"{'Decision-maker' if score >= 85 else 'Not a clear decision-maker'} ({job_title})"
+
+    tokens = title_tokens(title)
+    best_score, best_note = 0, f"'{job_title}' does not match target roles"
+    for target in targets:
+        if title == target:
+            return 100, f"Exact target role ({job_title})"
+
+        if re.search(rf"\b{re.escape(target)}\b", title) or re.search(rf"\b{re.escape(title)}\b", target):
+            score, note = 90, f"Matches target role '{target}'"
+        else:
+            target_tokens = title_tokens(target)
+            overlap = len(tokens & target_tokens) / len(tokens | target_tokens) if tokens | target_tokens else 0
+            if overlap >= 0.5:
+                score, note = 75, f"Similar to target role '{target}'"
+            elif tier and tier == seniority_tier(target):
+                score, note = 60, f"Same seniority as target role '{target}'"
+            elif overlap > 0:
+                score, note = 30, f"Related function to target role '{target}'"
+            else:
+                score, note = 0, best_note
+
+        if score > best_score:
+            best_score, best_note = score, note
+
+    if best_score == 0:
+        # Senior people outside the listed roles are still worth something
+        best_score = 40 if tier in ("owner", "c_level") else 10
+
+    return best_score, best_note
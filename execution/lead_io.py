@@ -0,0 +1,233 @@
+"""
+Shared lead file I/O: streaming reads and writes of NDJSON and legacy JSON arrays.
+
+Lead files are either newline-delimited JSON (one lead object per line, `.ndjson` /
+`.jsonl`) or the legacy JSON array every script used to write (`.json`). Readers
+accept both regardless of extension and never hold more than one chunk of the file
+plus the current lead in memory. Writers pick the format from the extension; JSON
+arrays are written incrementally in the same layout as json.dump(leads, indent=2),
+so downstream tools that expect an array keep working.
+
+Usage (from the execution scripts):
+    from lead_io import iter_leads, read_leads, LeadWriter
+
+    with LeadWriter(".tmp/filtered.ndjson") as writer:
+        for lead in iter_leads(".tmp/full_leads.json"):
+            if keep(lead):
+                writer.write(lead)
+
+    # Append to an NDJSON file (e.g. a spool that survives restarts)
+    with LeadWriter(".tmp/spool.ndjson", append=True) as writer:
+        writer.write(lead)
+"""
+
+import os
+import json
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+class LeadFileError(ValueError):
+    """A lead file that can't be decoded (bad JSON/NDJSON or encoding)."""
+
+
+def is_ndjson_path(path):
+    """Whether a path's extension marks it as NDJSON rather than a JSON array."""
+    return path.lower().endswith(NDJSON_EXTENSIONS)
+
+
+def _iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array from a file, one chunk at a time.
+
+    Args:
+        f: Text file positioned at the opening '['
+        chunk_size (int): Characters read per chunk
+
+    Yields:
+        Each array element, decoded
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size).lstrip()
+    if not buf.startswith("["):
+        raise LeadFileError("Expected a JSON array")
+    pos = 1
+    eof = False
+
+    while True:
+        # Skip separators, refilling the buffer as needed
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise LeadFileError("Unterminated JSON array")
+            buf, pos = chunk, 0
+            continue
+        if buf[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise LeadFileError(f"Invalid JSON ({e.msg})") from e
+            # Element spans the chunk boundary: read more (at least doubling) and retry
+            chunk = f.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        eof = False
+        yield item
+        pos = end
+        if pos >= chunk_size:
+            buf, pos = buf[pos:], 0
+
+
+def iter_leads(path):
+    """
+    Iterate the leads in a file, streaming (NDJSON or legacy JSON array).
+
+    The format is detected from the content, not the extension: a file starting with
+    '[' is a JSON array, anything else is one JSON object per line.
+
+    Args:
+        path (str): Lead file path
+
+    Yields:
+        dict: One lead at a time
+
+    Raises:
+        LeadFileError: If the file is not valid JSON/NDJSON or not UTF-8 (only decoding
+            problems: errors raised by the caller's own processing pass through untouched)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            first = ""
+            while True:
+                char = f.read(1)
+                if not char or not char.isspace():
+                    first = char
+                    break
+            if not first:
+                return
+            f.seek(0)
+
+            if first == "[":
+                yield from _iter_json_array(f)
+                return
+
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    lead = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise LeadFileError(f"{path}:{line_number}: invalid NDJSON line ({e.msg})") from e
+                yield lead
+        except UnicodeDecodeError as e:
+            raise LeadFileError(f"{path}: not UTF-8 ({e.reason})") from e
+
+
+def read_leads(path):
+    """
+    Load every lead in a file into a list (for stages that need the full set at once).
+
+    Args:
+        path (str): Lead file path (NDJSON or JSON array)
+
+    Returns:
+        list: Leads
+    """
+    return list(iter_leads(path))
+
+
+class LeadWriter:
+    """
+    Incremental lead writer, used as a context manager.
+
+    NDJSON files get one compact object per line; JSON-array files are written in the
+    json.dump(indent=2) layout. A fresh file is written to `<path>.tmp` and moved into
+    place only when the writer closes without an exception, so readers never see a
+    half-written file. Append mode (NDJSON only) writes in place. With keep=True the
+    written leads are also kept in `.leads`, for callers that hand them on in memory.
+    """
+
+    def __init__(self, path, ndjson=None, append=False, keep=False):
+        self.path = path
+        self.ndjson = is_ndjson_path(path) if ndjson is None else ndjson
+        self.append = append
+        self.count = 0
+        self.leads = [] if keep else None
+
+        if append and not self.ndjson:
+            raise ValueError(f"Can only append to NDJSON files, not {path}")
+
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".", exist_ok=True)
+        self._target = path if append else path + ".tmp"
+        self._f = open(self._target, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, lead):
+        """Write one lead."""
+        if self.ndjson:
+            self._f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+        else:
+            body = json.dumps(lead, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            self._f.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+        self.count += 1
+        if self.leads is not None:
+            self.leads.append(lead)
+
+    def write_many(self, leads):
+        """Write every lead from an iterable."""
+        for lead in leads:
+            self.write(lead)
+
+    def close(self):
+        """Finish the file and move it into place."""
+        if self._f.closed:
+            return
+        if not self.ndjson:
+            self._f.write("\n]" if self.count else "[]")
+        self._f.close()
+        if not self.append:
+            os.replace(self._target, self.path)
+
+    def abort(self):
+        """Discard a fresh file (appended lines are kept)."""
+        if self._f.closed:
+            return
+        self._f.close()
+        if not self.append:
+            os.remove(self._target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_leads(path, leads, ndjson=None):
+    """
+    Write leads (any iterable) to a file in the format its extension implies.
+
+    Args:
+        path (str): Output path
+        leads (iterable): Leads to write
+        ndjson (bool, optional): Force NDJSON (True) or JSON array (False)
+
+    Returns:
+        int: Number of leads written
+    """
+    with LeadWriter(path, ndjson=ndjson) as writer:
+        writer.write_many(leads)
+    return writer.count
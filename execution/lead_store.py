@@ -0,0 +1,492 @@
+"""
+Indexed SQLite lead store shared by the pipeline stages.
+
+Instead of each stage handing the next a full `.tmp/*.json` copy of every lead, the
+stages record what they produced against a lead ID in one database:
+
+- leads            one row per lead (the scraped/imported record, as JSON)
+- validation       ICP verdict, match percentage and reason
+- verification     email verification status and whether the lead was kept
+- personalization  personalization line, confidence and status
+- segments         segment per lead, per segmentation kind (job_title, personalization)
+- uploads          which campaign each lead was uploaded to
+
+Each stage only writes its own table (keyed by lead ID), so re-running one stage
+updates it in place, and "leads that passed validation and verification" is an
+indexed join instead of a scan over report lists. Scripts take `--store PATH` to
+record into the store; JSON hand-off files are still written for compatibility and
+can be regenerated from the store at any point with `export`.
+
+Usage:
+    python lead_store.py import --input .tmp/full_leads.json --source apify
+    python lead_store.py stats
+    python lead_store.py export --stage verified --output .tmp/full_leads_verified.json
+    python lead_store.py export --stage personalized --segment-kind job_title --segment exec --output .tmp/segment_exec_leads.json
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import itertools
+import threading
+from validation_cache import stable_hash
+from lead_io import iter_leads, write_leads
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_STORE_FILE = ".tmp/leads.sqlite"
+
+# Pipeline stages export can filter on, each adding a join to the previous one
+STAGES = ("all", "validated", "verified", "personalized")
+
+# Max lead IDs per "IN (...)" lookup (SQLite's default variable limit is 999)
+LOOKUP_CHUNK = 500
+
+# Rows per write transaction (lead files are streamed in, never loaded whole)
+WRITE_CHUNK = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    lead_id TEXT PRIMARY KEY,
+    email TEXT,
+    company_domain TEXT,
+    company_name TEXT,
+    source TEXT,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_email ON leads(email);
+CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads(company_domain);
+
+CREATE TABLE IF NOT EXISTS validation (
+    lead_id TEXT PRIMARY KEY REFERENCES leads(lead_id),
+    valid INTEGER NOT NULL,
+    match_percentage INTEGER,
+    reason TEXT,
+    validation_error INTEGER NOT NULL DEFAULT 0,
+    validated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_validation_valid ON validation(valid);
+
+CREATE TABLE IF NOT EXISTS verification (
+    lead_id TEXT PRIMARY KEY REFERENCES leads(lead_id),
+    email TEXT,
+    status TEXT NOT NULL,
+    reason TEXT,
+    kept INTEGER NOT NULL,
+    verified_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_verification_kept ON verification(kept);
+
+CREATE TABLE IF NOT EXISTS personalization (
+    lead_id TEXT PRIMARY KEY REFERENCES leads(lead_id),
+    personalization TEXT,
+    confidence TEXT,
+    source TEXT,
+    status TEXT,
+    pages_scraped INTEGER,
+    enriched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS segments (
+    lead_id TEXT NOT NULL REFERENCES leads(lead_id),
+    kind TEXT NOT NULL,
+    segment_id TEXT NOT NULL,
+    assigned_at REAL NOT NULL,
+    PRIMARY KEY (lead_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_segments_kind ON segments(kind, segment_id);
+
+CREATE TABLE IF NOT EXISTS uploads (
+    lead_id TEXT NOT NULL REFERENCES leads(lead_id),
+    campaign_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    uploaded_at REAL NOT NULL,
+    PRIMARY KEY (lead_id, campaign_id)
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_campaign ON uploads(campaign_id);
+"""
+
+
+def lead_id_for(lead):
+    """
+    Stable ID for a lead: its `lead_id` if it has one, else a hash of its identity.
+
+    Identity is the lowercased email, or company domain + contact name for leads
+    without an email, so the same person gets the same ID across scrapes and imports.
+
+    Args:
+        lead (dict): Lead data
+
+    Returns:
+        str: 16-hex-character lead ID
+    """
+    if lead.get("lead_id"):
+        return lead["lead_id"]
+
+    email = (lead.get("email") or lead.get("personal_email") or "").strip().lower()
+    if email:
+        identity = {"email": email}
+    else:
+        domain = (lead.get("company_domain") or lead.get("company_website") or lead.get("website") or "").strip().lower()
+        name = (lead.get("full_name") or f"{lead.get('first_name') or ''} {lead.get('last_name') or ''}").strip().lower()
+        identity = {"domain": domain, "name": name, "company": (lead.get("company_name") or "").strip().lower()}
+    return stable_hash(identity)[:16]
+
+
+def assign_lead_ids(leads):
+    """
+    Stamp each lead with its stable `lead_id` at ingest (leads that have one keep it).
+
+    Args:
+        leads (iterable): Lead dicts
+
+    Yields:
+        dict: The same leads, each with a "lead_id"
+    """
+    for lead in leads:
+        if not lead.get("lead_id"):
+            lead["lead_id"] = lead_id_for(lead)
+        yield lead
+
+
+class LeadStore:
+    """
+    Thread-safe SQLite lead store; each stage writes its own table keyed by lead ID.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_FILE):
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _write(self, sql, rows):
+        """Run an insert over any iterable of rows, one transaction per chunk; returns the row count."""
+        rows = iter(rows)
+        written = 0
+        while True:
+            chunk = list(itertools.islice(rows, WRITE_CHUNK))
+            if not chunk:
+                return written
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(sql, chunk)
+            written += len(chunk)
+
+    def upsert_leads(self, leads, source=None, overwrite=True):
+        """
+        Insert leads, replacing the stored record of any lead already present.
+
+        Args:
+            leads (iterable): Lead dicts
+            source (str, optional): Where the leads came from (apify, csv_import, ...)
+            overwrite (bool): False to keep existing records untouched (insert new ones only)
+
+        Returns:
+            int: Leads written
+        """
+        now = time.time()
+        rows = (
+            (
+                lead_id_for(lead),
+                (lead.get("email") or "").strip().lower() or None,
+                (lead.get("company_domain") or "").strip().lower() or None,
+                lead.get("company_name") or lead.get("companyName"),
+                source or lead.get("_source"),
+                json.dumps(lead, ensure_ascii=False),
+                now,
+                now
+            )
+            for lead in leads
+        )
+
+        conflict = """DO UPDATE SET email = excluded.email, company_domain = excluded.company_domain,
+            company_name = excluded.company_name, source = COALESCE(excluded.source, leads.source),
+            data = excluded.data, updated_at = excluded.updated_at""" if overwrite else "DO NOTHING"
+        return self._write(f"""
+            INSERT INTO leads (lead_id, email, company_domain, company_name, source, data, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(lead_id) {conflict}
+        """, rows)
+
+    def record_validation(self, validation_details):
+        """
+        Record ICP verdicts from a validation report's validation_details.
+
+        Args:
+            validation_details (list): Entries from validate_lead_quality.py (with "data" = lead)
+
+        Returns:
+            int: Verdicts written
+        """
+        details = [detail for detail in validation_details if detail.get("data")]
+        self.upsert_leads((detail["data"] for detail in details), overwrite=False)
+        now = time.time()
+        self._write("""
+            INSERT OR REPLACE INTO validation (lead_id, valid, match_percentage, reason, validation_error, validated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (lead_id_for(detail["data"]), int(bool(detail.get("valid"))), detail.get("match_percentage"),
+             detail.get("reason"), int(bool(detail.get("validation_error"))), now)
+            for detail in details
+        ])
+        return len(details)
+
+    def record_verification(self, verification_details):
+        """
+        Record email verification results from verify_emails.py's verification_details.
+
+        Args:
+            verification_details (list): Entries with "lead", "status", "reason" and "kept"
+
+        Returns:
+            int: Results written
+        """
+        details = [detail for detail in verification_details if detail.get("lead")]
+        self.upsert_leads((detail["lead"] for detail in details), overwrite=False)
+        now = time.time()
+        self._write("""
+            INSERT OR REPLACE INTO verification (lead_id, email, status, reason, kept, verified_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (lead_id_for(detail["lead"]), detail.get("email"), detail.get("status"), detail.get("reason"),
+             int(bool(detail.get("kept"))), now)
+            for detail in details
+        ])
+        return len(details)
+
+    def record_personalization(self, enriched_leads):
+        """
+        Record personalization fields from enriched leads.
+
+        Args:
+            enriched_leads (iterable): Leads returned by enrich_personalization.py
+
+        Returns:
+            int: Leads written
+        """
+        now = time.time()
+        rows = (
+            (lead_id_for(lead), lead.get("personalization"), lead.get("personalization_confidence"),
+             lead.get("personalization_source"), lead.get("personalization_status"), lead.get("pages_scraped", 0), now)
+            for lead in enriched_leads
+        )
+        return self._write("""
+            INSERT OR REPLACE INTO personalization (lead_id, personalization, confidence, source, status, pages_scraped, enriched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    def record_segments(self, kind, assignments):
+        """
+        Record each lead's segment for one segmentation kind.
+
+        Args:
+            kind (str): Segmentation kind ("job_title", "personalization")
+            assignments (iterable): (lead, segment_id) pairs
+
+        Returns:
+            int: Assignments written
+        """
+        now = time.time()
+        rows = ((lead_id_for(lead), kind, segment_id, now) for lead, segment_id in assignments)
+        return self._write("""
+            INSERT OR REPLACE INTO segments (lead_id, kind, segment_id, assigned_at) VALUES (?, ?, ?, ?)
+        """, rows)
+
+    def record_uploads(self, campaign_id, leads, status="uploaded"):
+        """
+        Record leads uploaded to a campaign.
+
+        Args:
+            campaign_id (str): Instantly campaign ID
+            leads (iterable): Leads in the upload
+            status (str): Upload outcome ("uploaded", "failed")
+
+        Returns:
+            int: Rows written
+        """
+        now = time.time()
+        rows = ((lead_id_for(lead), campaign_id, status, now) for lead in leads)
+        return self._write("""
+            INSERT OR REPLACE INTO uploads (lead_id, campaign_id, status, uploaded_at) VALUES (?, ?, ?, ?)
+        """, rows)
+
+    def validation_for(self, lead_ids):
+        """
+        Look up ICP verdicts by lead ID (primary-key lookups, chunked).
+
+        Args:
+            lead_ids (iterable): Lead IDs
+
+        Returns:
+            dict: lead_id -> {"valid", "match_percentage", "reason", "validation_error"}
+        """
+        lead_ids = list(lead_ids)
+        found = {}
+        with self._lock:
+            for start in range(0, len(lead_ids), LOOKUP_CHUNK):
+                chunk = lead_ids[start:start + LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT * FROM validation WHERE lead_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    found[row["lead_id"]] = {
+                        "valid": bool(row["valid"]),
+                        "match_percentage": row["match_percentage"],
+                        "reason": row["reason"],
+                        "validation_error": bool(row["validation_error"])
+                    }
+        return found
+
+    def iter_stage_leads(self, stage="all", segment_kind=None, segment_id=None):
+        """
+        Iterate the leads that have reached a pipeline stage, with stage columns merged in.
+
+        Args:
+            stage (str): "all", "validated" (passed ICP), "verified" (+ email kept) or
+                "personalized" (+ has a personalization line)
+            segment_kind (str, optional): Only leads segmented under this kind...
+            segment_id (str, optional): ...into this segment
+
+        Yields:
+            dict: Lead data, with personalization fields and "segment" filled from the store
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r} (expected one of {', '.join(STAGES)})")
+
+        joins = ["LEFT JOIN personalization p ON p.lead_id = l.lead_id"]
+        where = []
+        params = []
+        depth = STAGES.index(stage)
+        if depth >= 1:
+            joins.append("JOIN validation v ON v.lead_id = l.lead_id")
+            where.append("v.valid = 1")
+        if depth >= 2:
+            joins.append("JOIN verification e ON e.lead_id = l.lead_id")
+            where.append("e.kept = 1")
+        if depth >= 3:
+            where.append("p.personalization IS NOT NULL AND p.personalization != ''")
+        if segment_kind:
+            joins.append("JOIN segments s ON s.lead_id = l.lead_id AND s.kind = ?")
+            params.append(segment_kind)
+            if segment_id:
+                where.append("s.segment_id = ?")
+                params.append(segment_id)
+
+        sql = f"""
+            SELECT l.lead_id, l.data, p.personalization, p.confidence, p.source AS p_source, p.status AS p_status,
+                   p.pages_scraped, p.lead_id AS p_lead_id{', s.segment_id' if segment_kind else ''}
+            FROM leads l {' '.join(joins)}
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY l.created_at, l.rowid
+        """
+        # Stream from a separate read connection (WAL lets it run alongside writers)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, params)
+            yield from (self._stage_lead(row, segment_kind) for row in rows)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stage_lead(row, segment_kind):
+        """Rebuild a hand-off lead dict from an iter_stage_leads() row."""
+        lead = json.loads(row["data"])
+        lead["lead_id"] = row["lead_id"]
+        if row["p_lead_id"]:
+            lead["personalization"] = row["personalization"]
+            lead["personalization_confidence"] = row["confidence"]
+            lead["personalization_source"] = row["p_source"]
+            lead["personalization_status"] = row["p_status"]
+            lead["pages_scraped"] = row["pages_scraped"]
+        if segment_kind:
+            lead["segment"] = row["segment_id"]
+        return lead
+
+    def stats(self):
+        """
+        Row counts per table plus stage totals.
+
+        Returns:
+            dict: Counts
+        """
+        with self._lock:
+            count = lambda sql: self._conn.execute(sql).fetchone()[0]
+            return {
+                "leads": count("SELECT COUNT(*) FROM leads"),
+                "validated": count("SELECT COUNT(*) FROM validation"),
+                "valid": count("SELECT COUNT(*) FROM validation WHERE valid = 1"),
+                "verified": count("SELECT COUNT(*) FROM verification"),
+                "kept": count("SELECT COUNT(*) FROM verification WHERE kept = 1"),
+                "personalized": count("SELECT COUNT(*) FROM personalization WHERE personalization IS NOT NULL AND personalization != ''"),
+                "segments": {
+                    f"{row[0]}:{row[1]}": row[2]
+                    for row in self._conn.execute("SELECT kind, segment_id, COUNT(*) FROM segments GROUP BY kind, segment_id")
+                },
+                "uploaded": count("SELECT COUNT(DISTINCT lead_id) FROM uploads WHERE status = 'uploaded'")
+            }
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, inspect and export the SQLite lead store")
+    parser.add_argument("--store", default=DEFAULT_STORE_FILE, help=f"Lead store path (default: {DEFAULT_STORE_FILE})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Add leads from a JSON/NDJSON file")
+    import_parser.add_argument("--input", required=True, help="Lead file")
+    import_parser.add_argument("--source", help="Source label (e.g. apify, csv_import)")
+
+    export_parser = subparsers.add_parser("export", help="Write the leads at a pipeline stage to a file")
+    export_parser.add_argument("--stage", choices=STAGES, default="all", help="Pipeline stage (default: all)")
+    export_parser.add_argument("--segment-kind", help="Only leads segmented under this kind (job_title, personalization)")
+    export_parser.add_argument("--segment", help="Only leads in this segment (with --segment-kind)")
+    export_parser.add_argument("--output", required=True, help="Output file (.json array or .ndjson)")
+
+    subparsers.add_parser("stats", help="Show row counts per stage")
+
+    args = parser.parse_args()
+
+    store = LeadStore(args.store)
+    try:
+        if args.command == "import":
+            if not os.path.exists(args.input):
+                result = {"status": "error", "message": f"Input file not found: {args.input}"}
+            else:
+                count = store.upsert_leads(iter_leads(args.input), source=args.source)
+                print(f"📥 Imported {count} leads into {args.store}")
+                result = {"status": "success", "imported": count, "store": args.store}
+        elif args.command == "export":
+            count = write_leads(args.output, store.iter_stage_leads(args.stage, args.segment_kind, args.segment))
+            print(f"📤 Exported {count} {args.stage} leads to {args.output}")
+            result = {"status": "success", "exported": count, "stage": args.stage, "file": args.output}
+        else:
+            result = {"status": "success", **store.stats()}
+    finally:
+        store.close()
+
+    print("\n" + "="*50)
+    print(json.dumps(result, indent=2))
+
+    sys.exit(0 if result["status"] == "success" else 1)
+
+
+if __name__ == "__main__":
+    main()
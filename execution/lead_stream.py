@@ -0,0 +1,268 @@
+"""
+Streaming lead pipeline: stages run concurrently, connected by bounded queues.
+
+Each stage is one or more threads that take items from the stage's input queue as
+soon as the previous stage emits them and put their results on the next queue. The
+queues are bounded, so a slow stage makes the stages upstream of it block rather
+than buffer the whole run in memory (backpressure), and the run takes about as long
+as its slowest stage instead of the sum of all stages.
+
+Two kinds of stage:
+- map stages call fn(item) per item on `workers` threads (for per-lead API calls)
+- batch stages collect up to `batch_size` items, or whatever arrived within `max_wait`
+  seconds of the first one, and call fn(items) once (for batched API calls)
+
+Either returns an iterable of output items: several, one, or none to drop the item.
+
+Usage (from run_pipeline.py):
+    pipeline = StreamPipeline(queue_size=100)
+    pipeline.add_batch_stage("validate", score_batch, batch_size=20, max_wait=2.0)
+    pipeline.add_stage("verify", verify_one, workers=10, on_output=verified_writer.write)
+    stats = pipeline.run(iter_leads(".tmp/full_leads.json"), sink=final_writer.write)
+"""
+
+import time
+import queue
+import threading
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+POLL_SECONDS = 0.5
+
+
+class _Aborted(Exception):
+    """Raised inside worker threads once another stage has failed."""
+
+
+class StageError(RuntimeError):
+    """A stage (or the source or sink) raised; `stage` names it and the pipeline was stopped."""
+
+    def __init__(self, stage, error):
+        super().__init__(f"{stage} stage failed: {type(error).__name__}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class _Stage:
+    def __init__(self, name, fn, workers=1, batch_size=None, max_wait=None, on_output=None, on_done=None):
+        self.name = name
+        self.fn = fn
+        self.on_done = on_done
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.on_output = on_output
+        self.inbox = None
+        self.outbox = None
+        self.lock = threading.Lock()
+        self.running = workers
+        self.stats = {"in": 0, "out": 0, "calls": 0, "busy_seconds": 0.0, "max_backlog": 0}
+
+
+class StreamPipeline:
+    """
+    Runs a chain of stages concurrently over a stream of items.
+
+    Args:
+        queue_size (int): Capacity of each queue between stages
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.stages = []
+        self._abort = threading.Event()
+        self._errors = []
+
+    def add_stage(self, name, fn, workers=1, on_output=None, on_done=None):
+        """
+        Add a map stage: fn(item) -> iterable of outputs, on `workers` threads.
+
+        on_output(item), if given, is called for every output under the stage's lock
+        (e.g. to write a checkpoint file). on_done(), if given, is called once every
+        input has been processed and returns any last outputs (e.g. items the stage
+        held back); raising from it fails the stage before the end of the stream
+        reaches the next one.
+        """
+        self.stages.append(_Stage(name, fn, workers=workers, on_output=on_output, on_done=on_done))
+
+    def add_batch_stage(self, name, fn, batch_size, max_wait=2.0, on_output=None):
+        """
+        Add a batch stage: fn(items) -> iterable of outputs, on one thread.
+
+        A batch is flushed once it holds batch_size items or max_wait seconds after its
+        first item arrived, whichever comes first.
+        """
+        self.stages.append(_Stage(name, fn, batch_size=batch_size, max_wait=max_wait, on_output=on_output))
+
+    def _get(self, q, timeout=None):
+        """Blocking get that gives up once the pipeline is aborted (None on timeout)."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+            try:
+                return q.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def _put(self, q, item):
+        """Blocking put (backpressure) that gives up once the pipeline is aborted."""
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _emit(self, stage, outputs):
+        for item in outputs or ():
+            if stage.on_output:
+                with stage.lock:
+                    stage.on_output(item)
+            with stage.lock:
+                stage.stats["out"] += 1
+            self._put(stage.outbox, item)
+
+    def _call(self, stage, arg, count):
+        started = time.monotonic()
+        outputs = list(stage.fn(arg) or ())
+        with stage.lock:
+            stage.stats["in"] += count
+            stage.stats["calls"] += 1
+            stage.stats["busy_seconds"] += time.monotonic() - started
+            stage.stats["max_backlog"] = max(stage.stats["max_backlog"], stage.inbox.qsize())
+        self._emit(stage, outputs)
+
+    def _fail(self, stage_name, error):
+        self._errors.append((stage_name, error))
+        self._abort.set()
+
+    def _run_map_worker(self, stage):
+        try:
+            while True:
+                item = self._get(stage.inbox)
+                if item is _DONE:
+                    # Let sibling workers see the end of the stream too
+                    self._put(stage.inbox, _DONE)
+                    break
+                self._call(stage, item, 1)
+
+            with stage.lock:
+                stage.running -= 1
+                last = stage.running == 0
+            if last:
+                if stage.on_done:
+                    self._emit(stage, stage.on_done())
+                self._put(stage.outbox, _DONE)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(stage.name, e)
+
+    def _run_batch_worker(self, stage):
+        try:
+            batch = []
+            flush_at = None
+            while True:
+                item = self._get(stage.inbox, timeout=flush_at - time.monotonic() if batch else None)
+                if item is None:
+                    # max_wait passed with a partial batch
+                    self._call(stage, batch, len(batch))
+                    batch = []
+                    continue
+                if item is _DONE:
+                    if batch:
+                        self._call(stage, batch, len(batch))
+                    break
+
+                batch.append(item)
+                if len(batch) == 1:
+                    flush_at = time.monotonic() + stage.max_wait
+                if len(batch) >= stage.batch_size:
+                    self._call(stage, batch, len(batch))
+                    batch = []
+
+            self._put(stage.outbox, _DONE)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(stage.name, e)
+
+    def _feed(self, source, first_queue):
+        try:
+            for item in source:
+                self._put(first_queue, item)
+            self._put(first_queue, _DONE)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail("source", e)
+
+    def run(self, source, sink=None):
+        """
+        Stream every item from source through the stages.
+
+        Args:
+            source (iterable): Input items (e.g. iter_leads(path)); read on its own thread
+            sink (callable, optional): Called with each item the last stage emits
+
+        Returns:
+            dict: {"seconds": wall clock, "stages": {name: stats}}; stage_seconds is each
+                stage's busy time divided by its workers
+
+        Raises:
+            StageError: If a stage (or the source) raised; the pipeline is stopped
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), daemon=True)]
+        for stage, inbox, outbox in zip(self.stages, queues, queues[1:]):
+            stage.inbox = inbox
+            stage.outbox = outbox
+            if stage.batch_size:
+                threads.append(threading.Thread(target=self._run_batch_worker, args=(stage,), daemon=True))
+            else:
+                threads.extend(threading.Thread(target=self._run_map_worker, args=(stage,), daemon=True)
+                               for _ in range(stage.workers))
+
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                if sink:
+                    sink(item)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail("sink", e)
+
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            stage_name, error = self._errors[0]
+            raise StageError(stage_name, error) from error
+
+        return {
+            "seconds": round(time.monotonic() - started, 2),
+            "stages": {
+                stage.name: {
+                    **stage.stats,
+                    "workers": stage.workers,
+                    "busy_seconds": round(stage.stats["busy_seconds"], 2),
+                    # Time the stage needs on its own at this concurrency
+                    "stage_seconds": round(stage.stats["busy_seconds"] / stage.workers, 2)
+                }
+                for stage in self.stages
+            }
+        }
@@ -0,0 +1,175 @@
+"""
+Find a company website's most personalization-worthy pages from its own links.
+
+Instead of probing a fixed list of guessed paths (most of which 404), the crawler
+reads the homepage's anchor links — or, if they show nothing useful, the site's
+sitemap.xml — and ranks same-site URLs by how well their path and link text match
+the case study / testimonial / portfolio vocabulary. Only the top few candidates are
+fetched; guessing paths is the fallback when discovery finds nothing.
+benchmark_link_discovery.py compares the request counts with guessing over a fixture.
+
+Usage (from enrich_personalization.py and async_crawler.py):
+    candidates = rank_links(extract_links(homepage_html, "https://acme-hvac.co.uk/"))
+    # [("https://acme-hvac.co.uk/our-projects/school-boiler-refit", 6), ...]
+"""
+
+import re
+from urllib.parse import urljoin, urlparse, urldefrag
+from bs4 import BeautifulSoup
+
+# Vocabulary (regex) -> score, in the same priority order as enrich_personalization.COMMON_PATHS.
+# Matched as whole words against the URL path and the link text, both lowercased with
+# every run of non-alphanumerics turned into "-" ("Case Studies" -> "case-studies"), so
+# "work" doesn't match "network" and "review" doesn't match "preview"
+LINK_KEYWORDS = [
+    ("case-stud(?:y|ies)", 10),
+    ("casestud(?:y|ies)", 10),
+    ("testimonials?", 9),
+    ("success-stor(?:y|ies)", 8),
+    ("customer-stor(?:y|ies)", 8),
+    ("client-success", 8),
+    ("reviews?", 7),
+    ("portfolios?", 6),
+    ("clients?", 6),
+    ("projects?", 6),
+    ("our-work", 5),
+    ("success", 4),
+    ("work", 3),
+    ("about", 2)
+]
+
+_KEYWORD_PATTERNS = [(re.compile(rf"(?:^|-)(?:{keyword})(?:-|$)"), score) for keyword, score in LINK_KEYWORDS]
+
+# Words that mark a login or account page ("Client login", /customer-portal), never content
+ACCOUNT_WORDS = re.compile(r"(?:^|-)(?:login|log-in|signin|sign-in|sign-up|signup|register|portal|account|my-account)(?:-|$)")
+
+# Links that are never pages worth reading
+SKIP_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".doc", ".docx",
+                   ".xls", ".xlsx", ".mp4", ".mp3", ".xml", ".css", ".js")
+
+SITEMAP_PATH = "/sitemap.xml"
+
+# Sitemap <loc> entries read at most (large shop sitemaps run to tens of thousands)
+MAX_SITEMAP_URLS = 5000
+
+MAX_CANDIDATES = 3
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _site_host(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def same_site_url(href, base_url):
+    """
+    Resolve a link against the page it is on and keep it only if it is a page on the same site.
+
+    Args:
+        href (str): Link target as written in the page
+        base_url (str): URL of the page the link is on
+
+    Returns:
+        str or None: Absolute URL without its fragment, or None if off-site or not a page
+    """
+    href = (href or "").strip()
+    if not href or href.startswith(("mailto:", "tel:", "javascript:", "#")):
+        return None
+
+    url, _ = urldefrag(urljoin(base_url, href))
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or _site_host(url) != _site_host(base_url):
+        return None
+    if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    if parsed.path.rstrip("/") == urlparse(base_url).path.rstrip("/") and not parsed.query:
+        return None
+    return url
+
+
+def extract_links(html, base_url):
+    """
+    Same-site links on a page, with their link text.
+
+    Args:
+        html (str): Page HTML
+        base_url (str): URL the page was fetched from
+
+    Returns:
+        list: (url, link text) tuples in page order, first occurrence of each URL
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    seen = set()
+    for anchor in soup.find_all('a', href=True):
+        url = same_site_url(anchor['href'], base_url)
+        if url and url not in seen:
+            seen.add(url)
+            links.append((url, anchor.get_text(" ", strip=True)[:100]))
+    return links
+
+
+def parse_sitemap(xml, base_url):
+    """
+    Same-site page URLs listed in a sitemap (nested sitemap indexes are not followed).
+
+    Args:
+        xml (str): sitemap.xml content
+        base_url (str): Site URL
+
+    Returns:
+        list: (url, "") tuples in sitemap order
+    """
+    links = []
+    seen = set()
+    for loc in re.findall(r"<loc>\s*([^<]+?)\s*</loc>", xml or "")[:MAX_SITEMAP_URLS]:
+        url = same_site_url(loc.replace("&amp;", "&"), base_url)
+        if url and url not in seen:
+            seen.add(url)
+            links.append((url, ""))
+    return links
+
+
+def link_score(url, text=""):
+    """
+    Score a link by the best vocabulary match in its path or link text.
+
+    Args:
+        url (str): Absolute URL
+        text (str): Link text
+
+    Returns:
+        int: 0 if nothing matches (or the link is a login/account page), otherwise the
+            highest matching LINK_KEYWORDS score
+    """
+    haystacks = (_slug(urlparse(url).path), _slug(text))
+    if any(ACCOUNT_WORDS.search(haystack) for haystack in haystacks):
+        return 0
+    for pattern, score in _KEYWORD_PATTERNS:
+        if any(pattern.search(haystack) for haystack in haystacks):
+            return score
+    return 0
+
+
+def rank_links(links, max_candidates=MAX_CANDIDATES):
+    """
+    The best-matching links, highest score first (page order breaks ties).
+
+    Args:
+        links (list): (url, link text) tuples from extract_links() or parse_sitemap()
+        max_candidates (int): How many to return
+
+    Returns:
+        list: Up to max_candidates (url, score) tuples, only links that match at all
+    """
+    best = {}
+    for position, (url, text) in enumerate(links):
+        score = link_score(url, text)
+        if score and (url not in best or score > best[url][0]):
+            best[url] = (score, position)
+
+    ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[1][1]))
+    return [(url, score) for url, (score, _) in ranked[:max_candidates]]
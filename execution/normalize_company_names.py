@@ -1,6 +1,9 @@
 """
 Normalize company names using AI to create friendly, readable versions.
 
+Makes two streaming passes over the input (collect unique names, then rewrite each
+lead), so the lead list is never held in memory.
+
 Usage:
     python normalize_company_names.py --input leads.json --output leads_normalized.json
 """
@@ -11,6 +14,7 @@ import json
 import argparse
 from anthropic import Anthropic
 from dotenv import load_dotenv
+from lead_io import iter_leads, LeadWriter
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -74,7 +78,7 @@ Now normalize these company names. Return ONLY a JSON object with "original_name
     return json.loads(response_text)
 
 
-def normalize_company_names(input_file, output_file, batch_size=50):
+def normalize_company_names(input_file, output_file, batch_size=50, leads=None):
     """
     Add normalized company names to leads data.
 
@@ -82,6 +86,8 @@ def normalize_company_names(input_file, output_file, batch_size=50):
         input_file (str): Path to input leads JSON file
         output_file (str): Path to output leads JSON file with normalized names
         batch_size (int): Number of names to process per API call
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; the normalized leads are then returned in result["leads"]
 
     Returns:
         dict: Results with count of normalized names
@@ -95,30 +101,29 @@ def normalize_company_names(input_file, output_file, batch_size=50):
             "message": "ANTHROPIC_API_KEY not found in .env file"
         }
 
-    # Load leads
+    # Extract unique company names (first pass)
+    unique_names = {}
+    total_leads = 0
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
+        for lead in (leads if leads is not None else iter_leads(input_file)):
+            total_leads += 1
+            company_name = lead.get("company_name") or lead.get("companyName") or ""
+            if company_name:
+                unique_names.setdefault(company_name, None)
     except FileNotFoundError:
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
+    except ValueError:
         return {
             "status": "error",
             "message": f"Invalid JSON in input file: {input_file}"
         }
 
-    print(f"🏢 Normalizing company names for {len(leads)} leads...")
-
-    # Extract unique company names
-    company_names = []
-    for lead in leads:
-        company_name = lead.get("company_name") or lead.get("companyName") or ""
-        if company_name and company_name not in company_names:
-            company_names.append(company_name)
+    company_names = list(unique_names)
 
+    print(f"🏢 Normalizing company names for {total_leads} leads...")
     print(f"   Found {len(company_names)} unique company names")
 
     # Process in batches
@@ -137,27 +142,26 @@ def normalize_company_names(input_file, output_file, batch_size=50):
             for name in batch:
                 normalized_mapping[name] = name
 
-    # Add normalized names to leads
-    for lead in leads:
-        company_name = lead.get("company_name") or lead.get("companyName") or ""
-        lead["company_name_normalized"] = normalized_mapping.get(company_name, company_name)
-
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
-
-    # Save normalized leads
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(leads, f, indent=2, ensure_ascii=False)
+    # Add normalized names to leads (second pass, streamed to the output)
+    with LeadWriter(output_file, keep=leads is not None) as writer:
+        for lead in (leads if leads is not None else iter_leads(input_file)):
+            company_name = lead.get("company_name") or lead.get("companyName") or ""
+            lead["company_name_normalized"] = normalized_mapping.get(company_name, company_name)
+            writer.write(lead)
 
     print(f"✅ Normalized {len(normalized_mapping)} company names")
     print(f"💾 Saved to: {output_file}")
 
-    return {
+    result = {
         "status": "success",
-        "total_leads": len(leads),
+        "total_leads": total_leads,
         "unique_companies": len(normalized_mapping),
         "file": output_file
     }
+    if writer.leads is not None:
+        result["leads"] = writer.leads
+
+    return result
 
 
 def main():
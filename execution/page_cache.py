@@ -0,0 +1,223 @@
+"""
+On-disk SQLite cache for fetched company web pages.
+
+Pages are keyed by domain (or any caller-chosen key, e.g. the normalised URL), so
+every lead at the same company shares one fetch, and re-runs within the TTL skip the
+network entirely. Failed fetches are stored too (with their status), so a dead site
+is not retried on every run until its entry expires; with negative_ttl_days they
+expire sooner than good pages.
+
+Entries also keep the page's ETag/Last-Modified. Once a good page's TTL has passed,
+lookup() still returns it (marked stale) so the caller can revalidate it with a
+conditional GET and, on 304 Not Modified, touch() it instead of downloading and
+parsing it again.
+
+Usage (from validate_lead_quality.py):
+    cache = PageCache(".tmp/page_cache.sqlite", ttl_days=7)
+    hit = cache.get("acme-hvac.co.uk")  # None, or {"url", "status", "content", "fetched_at", ...}
+    cache.put("acme-hvac.co.uk", "https://acme-hvac.co.uk", 200, summary)
+
+Usage (from enrich_personalization.py and async_crawler.py):
+    cache = PageCache(".tmp/enrich_page_cache.sqlite", ttl_days=7, negative_ttl_days=1)
+    key = cache_key(url)
+    entry = cache.lookup(key)           # None, or the entry with "fresh": True/False
+    headers = conditional_headers(entry)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlparse, urlunparse
+
+TIMEOUT_ERROR = "Request timed out"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def cache_key(url):
+    """
+    Normalise a URL into a page cache key.
+
+    Lowercases the scheme and host, drops a default port and the fragment, and
+    turns an empty path into "/", so equivalent spellings of a URL share one entry.
+
+    Args:
+        url (str): Absolute URL
+
+    Returns:
+        str: Cache key
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    return urlunparse((scheme, host, parsed.path or "/", parsed.params, parsed.query, ""))
+
+
+def conditional_headers(entry):
+    """
+    Request headers that revalidate a cached good page (If-None-Match / If-Modified-Since).
+
+    Args:
+        entry (dict or None): Entry from PageCache.lookup()
+
+    Returns:
+        dict: Headers to add to the request (empty if there is nothing to revalidate)
+    """
+    if not entry or entry["status"] != 200:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def page_result(url, entry):
+    """
+    Turn a cached entry back into the result dict scrape_page() returns.
+
+    Args:
+        url (str): Requested URL
+        entry (dict): Entry from PageCache.lookup()
+
+    Returns:
+        dict: Result with status and content/error (and links if the entry kept them)
+    """
+    status = entry["status"]
+    if status == 200:
+        result = {'status': 'success', 'url': url, 'content': entry["content"], 'length': len(entry["content"] or "")}
+        if entry.get("links") is not None:
+            result['links'] = entry["links"]
+        return result
+    if status == 403:
+        return {'status': 'blocked', 'url': url, 'error': 'Access forbidden (403)'}
+    if status == 0:
+        return {'status': 'timeout' if entry["content"] == TIMEOUT_ERROR else 'error', 'url': url, 'error': entry["content"]}
+    return {'status': 'failed', 'url': url, 'error': f'HTTP {status}'}
+
+
+class PageCache:
+    """
+    Thread-safe SQLite store of key -> (url, status, content, fetched_at, etag, last_modified, links).
+
+    Args:
+        path (str): SQLite file
+        ttl_days (float): Days a good (200) page stays fresh
+        negative_ttl_days (float, optional): Days a failed fetch is kept; defaults to ttl_days
+    """
+
+    def __init__(self, path, ttl_days=7, negative_ttl_days=None):
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".", exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.negative_ttl_seconds = negative_ttl_days * 86400 if negative_ttl_days else self.ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                content TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        # Revalidation columns, added to caches created before they existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        for column in ("etag", "last_modified", "links"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self._conn.commit()
+
+    def _is_fresh(self, status, fetched_at):
+        ttl = self.ttl_seconds if status == 200 else self.negative_ttl_seconds
+        return not ttl or time.time() - fetched_at <= ttl
+
+    def lookup(self, key):
+        """
+        Look up a cached page, expired or not.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict or None: {"url", "status", "content", "fetched_at", "etag", "last_modified",
+                "links", "fresh"} or None if the key was never cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, content, fetched_at, etag, last_modified, links FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+
+        if not row:
+            return None
+        url, status, content, fetched_at, etag, last_modified, links = row
+        return {
+            "url": url,
+            "status": status,
+            "content": content,
+            "fetched_at": fetched_at,
+            "etag": etag,
+            "last_modified": last_modified,
+            "links": [tuple(link) for link in json.loads(links)] if links is not None else None,
+            "fresh": self._is_fresh(status, fetched_at)
+        }
+
+    def get(self, key):
+        """
+        Look up a cached page that has not expired.
+
+        Args:
+            key (str): Cache key (usually the domain)
+
+        Returns:
+            dict or None: {"url", "status", "content", "fetched_at", ...} or None on a miss
+        """
+        entry = self.lookup(key)
+        if not entry or not entry["fresh"]:
+            return None
+        return entry
+
+    def put(self, key, url, status, content, etag=None, last_modified=None, links=None):
+        """
+        Store a fetched page (or a failed fetch, with status 0 or the HTTP error code).
+
+        Args:
+            key (str): Cache key (usually the domain)
+            url (str): URL that was fetched
+            status (int): HTTP status, 0 if the request itself failed
+            content (str): Page content or summary (the error message for a failed fetch)
+            etag (str, optional): ETag response header, for revalidation
+            last_modified (str, optional): Last-Modified response header, for revalidation
+            links (list, optional): (url, link text) pairs found on the page
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, status, content, fetched_at, etag, last_modified, links) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, content, time.time(), etag, last_modified,
+                 json.dumps(links, ensure_ascii=False) if links is not None else None)
+            )
+            self._conn.commit()
+
+    def touch(self, key):
+        """
+        Mark a cached page fresh again (the server answered 304 Not Modified).
+
+        Args:
+            key (str): Cache key
+        """
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
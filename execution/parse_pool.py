@@ -0,0 +1,207 @@
+"""
+Process pool for the CPU side of enrichment crawling: decoding and parsing fetched pages.
+
+Each response body goes to a ProcessPoolExecutor sized to the core count, which
+decodes it, turns it into clean text and extracts its links. HTML cleanup then no
+longer holds the GIL the network side needs, and it runs on every core instead of
+one. The async crawler's event loop awaits the future and keeps fetching meanwhile;
+a fetch thread (parse()) blocks until its page is parsed, so on the threads crawler
+the pool frees the GIL but not the thread. Each parse reports the CPU time it used,
+so the pool can tell how busy its workers were.
+
+Usage (from enrich_personalization.py and async_crawler.py):
+    pool = ParsePool(workers=os.cpu_count(), to_text=html_to_text)
+    text, links = pool.parse(response.content, "utf-8", response.url, with_links=True)  # blocks
+    future = pool.submit(body, charset, url)    # concurrent.futures.Future of (text, links)
+    print(pool.stats())                         # workers, pages, cpu_seconds, utilisation
+    pool.close()
+"""
+
+import os
+import re
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from html_extract import html_to_text
+from link_discovery import extract_links, parse_sitemap
+
+# An encoding declared in the document itself (<meta charset>, http-equiv, <?xml encoding>)
+DECLARED_ENCODING = re.compile(rb'<(?:meta|\?xml)[^>]*?(?:charset|encoding)\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+
+# Bytes searched for a declared encoding
+SNIFF_BYTES = 2048
+
+
+def response_charset(content_type):
+    """
+    The charset a Content-Type header names, if any.
+
+    Args:
+        content_type (str): Content-Type header value
+
+    Returns:
+        str or None: Charset, or None if the header does not give one
+    """
+    match = re.search(r'charset\s*=\s*["\']?([^"\';\s]+)', content_type or "", re.I)
+    return match.group(1) if match else None
+
+
+def decode_body(raw, encoding=None):
+    """
+    Decode a response body.
+
+    Uses the charset from the response headers, else the one the document declares,
+    else UTF-8 if the bytes are valid UTF-8, else Windows-1252 (what browsers assume
+    for undeclared legacy pages).
+
+    Args:
+        raw (bytes): Response body
+        encoding (str, optional): Charset from the Content-Type header
+
+    Returns:
+        str: Decoded body (undecodable bytes replaced)
+    """
+    declared = DECLARED_ENCODING.search(raw[:SNIFF_BYTES])
+    for candidate in (encoding, declared.group(1).decode('ascii') if declared else None):
+        if candidate:
+            try:
+                return raw.decode(candidate, errors='replace')
+            except LookupError:
+                continue
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252', errors='replace')
+
+
+def parse_page(raw, encoding, url, with_links=False, sitemap=False, to_text=html_to_text):
+    """
+    Decode and parse one fetched page (runs in a worker process).
+
+    Args:
+        raw (bytes): Response body
+        encoding (str, optional): Charset from the Content-Type header
+        url (str): Final URL of the page (links are resolved against it)
+        with_links (bool): Also extract the page's same-site links
+        sitemap (bool): The body is a sitemap.xml: return its page links instead of text
+        to_text (callable): HTML -> clean text function (must be picklable)
+
+    Returns:
+        tuple: (clean text, links or None, CPU seconds used)
+    """
+    started = time.process_time()
+    body = decode_body(raw, encoding)
+    if sitemap:
+        text, links = "", parse_sitemap(body, url)
+    else:
+        text = to_text(body)
+        links = extract_links(body, url) if with_links else None
+    return text, links, time.process_time() - started
+
+
+class ParsePool:
+    """
+    Worker processes that decode and parse fetched pages.
+
+    Workers are started with "spawn" on every platform: the pool is created while
+    the crawler's threads may hold locks, which a forked child would inherit.
+
+    Args:
+        workers (int, optional): Worker processes (default: the number of cores)
+        to_text (callable): HTML -> clean text function (must be picklable)
+    """
+
+    def __init__(self, workers=None, to_text=html_to_text):
+        self.workers = workers or os.cpu_count() or 1
+        self.to_text = to_text
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self._lock = threading.Lock()
+        self._stats = {"pages": 0, "cpu_seconds": 0.0, "wait_seconds": 0.0}
+        self._started_at = time.monotonic()
+        self._finished_at = None
+
+    def submit(self, raw, encoding, url, with_links=False, sitemap=False):
+        """
+        Queue a page for parsing.
+
+        Args:
+            raw (bytes): Response body
+            encoding (str, optional): Charset from the Content-Type header
+            url (str): Final URL of the page
+            with_links (bool): Also extract the page's same-site links
+            sitemap (bool): The body is a sitemap.xml
+
+        Returns:
+            concurrent.futures.Future: Resolves to (clean text, links or None)
+        """
+        result = Future()
+
+        def parsed(future):
+            try:
+                text, links, cpu_seconds = future.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            with self._lock:
+                self._stats["pages"] += 1
+                self._stats["cpu_seconds"] += cpu_seconds
+            result.set_result((text, links))
+
+        self._executor.submit(parse_page, raw, encoding, url, with_links, sitemap, self.to_text).add_done_callback(parsed)
+        return result
+
+    def parse(self, raw, encoding, url, with_links=False, sitemap=False):
+        """
+        Parse a page and wait for the result (for fetch threads).
+
+        Args:
+            raw (bytes): Response body
+            encoding (str, optional): Charset from the Content-Type header
+            url (str): Final URL of the page
+            with_links (bool): Also extract the page's same-site links
+            sitemap (bool): The body is a sitemap.xml
+
+        Returns:
+            tuple: (clean text, links or None)
+        """
+        started = time.monotonic()
+        try:
+            return self.submit(raw, encoding, url, with_links=with_links, sitemap=sitemap).result()
+        finally:
+            with self._lock:
+                self._stats["wait_seconds"] += time.monotonic() - started
+
+    def stats(self):
+        """
+        How busy the workers were.
+
+        Returns:
+            dict: workers, pages parsed, CPU seconds the workers spent parsing, seconds
+                fetch threads spent waiting for results, and utilisation (CPU seconds
+                over workers x elapsed seconds, 0-1)
+        """
+        seconds = (self._finished_at or time.monotonic()) - self._started_at
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "workers": self.workers,
+            "pages": stats["pages"],
+            "cpu_seconds": round(stats["cpu_seconds"], 2),
+            "wait_seconds": round(stats["wait_seconds"], 2),
+            "utilisation": round(stats["cpu_seconds"] / (seconds * self.workers), 3) if seconds else 0
+        }
+
+    def close(self):
+        """Wait for queued parses and stop the workers."""
+        if self._finished_at is None:
+            self._finished_at = time.monotonic()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
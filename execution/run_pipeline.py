@@ -0,0 +1,1045 @@
+"""
+Run the lead generation workflow end to end in one process.
+
+Chains the existing stage functions — scrape (or import), validate, filter, normalize,
+verify, enrich, segment and upload — importing each module once and handing leads from
+stage to stage in memory. Every stage still writes its usual hand-off file in the work
+directory; those files are the checkpoints. A run manifest records, for every stage, the
+hashes of its input files, parameters and code plus the outputs it wrote, so re-running
+skips each stage whose inputs are unchanged and reuses its output: after an interruption
+the run picks up where it stopped, and after changing one parameter only the stages it
+affects (and those downstream whose inputs actually change) run again.
+With --streaming, validate/filter/normalize/verify/enrich overlap instead: leads move
+through bounded queues (lead_stream.py) as soon as each stage is done with them.
+
+Usage:
+    python run_pipeline.py --query "HVAC companies" --limit 500 --location "United Kingdom" \
+        --icp-industry "HVAC" --icp-location "UK" --icp-employees "10-50" --offer "Free HVAC audit"
+
+    # Start from leads you already have (JSON/NDJSON, or CSV)
+    python run_pipeline.py --input .tmp/csv_import.csv --icp-industry "HVAC" --skip-verify
+
+    # Upload the personalization segments to existing campaigns at the end
+    python run_pipeline.py ... --personalized-campaign <campaign_id> --non-personalized-campaign <campaign_id>
+
+    # Stream leads through validate -> enrich concurrently instead of stage by stage
+    python run_pipeline.py ... --streaming --queue-size 100
+
+    # Re-run: up-to-date stages are skipped (e.g. a new --min-segment-size reruns segment and upload only)
+    python run_pipeline.py ... --min-segment-size 20
+
+    # Force a stage (and whatever its new output changes) to run again
+    python run_pipeline.py ... --rerun enrich
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import requests
+from collections import defaultdict
+from datetime import datetime
+from dotenv import load_dotenv
+from lead_io import read_leads, iter_leads, LeadWriter
+from lead_store import LeadStore
+from lead_stream import StreamPipeline, StageError
+from validation_cache import stable_hash
+from yield_planner import record_stage_yield, DEFAULT_VALIDATION_REPORT
+from scrape_leads_direct_api import scrape_leads_direct
+from convert_csv_to_json import convert_csv_to_json
+from validate_lead_quality import validate_leads, LeadValidator, build_validation_detail, DEFAULT_CACHE_FILE
+from filter_validated_leads import filter_validated_leads, build_validation_index, find_validation_for_lead, extract_primary_reason
+from normalize_company_names import normalize_company_names, normalize_company_name_batch
+from verify_emails import verify_leads, verify_email, is_valid_email_format
+from enrich_personalization import enrich_leads, enrich_lead, DEFAULT_PAGE_CACHE_FILE
+from page_cache import PageCache
+from segment_by_personalization import segment_by_personalization
+from segment_by_job_title import segment_by_job_title
+from add_personalization_to_campaign import add_personalized_leads_to_campaign
+from add_leads_to_campaigns_segmented import add_leads_to_campaigns_segmented
+import add_leads_to_instantly
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# Load environment variables
+load_dotenv()
+
+STAGES = ("scrape", "validate", "filter", "normalize", "verify", "enrich", "segment", "upload")
+
+# Per-lead stages that --streaming runs concurrently
+STREAM_STAGES = ("validate", "filter", "normalize", "verify", "enrich")
+
+# With --streaming, leads the filter stage must see before it applies --min-quality (and
+# again after every further batch this size, and at the end of the stream). Leads that
+# pass are held back until the first check, so nothing is verified or enriched before it
+MIN_QUALITY_SAMPLE = 100
+
+DEFAULT_WORK_DIR = ".tmp"
+DEFAULT_MANIFEST_FILE = ".tmp/pipeline_manifest.json"
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class LowQualityError(Exception):
+    """Too few streamed leads passed validation; the stream stops before later stages spend on them."""
+
+
+# Source files whose code decides each stage's output (part of its manifest key)
+STAGE_MODULES = {
+    "scrape": ("scrape_leads_direct_api.py", "convert_csv_to_json.py", "yield_planner.py"),
+    "validate": ("validate_lead_quality.py", "icp_prefilter.py", "job_title_fit.py", "token_batcher.py"),
+    "filter": ("filter_validated_leads.py",),
+    "normalize": ("normalize_company_names.py",),
+    "verify": ("verify_emails.py",),
+    "enrich": ("enrich_personalization.py", "async_crawler.py", "link_discovery.py", "html_extract.py",
+               "parse_pool.py"),
+    "segment": ("segment_by_personalization.py", "segment_by_job_title.py"),
+    "upload": ("add_personalization_to_campaign.py", "add_leads_to_instantly.py", "add_leads_to_campaigns_segmented.py")
+}
+
+# Stage statuses that count as done
+DONE_STATUSES = ("success", "partial", "skipped")
+
+# Stages that produce a new lead file, and which checkpoint it is
+LEAD_CHECKPOINTS = {
+    "scrape": "leads",
+    "filter": "filtered",
+    "normalize": "normalized",
+    "verify": "verified",
+    "enrich": "personalized"
+}
+
+# In-memory payloads kept out of the manifest
+BULK_KEYS = ("leads", "segment_leads", "validation_details", "verification_details", "enrichment_details")
+
+
+def checkpoint_paths(work_dir=DEFAULT_WORK_DIR):
+    """
+    Hand-off files for each stage, named as in the workflow directive.
+
+    Args:
+        work_dir (str): Directory for checkpoints
+
+    Returns:
+        dict: Checkpoint name -> path
+    """
+    names = {
+        "leads": "full_leads.json",
+        "validation_report": "full_validation_report.json",
+        "filtered": "full_leads_filtered.json",
+        "filter_report": "filter_report.json",
+        "normalized": "full_leads_normalized.json",
+        "verified": "full_leads_verified.json",
+        "verification_report": "verification_report.json",
+        "personalized": "full_leads_personalized.json",
+        "personalization_report": "personalization_report.json",
+        "personalized_segment": "personalized_segment.json",
+        "non_personalized_segment": "non_personalized_segment.json",
+        "segment_mapping": "segment_mapping.json",
+        "upload_report": "upload_report.json"
+    }
+    return {name: os.path.join(work_dir, filename) for name, filename in names.items()}
+
+
+def file_hash(path):
+    """
+    SHA-256 of a file's contents, read in chunks.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: Hex digest, or None if the file doesn't exist
+    """
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(stage):
+    """
+    Hash of the source files a stage runs, so editing a stage's script reruns it.
+
+    Args:
+        stage (str): Stage name
+
+    Returns:
+        str: Hex digest over STAGE_MODULES[stage]
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return stable_hash({module: file_hash(os.path.join(script_dir, module)) for module in STAGE_MODULES[stage]})
+
+
+def load_manifest(manifest_file):
+    """
+    Load the run manifest, or start an empty one.
+
+    Args:
+        manifest_file (str): Manifest path
+
+    Returns:
+        dict: Manifest ({"stages": {stage: entry}})
+    """
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest.get("stages"), dict):
+                return manifest
+        except json.JSONDecodeError:
+            pass
+        print(f"⚠️  Could not read {manifest_file}, running every stage")
+
+    return {"stages": {}}
+
+
+def save_manifest(manifest_file, manifest):
+    """Atomically persist the run manifest."""
+    os.makedirs(os.path.dirname(manifest_file) if os.path.dirname(manifest_file) else ".tmp", exist_ok=True)
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, manifest_file)
+
+
+def outputs_unchanged(entry):
+    """Whether every output a manifest entry recorded is still on disk as it was written."""
+    return all(file_hash(path) == digest for path, digest in entry.get("outputs", {}).items())
+
+
+def job_title_segment_files(mapping_file, work_dir):
+    """The segment lead files a job title segment mapping points at."""
+    if not os.path.exists(mapping_file):
+        return []
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    return [os.path.join(work_dir, f"segment_{segment['segment_id']}_leads.json")
+            for segment in mapping.get("segments", [])]
+
+
+def summarize_result(result):
+    """A stage result without its in-memory lead payloads."""
+    return {k: v for k, v in result.items() if k not in BULK_KEYS}
+
+
+def save_report(path, report):
+    """Write a stage report JSON file."""
+    os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".tmp", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def run_streaming_stages(stages, source, paths, icp_criteria, offer_name=None, threshold=85, match_threshold=75,
+                         enrich_web=False, validation_cache=DEFAULT_CACHE_FILE, validation_details=None,
+                         keep_risky=False, verify_batch_size=10, enrich_batch_size=15, enrich_delay=0.2,
+                         validate_batch_size=100, queue_size=100, store_file=None, min_quality=0):
+    """
+    Run a contiguous run of the per-lead stages as one streaming pipeline.
+
+    Leads flow validate -> filter -> normalize -> verify -> enrich one at a time (validation
+    and normalization in small batches) with bounded queues between the stages, so a lead
+    can be enriched while later leads are still being validated. Each stage writes the
+    same checkpoint and report files as its batch version. The filter stage applies
+    min_quality after the first MIN_QUALITY_SAMPLE leads (holding back the ones that
+    pass until then), every MIN_QUALITY_SAMPLE leads after that and once the stream
+    ends, and stops the whole stream if too few passed, so verification and enrichment
+    credits aren't spent on a bad ICP.
+
+    Args:
+        stages (list): Stages to run, in STREAM_STAGES order
+        source (iterable): Input leads
+        paths (dict): Checkpoint paths from checkpoint_paths()
+        icp_criteria (dict): ICP criteria for validation
+        validation_details (list, optional): Existing verdicts, when "validate" is not streamed
+        validate_batch_size (int): Leads per validation micro-batch; larger batches share Claude calls (default: 100)
+        queue_size (int): Capacity of each queue between stages (default: 100)
+        min_quality (float): Stop the stream if fewer than this % of filtered leads pass (default: 0, never)
+        (other arguments as for run_pipeline)
+
+    Returns:
+        dict: Stage name -> (status, result); the last stage's result carries its leads. If a
+            stage fails, it and the stages after it are "error" and the stages before it
+            "incomplete" (the validation and filter reports still cover the leads processed)
+    """
+    api_keys = {"ANTHROPIC_API_KEY": {"validate", "normalize", "enrich"}, "ANYMAILFINDER_API_KEY": {"verify"}}
+    for key, needed_by in api_keys.items():
+        if needed_by & set(stages) and not os.getenv(key):
+            return {stage: ("error", {"message": f"{key} not found in .env file"}) for stage in stages}
+
+    pipeline = StreamPipeline(queue_size=queue_size)
+    last_stage = stages[-1]
+    writers = {}
+    results = {}
+    lock = threading.Lock()
+
+    validator = None
+    validation_results = []
+    if "validate" in stages:
+        validator = LeadValidator(icp_criteria, offer_name, match_threshold=match_threshold,
+                                  cache_file=validation_cache, enrich_web=enrich_web)
+
+        def score_batch(batch):
+            out = []
+            for lead, result in zip(batch, validator.score(batch)):
+                detail = build_validation_detail(lead, result, match_threshold)
+                validation_results.append(detail)
+                out.append((lead, detail))
+            return out
+
+        pipeline.add_batch_stage("validate", score_batch, batch_size=validate_batch_size)
+
+    removal_reasons = defaultdict(int)
+    filter_counts = {"original": 0}
+    if "filter" in stages:
+        validation_index = None if "validate" in stages else build_validation_index(validation_details or [])
+        writers["filter"] = LeadWriter(paths["filtered"], keep=last_stage == "filter")
+
+        # Passing leads held back until the first quality check (None once released)
+        held = {"leads": [] if min_quality else None}
+
+        def keep_valid(item):
+            lead, detail = item if validation_index is None else (item, find_validation_for_lead(item, validation_index))
+            filter_counts["original"] += 1
+            if detail and detail.get('valid'):
+                kept = [lead]
+            else:
+                if detail and detail.get('validation_error'):
+                    reason = 'validation_error'
+                elif detail:
+                    reason = extract_primary_reason(detail.get('reason') or 'unknown')
+                else:
+                    reason = 'not_in_validation_report'
+                removal_reasons[reason] += 1
+                kept = []
+
+            # Only the filter stage's single worker touches these counts
+            seen = filter_counts["original"]
+            if min_quality and seen % MIN_QUALITY_SAMPLE == 0:
+                check_quality()
+            if held["leads"] is not None:
+                held["leads"].extend(kept)
+                if seen < MIN_QUALITY_SAMPLE:
+                    return []
+                kept, held["leads"] = held["leads"], None
+            return kept
+
+        def finish_filter():
+            # Check the leads seen since the last check before any held ones move on
+            if min_quality and filter_counts["original"] % MIN_QUALITY_SAMPLE:
+                check_quality()
+            kept, held["leads"] = held["leads"] or [], None
+            return kept
+
+        def check_quality():
+            seen = filter_counts["original"]
+            passed = round((seen - sum(removal_reasons.values())) / seen * 100, 1)
+            if passed < min_quality:
+                raise LowQualityError(f"Only {passed}% of the first {seen} leads passed validation "
+                                      f"(minimum {min_quality}%), review the ICP criteria")
+
+        pipeline.add_stage("filter", keep_valid, on_output=writers["filter"].write, on_done=finish_filter)
+
+    normalized_mapping = {}
+    if "normalize" in stages:
+        writers["normalize"] = LeadWriter(paths["normalized"], keep=last_stage == "normalize")
+
+        def normalize_batch(batch):
+            names = [lead.get("company_name") or lead.get("companyName") or "" for lead in batch]
+            new_names = [name for name in dict.fromkeys(names) if name and name not in normalized_mapping]
+            if new_names:
+                try:
+                    normalized_mapping.update(normalize_company_name_batch(new_names, os.getenv("ANTHROPIC_API_KEY")))
+                except Exception as e:
+                    print(f"   ⚠️  Normalization batch failed: {str(e)}")
+                    normalized_mapping.update({name: name for name in new_names})
+            for lead, name in zip(batch, names):
+                lead["company_name_normalized"] = normalized_mapping.get(name, name)
+            return batch
+
+        pipeline.add_batch_stage("normalize", normalize_batch, batch_size=50, on_output=writers["normalize"].write)
+
+    session = requests.Session()
+    verification_details = []
+    verify_stats = {"total": 0, "valid": 0, "risky": 0, "invalid": 0, "error": 0, "no_email": 0}
+    if "verify" in stages:
+        writers["verify"] = LeadWriter(paths["verified"], keep=last_stage == "verify")
+
+        def verify_one(lead):
+            email = lead.get("email") or lead.get("personal_email") or ""
+            if not email:
+                result = {"email": None, "status": "no_email", "reason": "No email in lead data"}
+            elif not is_valid_email_format(email):
+                result = {"email": email, "status": "invalid", "reason": "Invalid email format (pre-filtered)"}
+            else:
+                result = verify_email(email, os.getenv("ANYMAILFINDER_API_KEY"), session=session)
+
+            keep_lead = result["status"] == "valid" or (result["status"] == "risky" and keep_risky)
+            with lock:
+                verify_stats["total"] += 1
+                verify_stats[result["status"] if result["status"] in verify_stats else "error"] += 1
+                verification_details.append({**result, "kept": keep_lead, "lead": lead})
+            return [lead] if keep_lead else []
+
+        pipeline.add_stage("verify", verify_one, workers=verify_batch_size, on_output=writers["verify"].write)
+
+    page_cache = None
+    if "enrich" in stages:
+        writers["enrich"] = LeadWriter(paths["personalized"], keep=last_stage == "enrich")
+        # The same on-disk page cache (and TTLs) as the batch enrich stage, so re-runs don't re-download sites
+        page_cache = PageCache(DEFAULT_PAGE_CACHE_FILE, ttl_days=7, negative_ttl_days=1)
+
+        def enrich_one(lead):
+            website = lead.get("company_website") or lead.get("website") or ""
+            if not website.strip():
+                return [{**lead, 'personalization': None, 'personalization_status': 'no_website'}]
+            return [enrich_lead(lead, os.getenv("ANTHROPIC_API_KEY"), enrich_delay, page_cache=page_cache)]
+
+        pipeline.add_stage("enrich", enrich_one, workers=enrich_batch_size, on_output=writers["enrich"].write)
+
+    def validation_summary():
+        valid_count = sum(1 for detail in validation_results if detail["valid"])
+        unscored_count = sum(1 for detail in validation_results if detail.get("validation_error"))
+        scored_count = len(validation_results) - unscored_count
+        quality_percentage = valid_count / scored_count * 100 if scored_count else 0
+        return {
+            "status": "success",
+            "passed": scored_count > 0 and quality_percentage >= threshold,
+            "quality_percentage": round(quality_percentage, 1),
+            "threshold": threshold,
+            "valid_count": valid_count,
+            "total_count": len(validation_results),
+            "unscored_count": unscored_count,
+            "icp_criteria": icp_criteria,
+            "streaming": True,
+            "validation_details": validation_results
+        }
+
+    def filter_summary():
+        original_count = filter_counts["original"]
+        filtered_count = original_count - sum(removal_reasons.values())
+        return {
+            "status": "success",
+            "original_count": original_count,
+            "filtered_count": filtered_count,
+            "removed_count": original_count - filtered_count,
+            "removal_reasons": dict(removal_reasons),
+            "output_file": paths["filtered"],
+            "quality_percentage": round(filtered_count / original_count * 100, 1) if original_count else 0
+        }
+
+    print(f"🌊 Streaming {' → '.join(stages)} (queues of {queue_size})")
+    failed_stage = None
+    try:
+        stream_stats = pipeline.run(source)
+    except StageError as e:
+        # A failing source counts against the first stage, a failing sink against the last
+        failed_stage = e.stage if e.stage in stages else stages[0] if e.stage == "source" else last_stage
+        failure = str(e.error) if isinstance(e.error, LowQualityError) else str(e)
+        for writer in writers.values():
+            writer.abort()
+    finally:
+        session.close()
+        if validator:
+            validator.close()
+        if page_cache:
+            page_cache.close()
+    if failed_stage is None:
+        for writer in writers.values():
+            writer.close()
+
+    if failed_stage:
+        # Keep the verdicts for the leads that were processed, so a rejected ICP can be reviewed;
+        # the stages before the failure are incomplete (rerun next time), the rest failed
+        failed_at = stages.index(failed_stage)
+        stopped = {"status": "error", "message": failure, "failed_stage": failed_stage}
+        if "validate" in stages:
+            report = {**validation_summary(), **stopped}
+            save_report(paths["validation_report"], report)
+            results["validate"] = report
+        if "filter" in stages:
+            report = {**filter_summary(), **stopped}
+            save_report(paths["filter_report"], report)
+            results["filter"] = report
+        return {stage: ("incomplete" if i < failed_at else "error", results.get(stage, stopped))
+                for i, stage in enumerate(stages)}
+
+    store = LeadStore(store_file) if store_file else None
+    try:
+        if "validate" in stages:
+            report = validation_summary()
+            save_report(paths["validation_report"], report)
+            if store:
+                store.record_validation(validation_results)
+            results["validate"] = ("success", report)
+
+        if "filter" in stages:
+            report = filter_summary()
+            save_report(paths["filter_report"], report)
+            results["filter"] = ("success", report)
+
+        if "normalize" in stages:
+            results["normalize"] = ("success", {
+                "status": "success",
+                "total_leads": writers["normalize"].count,
+                "unique_companies": len(normalized_mapping),
+                "file": paths["normalized"]
+            })
+
+        if "verify" in stages:
+            kept_count = writers["verify"].count
+            report = {
+                "status": "success",
+                "statistics": {**verify_stats, "kept": kept_count, "removed": verify_stats["total"] - kept_count},
+                "settings": {"keep_risky": keep_risky, "batch_size": verify_batch_size},
+                "verification_details": verification_details
+            }
+            save_report(paths["verification_report"], report)
+            record_stage_yield("verification", verify_stats["total"], kept_count)
+            if store:
+                store.record_verification(verification_details)
+            results["verify"] = ("success", report)
+
+        if "enrich" in stages:
+            enriched = writers["enrich"].leads
+            statuses = defaultdict(int)
+            for lead in enriched:
+                statuses[lead.get("personalization_status") or "unknown"] += 1
+            success = sum(1 for lead in enriched if lead.get("personalization_status") == "success" and lead.get("personalization"))
+            report = {
+                "status": "success",
+                "statistics": {
+                    "total": len(enriched),
+                    "success": success,
+                    "statuses": dict(statuses),
+                    "success_percentage": round(success / len(enriched) * 100, 1) if enriched else 0
+                }
+            }
+            save_report(paths["personalization_report"], report)
+            if store:
+                store.record_personalization(enriched)
+            results["enrich"] = ("success", report)
+    finally:
+        if store:
+            store.close()
+
+    # The last stage hands its leads on in memory (to the segment stage)
+    if last_stage in writers:
+        results[last_stage][1]["leads"] = writers[last_stage].leads
+
+    # Wall clock vs the time each stage spent working: streaming pays for the slowest stage, not the sum
+    stage_seconds = {name: stats["stage_seconds"] for name, stats in stream_stats["stages"].items()}
+    print(f"\n🌊 Streamed in {stream_stats['seconds']}s; back to back the stages would take "
+          f"{round(sum(stage_seconds.values()), 2)}s ({', '.join(f'{name} {seconds}s' for name, seconds in stage_seconds.items())})")
+    results[stages[0]][1]["streaming"] = stream_stats
+    return results
+
+
+def run_pipeline(query=None, limit=100, location=None, employee_count=None, revenue_range=None, industries=None,
+                 input_file=None, icp_criteria=None, offer_name=None, threshold=85, match_threshold=75,
+                 min_quality=50, enrich_web=False, validation_cache=DEFAULT_CACHE_FILE, async_run=False,
+                 plan_yield=None, skip_verify=False, keep_risky=False, verify_batch_size=10,
+                 skip_enrich=False, enrich_batch_size=15, enrich_delay=0.2,
+                 job_title_segments=False, min_segment_size=10,
+                 personalized_campaign=None, non_personalized_campaign=None, campaigns_file=None,
+                 work_dir=DEFAULT_WORK_DIR, manifest_file=DEFAULT_MANIFEST_FILE, force=False, rerun=None, store_file=None,
+                 streaming=False, queue_size=100, validate_batch_size=100):
+    """
+    Run every workflow stage in order, passing leads between stages in memory.
+
+    A stage is skipped, reusing its output from an earlier run, when the manifest shows
+    it already ran on the same input files with the same parameters and code and its
+    outputs are untouched. Changing one parameter therefore reruns the stage that uses
+    it and only those downstream stages whose inputs actually change.
+
+    With streaming=True the per-lead stages (validate through enrich) run concurrently,
+    each lead moving on as soon as it is ready (see run_streaming_stages()).
+
+    Args:
+        query (str): Apify search query (required unless input_file is given)
+        limit (int): Number of leads to scrape
+        location (list, optional): Geographic filters
+        employee_count (list, optional): Employee count filters
+        revenue_range (str, optional): Revenue range filter
+        industries (list, optional): Industry filters
+        input_file (str, optional): Existing leads (JSON/NDJSON, or .csv) to start from instead of scraping
+        icp_criteria (dict): ICP criteria for validation
+        offer_name (str, optional): Offer being sold (helps validation)
+        threshold (int): Validation pass threshold, informational (default: 85)
+        match_threshold (int): Minimum ICP match percentage to keep a lead (default: 75)
+        min_quality (float): Stop after filtering if fewer than this % of leads passed (default: 50)
+        enrich_web (bool): Fetch company homepages during validation
+        validation_cache (str, optional): Validation cache path, None to disable
+        async_run (bool): Scrape with an async Apify run (large limits)
+        plan_yield (bool, optional): Treat limit as uploadable leads wanted and over-fetch (default None: when the test-batch validation report was scored against icp_criteria)
+        skip_verify (bool): Skip email verification
+        keep_risky (bool): Keep leads with "risky" email status
+        verify_batch_size (int): Concurrent verification requests
+        skip_enrich (bool): Skip personalization enrichment
+        enrich_batch_size (int): Concurrent enrichment tasks
+        enrich_delay (float): Delay between page requests during enrichment
+        job_title_segments (bool): Also segment the final leads by job title
+        min_segment_size (int): Minimum leads per job title segment
+        personalized_campaign (str, optional): Instantly campaign ID for the personalized segment
+        non_personalized_campaign (str, optional): Instantly campaign ID for the non-personalized segment
+        campaigns_file (str, optional): Campaign IDs file for uploading job title segments
+        work_dir (str): Directory for the stage checkpoints (default: .tmp)
+        manifest_file (str): Run manifest path
+        force (bool): Run every stage, even those the manifest says are up to date
+        rerun (list, optional): Stages to run even if they are up to date
+        store_file (str, optional): SQLite lead store every stage also records into
+        streaming (bool): Stream leads through validate -> enrich instead of running the stages one after another
+        queue_size (int): Capacity of each queue between streaming stages (default: 100)
+        validate_batch_size (int): Leads per validation micro-batch when streaming (default: 100)
+
+    Returns:
+        dict: Pipeline result with per-stage summaries
+    """
+    if not query and not input_file:
+        return {
+            "status": "error",
+            "message": "Either a scrape query or an input file is required"
+        }
+
+    paths = checkpoint_paths(work_dir)
+    manifest = load_manifest(manifest_file)
+    rerun = set(rerun or ())
+
+    # What flows between stages: the current leads (in memory, or None until loaded from
+    # lead_file), the validation report and the segment leads
+    leads = None
+    lead_file = None
+    validation_report = None
+    segment_leads = None
+    stream_results = {}
+
+    def current_leads():
+        nonlocal leads
+        if leads is None:
+            print(f"📂 Loading checkpoint {lead_file}")
+            leads = read_leads(lead_file)
+        return leads
+
+    def stage_params(stage):
+        """The parameters that decide a stage's output (part of its manifest key)."""
+        if stage == "scrape":
+            return {"query": query, "limit": limit, "location": location, "employee_count": employee_count,
+                    "revenue_range": revenue_range, "industries": industries, "input_file": input_file,
+                    "plan_yield": plan_yield}
+        if stage == "validate":
+            return {"icp_criteria": icp_criteria or {}, "offer_name": offer_name, "threshold": threshold,
+                    "match_threshold": match_threshold, "enrich_web": enrich_web}
+        if stage == "filter":
+            return {"min_quality": min_quality}
+        if stage == "verify":
+            return {"skip_verify": skip_verify, "keep_risky": keep_risky}
+        if stage == "enrich":
+            return {"skip_enrich": skip_enrich}
+        if stage == "segment":
+            return {"job_title_segments": job_title_segments,
+                    "min_segment_size": min_segment_size if job_title_segments else None}
+        if stage == "upload":
+            return {"personalized_campaign": personalized_campaign,
+                    "non_personalized_campaign": non_personalized_campaign, "campaigns_file": campaigns_file}
+        return {}
+
+    def stage_inputs(stage):
+        """The files a stage reads, given what the stages before it produced."""
+        if stage == "scrape":
+            if input_file:
+                return [input_file]
+            # A planned scrape is sized from the test-batch report: a new report means a new scrape
+            return [DEFAULT_VALIDATION_REPORT] if plan_yield is not False else []
+        if stage == "filter":
+            return [lead_file, paths["validation_report"]]
+        if stage == "upload":
+            return ([paths["personalized_segment"], paths["non_personalized_segment"], paths["segment_mapping"]]
+                    + job_title_segment_files(paths["segment_mapping"], work_dir)
+                    + ([campaigns_file] if campaigns_file else []))
+        return [lead_file]
+
+    def stage_outputs(stage):
+        """The files a stage wrote, to check they are untouched before reusing them."""
+        if stage == "scrape":
+            return [lead_file]
+        if stage == "validate":
+            return [paths["validation_report"]]
+        if stage == "filter":
+            return [paths["filtered"], paths["filter_report"]]
+        if stage == "normalize":
+            return [paths["normalized"]]
+        if stage == "verify":
+            return [paths["verified"], paths["verification_report"]]
+        if stage == "enrich":
+            return [paths["personalized"], paths["personalization_report"]]
+        if stage == "segment":
+            outputs = [paths["personalized_segment"], paths["non_personalized_segment"]]
+            if job_title_segments:
+                outputs += [paths["segment_mapping"]] + job_title_segment_files(paths["segment_mapping"], work_dir)
+            return outputs
+        if stage == "upload" and campaigns_file:
+            return [paths["upload_report"]]
+        return []
+
+    def run_stage(stage):
+        """Run one stage; returns (status, result)."""
+        nonlocal leads, lead_file, validation_report, segment_leads
+
+        if (stage == "verify" and skip_verify) or (stage == "enrich" and skip_enrich):
+            return "skipped", {}
+
+        if streaming and stage in STREAM_STAGES:
+            if stage not in stream_results:
+                # Stream this stage and every per-lead stage after it in one go
+                stream_stages = [s for s in STREAM_STAGES[STREAM_STAGES.index(stage):]
+                                 if not (s == "verify" and skip_verify) and not (s == "enrich" and skip_enrich)]
+                if "validate" not in stream_stages and validation_report is None:
+                    with open(paths["validation_report"], 'r', encoding='utf-8') as f:
+                        validation_report = json.load(f)
+                stream_results.update(run_streaming_stages(
+                    stream_stages, leads if leads is not None else iter_leads(lead_file), paths, icp_criteria or {},
+                    offer_name=offer_name, threshold=threshold, match_threshold=match_threshold,
+                    enrich_web=enrich_web, validation_cache=validation_cache,
+                    validation_details=validation_report.get("validation_details", []) if validation_report else None,
+                    keep_risky=keep_risky, verify_batch_size=verify_batch_size, enrich_batch_size=enrich_batch_size,
+                    enrich_delay=enrich_delay, validate_batch_size=validate_batch_size, queue_size=queue_size,
+                    store_file=store_file, min_quality=min_quality
+                ))
+            return stream_results.pop(stage)
+
+        if stage == "scrape":
+            if input_file and input_file.lower().endswith(".csv"):
+                result = convert_csv_to_json(input_file, paths["leads"], store_file=store_file)
+                lead_file = paths["leads"]
+            elif input_file:
+                result = {"status": "success", "file": input_file}
+                lead_file = input_file
+            else:
+                result = scrape_leads_direct(
+                    query, limit=limit, location=location, employee_count=employee_count,
+                    revenue_range=revenue_range, industries=industries, output_file=paths["leads"],
+                    async_run=async_run, plan_yield=plan_yield, icp_criteria=icp_criteria, store_file=store_file
+                )
+                lead_file = paths["leads"]
+            leads = None
+            return result.get("status"), result
+
+        if stage == "validate":
+            result = validate_leads(
+                lead_file, icp_criteria or {}, threshold=threshold, output_file=paths["validation_report"],
+                enrich_web=enrich_web, offer_name=offer_name, match_threshold=match_threshold,
+                cache_file=validation_cache, store_file=store_file, leads=current_leads()
+            )
+            validation_report = result
+            return result.get("status"), result
+
+        if stage == "filter":
+            if validation_report is None:
+                with open(paths["validation_report"], 'r', encoding='utf-8') as f:
+                    validation_report = json.load(f)
+            result = filter_validated_leads(
+                lead_file, paths["validation_report"], paths["filtered"], paths["filter_report"],
+                store_file=store_file, leads=current_leads(),
+                validation_details=validation_report.get("validation_details", [])
+            )
+            return result.get("status"), result
+
+        if stage == "normalize":
+            result = normalize_company_names(lead_file, paths["normalized"], leads=current_leads())
+            return result.get("status"), result
+
+        if stage == "verify":
+            result = verify_leads(
+                lead_file, paths["verified"], paths["verification_report"], keep_risky=keep_risky,
+                batch_size=verify_batch_size, store_file=store_file, leads=current_leads()
+            )
+            return result.get("status"), result
+
+        if stage == "enrich":
+            result = enrich_leads(
+                lead_file, paths["personalized"], paths["personalization_report"], batch_size=enrich_batch_size,
+                delay=enrich_delay, store_file=store_file, leads=current_leads()
+            )
+            return result.get("status"), result
+
+        if stage == "segment":
+            result = segment_by_personalization(
+                lead_file, paths["personalized_segment"], paths["non_personalized_segment"],
+                store_file=store_file, leads=current_leads()
+            )
+            if result.get("status") != "success":
+                return result.get("status"), result
+            segment_leads = {"personalization": result["segment_leads"]}
+
+            if job_title_segments:
+                job_title_result = segment_by_job_title(
+                    lead_file, paths["segment_mapping"], output_dir=work_dir, min_segment_size=min_segment_size,
+                    store_file=store_file, leads=current_leads()
+                )
+                if job_title_result.get("status") != "success":
+                    return job_title_result.get("status"), job_title_result
+                segment_leads["job_title"] = job_title_result["segment_leads"]
+                result["job_title"] = summarize_result(job_title_result)
+            return "success", result
+
+        if stage == "upload":
+            if not (personalized_campaign or non_personalized_campaign or campaigns_file):
+                return "skipped", {}
+            if segment_leads is None:
+                segment_leads = {"personalization": {
+                    "personalized": read_leads(paths["personalized_segment"]) if os.path.exists(paths["personalized_segment"]) else [],
+                    "non_personalized": read_leads(paths["non_personalized_segment"]) if os.path.exists(paths["non_personalized_segment"]) else []
+                }}
+
+            uploads = {}
+            if personalized_campaign:
+                uploads["personalized"] = add_personalized_leads_to_campaign(
+                    paths["personalized_segment"], personalized_campaign,
+                    leads=segment_leads["personalization"]["personalized"] or []
+                )
+            if non_personalized_campaign:
+                api_key = os.getenv("INSTANTLY_API_KEY")
+                if not api_key:
+                    uploads["non_personalized"] = {"status": "error", "message": "INSTANTLY_API_KEY not found in .env file"}
+                else:
+                    uploads["non_personalized"] = add_leads_to_instantly.add_leads_to_campaign(
+                        segment_leads["personalization"]["non_personalized"] or [], non_personalized_campaign,
+                        "Non-personalized segment", api_key
+                    )
+            if campaigns_file:
+                uploads["job_title"] = add_leads_to_campaigns_segmented(
+                    campaigns_file, paths["segment_mapping"], work_dir, paths["upload_report"],
+                    store_file=store_file, segment_leads=segment_leads.get("job_title")
+                )
+
+            statuses = {upload.get("status") for upload in uploads.values()}
+            status = "error" if statuses == {"error"} else "success" if statuses == {"success"} else "partial"
+            return status, {"status": status, "uploads": uploads}
+
+    pipeline_started = time.monotonic()
+    stage_summaries = {}
+
+    print(f"🚀 Running lead pipeline ({' → '.join(STAGES)})")
+    print(f"   Checkpoints: {work_dir}/   Manifest: {manifest_file}")
+    print()
+
+    for stage in STAGES:
+        input_hashes = {path: file_hash(path) for path in stage_inputs(stage)}
+        key = stable_hash({
+            "stage": stage,
+            "params": stage_params(stage),
+            "code": code_version(stage),
+            "inputs": list(input_hashes.values())
+        })
+
+        saved = manifest["stages"].get(stage)
+        # Stages already run by the current streaming pipeline are recorded, not skipped
+        if (stage not in stream_results and not force and stage not in rerun and saved
+                and saved.get("key") == key and saved["status"] in DONE_STATUSES and outputs_unchanged(saved)):
+            print(f"⏭️  {stage}: inputs, parameters and code unchanged, reusing its output")
+            if stage in LEAD_CHECKPOINTS and saved["status"] != "skipped":
+                lead_file = saved["lead_output"]
+                leads = None
+            if stage == "validate":
+                validation_report = None
+            if stage == "segment":
+                segment_leads = None
+            stage_summaries[stage] = {**saved, "reused": True}
+            continue
+
+        print("\n" + "="*60)
+        print(f"▶️  Stage: {stage}")
+        print("="*60)
+
+        started = time.monotonic()
+        try:
+            status, result = run_stage(stage)
+        except (OSError, ValueError) as e:
+            status, result = "error", {"message": f"{type(e).__name__}: {e}"}
+
+        if stage == "filter" and status == "success" and result["quality_percentage"] < min_quality:
+            status = "error"
+            result = {**result, "message": f"Only {result['quality_percentage']}% of leads passed validation "
+                                           f"(minimum {min_quality}%), review the ICP criteria"}
+
+        if status == "success" and stage in LEAD_CHECKPOINTS:
+            # Hand the stage's output on in memory; the file it wrote is the checkpoint
+            if stage != "scrape":
+                lead_file = paths[LEAD_CHECKPOINTS[stage]]
+                leads = result.get("leads")
+
+        manifest["stages"][stage] = {
+            "key": key,
+            "status": status,
+            "params": stage_params(stage),
+            "code": code_version(stage),
+            "inputs": input_hashes,
+            "outputs": {path: file_hash(path) for path in stage_outputs(stage)} if status != "skipped" else {},
+            "lead_output": lead_file if stage in LEAD_CHECKPOINTS else None,
+            "seconds": round(time.monotonic() - started, 2),
+            "finished_at": datetime.now().isoformat(),
+            "result": summarize_result(result)
+        }
+        save_manifest(manifest_file, manifest)
+        stage_summaries[stage] = manifest["stages"][stage]
+
+        if status == "incomplete":
+            print(f"⚠️  {stage}: cut short when a later streaming stage failed; it will run again next time")
+            continue
+
+        if status not in DONE_STATUSES:
+            print(f"\n❌ Pipeline stopped at {stage}: {result.get('message', 'stage failed')}")
+            print(f"   Fix the problem and re-run; stages that are still up to date will be skipped")
+            return {
+                "status": "error",
+                "failed_stage": stage,
+                "message": result.get("message", f"Stage {stage} failed"),
+                "stages": stage_summaries,
+                "manifest_file": manifest_file
+            }
+
+    total_seconds = time.monotonic() - pipeline_started
+
+    print("\n" + "="*60)
+    print(f"📊 Pipeline complete in {total_seconds:.1f}s")
+    for stage in STAGES:
+        summary = stage_summaries[stage]
+        seconds = 0 if summary.get("reused") else summary.get("seconds", 0)
+        print(f"   {stage:<10} {summary['status']:<8} {seconds:>8.1f}s{'  (reused)' if summary.get('reused') else ''}")
+    reused = [stage for stage in STAGES if stage_summaries[stage].get("reused")]
+    print(f"   Reused from earlier runs: {', '.join(reused) if reused else 'none'}")
+    print(f"   Manifest: {manifest_file}")
+
+    return {
+        "status": "success",
+        "stages": stage_summaries,
+        "final_leads": lead_file,
+        "seconds": round(total_seconds, 2),
+        "reused_stages": reused,
+        "manifest_file": manifest_file
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the lead generation workflow in one process, passing leads between stages in memory")
+
+    # Source
+    parser.add_argument("--query", help="Apify search query")
+    parser.add_argument("--limit", type=int, default=100, help="Number of leads to scrape (default: 100)")
+    parser.add_argument("--location", action="append", help="Geographic filter (repeat for several locations)")
+    parser.add_argument("--employees", help="Employee count filter (e.g., '10-50')")
+    parser.add_argument("--revenue", help="Revenue range filter (e.g., '$1M-$10M')")
+    parser.add_argument("--industries", help="Comma-separated list of industries")
+    parser.add_argument("--input", help="Start from this leads file (JSON/NDJSON, or CSV) instead of scraping")
+    parser.add_argument("--async-run", action="store_true", help="Scrape with an async Apify run (large limits)")
+    parser.add_argument("--plan-yield", dest="plan_yield", action="store_true", default=None, help="Treat --limit as uploadable leads wanted and over-fetch (default: on when .tmp/validation_report.json was scored against the same --icp-* criteria)")
+    parser.add_argument("--no-plan-yield", dest="plan_yield", action="store_false", help="Scrape exactly --limit leads")
+
+    # Validation
+    parser.add_argument("--icp-industry", help="Target industry/niche")
+    parser.add_argument("--icp-location", help="Target location/geography")
+    parser.add_argument("--icp-employees", help="Target employee range")
+    parser.add_argument("--icp-revenue", help="Target revenue range")
+    parser.add_argument("--icp-description", help="Detailed ICP description")
+    parser.add_argument("--icp-job-title", help="Target job titles/roles")
+    parser.add_argument("--offer", help="Offer/product name being sold")
+    parser.add_argument("--threshold", type=int, default=85, help="Validation pass threshold %% (informational, default: 85)")
+    parser.add_argument("--match-threshold", type=int, default=75, help="Minimum ICP match %% to keep a lead (default: 75)")
+    parser.add_argument("--min-quality", type=float, default=50, help="Stop if fewer than this %% of leads pass validation (default: 50)")
+    parser.add_argument("--enrich-web", action="store_true", help="Fetch company websites during validation")
+    parser.add_argument("--no-validation-cache", action="store_true", help="Don't use the validation cache")
+
+    # Verification and enrichment
+    parser.add_argument("--skip-verify", action="store_true", help="Skip email verification")
+    parser.add_argument("--keep-risky", action="store_true", help="Keep leads with 'risky' email status")
+    parser.add_argument("--verify-batch-size", type=int, default=10, help="Concurrent verification requests (default: 10)")
+    parser.add_argument("--skip-enrich", action="store_true", help="Skip personalization enrichment")
+    parser.add_argument("--enrich-batch-size", type=int, default=15, help="Concurrent enrichment tasks (default: 15)")
+    parser.add_argument("--enrich-delay", type=float, default=0.2, help="Delay between page requests (default: 0.2)")
+
+    # Segmentation and upload
+    parser.add_argument("--job-title-segments", action="store_true", help="Also segment the final leads by job title")
+    parser.add_argument("--min-segment-size", type=int, default=10, help="Minimum leads per job title segment (default: 10)")
+    parser.add_argument("--personalized-campaign", help="Instantly campaign ID for the personalized segment")
+    parser.add_argument("--non-personalized-campaign", help="Instantly campaign ID for the non-personalized segment")
+    parser.add_argument("--campaigns", help="Campaign IDs file for uploading job title segments (needs --job-title-segments)")
+
+    # Run control
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help=f"Directory for stage checkpoints (default: {DEFAULT_WORK_DIR})")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST_FILE, help=f"Run manifest file (default: {DEFAULT_MANIFEST_FILE})")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if the manifest says it is up to date")
+    parser.add_argument("--rerun", action="append", choices=STAGES, help="Run this stage even if it is up to date (repeatable)")
+    parser.add_argument("--store", help="Also record every stage in this SQLite lead store (e.g. .tmp/leads.sqlite)")
+    parser.add_argument("--streaming", action="store_true", help="Stream leads through validate → filter → normalize → verify → enrich concurrently")
+    parser.add_argument("--queue-size", type=int, default=100, help="Leads buffered between streaming stages (default: 100)")
+    parser.add_argument("--validate-batch-size", type=int, default=100, help="Leads per validation micro-batch when streaming (default: 100)")
+
+    args = parser.parse_args()
+
+    if not args.query and not args.input:
+        parser.error("one of --query or --input is required")
+    if args.campaigns and not args.job_title_segments:
+        parser.error("--campaigns uploads job title segments and needs --job-title-segments")
+
+    icp_criteria = {}
+    for key, value in (("industry", args.icp_industry), ("location", args.icp_location),
+                       ("employees", args.icp_employees), ("revenue", args.icp_revenue),
+                       ("description", args.icp_description), ("job_title", args.icp_job_title)):
+        if value:
+            icp_criteria[key] = value
+
+    result = run_pipeline(
+        query=args.query,
+        limit=args.limit,
+        location=args.location,
+        employee_count=args.employees.split(',') if args.employees else None,
+        revenue_range=args.revenue,
+        industries=args.industries.split(',') if args.industries else None,
+        input_file=args.input,
+        icp_criteria=icp_criteria,
+        offer_name=args.offer,
+        threshold=args.threshold,
+        match_threshold=args.match_threshold,
+        min_quality=args.min_quality,
+        enrich_web=args.enrich_web,
+        validation_cache=None if args.no_validation_cache else DEFAULT_CACHE_FILE,
+        async_run=args.async_run,
+        plan_yield=args.plan_yield,
+        skip_verify=args.skip_verify,
+        keep_risky=args.keep_risky,
+        verify_batch_size=args.verify_batch_size,
+        skip_enrich=args.skip_enrich,
+        enrich_batch_size=args.enrich_batch_size,
+        enrich_delay=args.enrich_delay,
+        job_title_segments=args.job_title_segments,
+        min_segment_size=args.min_segment_size,
+        personalized_campaign=args.personalized_campaign,
+        non_personalized_campaign=args.non_personalized_campaign,
+        campaigns_file=args.campaigns,
+        work_dir=args.work_dir,
+        manifest_file=args.manifest,
+        force=args.force,
+        rerun=args.rerun,
+        store_file=args.store,
+        streaming=args.streaming,
+        queue_size=args.queue_size,
+        validate_batch_size=args.validate_batch_size
+    )
+
+    # Print result as JSON
+    print("\n" + "="*60)
+    print(json.dumps({k: v for k, v in result.items() if k != "stages"}, indent=2))
+
+    sys.exit(0 if result["status"] == "success" else 1)
+
+
+if __name__ == "__main__":
+    main()
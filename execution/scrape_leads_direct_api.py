@@ -3,14 +3,39 @@ Scrape leads using direct Apify API endpoint for code_crafter/leads-finder.
 
 Usage:
     python scrape_leads_direct_api.py --query "Solar PV installers UK" --limit 25 --output test_leads.json
+
+    # Large runs: start the actor asynchronously and page dataset items to disk as they arrive
+    python scrape_leads_direct_api.py --query "Solar PV installers UK" --limit 5000 --async-run --output .tmp/full_leads.json
+
+    # Resume paging after an interruption (reuses the saved run, no new actor run)
+    python scrape_leads_direct_api.py --query "Solar PV installers UK" --limit 5000 --resume --output .tmp/full_leads.json
+
+    # Full scrape sized from the test batch: when .tmp/validation_report.json was scored against the
+    # same ICP, --limit is the number of uploadable leads wanted (--no-plan-yield fetches exactly --limit)
+    python scrape_leads_direct_api.py --query "Solar PV installers UK" --limit 500 --async-run --output .tmp/full_leads.json \
+        --icp-industry "Solar PV installers" --icp-location "UK"
 """
 
 import os
 import sys
+import glob
 import json
+import math
+import time
+import shutil
 import argparse
+import itertools
+import threading
 import requests
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from validation_cache import stable_hash
+from lead_io import iter_leads, write_leads, is_ndjson_path
+from lead_store import LeadStore, assign_lead_ids
+from yield_planner import plan_from_files, load_validation_counts, report_matches_icp, DEFAULT_VALIDATION_REPORT, DEFAULT_HISTORY_FILE
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -19,35 +44,40 @@ if sys.platform == 'win32':
 # Load environment variables
 load_dotenv()
 
+APIFY_API_BASE = "https://api.apify.com/v2"
+ACTOR_ID = "code_crafter~leads-finder"
 
-def scrape_leads_direct(query, limit=25, location=None, employee_count=None, revenue_range=None,
-                         industries=None, excluded_industries=None, excluded_job_titles=None, output_file="leads.json"):
+DEFAULT_STATE_FILE = ".tmp/scrape_state.json"
+DEFAULT_CACHE_DIR = ".tmp/scrape_cache"
+
+# Previous pipeline outputs whose companies --delta excludes
+DEFAULT_KNOWN_LEADS = [".tmp/*.json", ".tmp/*.ndjson"]
+
+# Apify run statuses after which no more dataset items will appear
+TERMINAL_RUN_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+# Actor input list fields a large scrape can be split on, most useful first
+SHARD_FACETS = ("contact_location", "size", "company_industry")
+
+
+def build_actor_input(query, limit=25, location=None, employee_count=None, revenue_range=None,
+                      industries=None, excluded_industries=None, excluded_job_titles=None):
     """
-    Scrape leads using direct Apify API endpoint.
+    Build the code_crafter/leads-finder actor input from scrape filters.
 
     Args:
         query (str): Search query
         limit (int): Number of leads to scrape
-        location (str): Geographic filter
+        location (str or list): Geographic filter (one or several locations)
         employee_count (str or list): Employee count filter (e.g., "51-100" or ["1-10", "11-20"])
         revenue_range (str): Revenue range filter (e.g., "$25M-$50M")
-        output_file (str): Output JSON file path
+        industries (list): Industries to include
+        excluded_industries (list): Industries to exclude
+        excluded_job_titles (list): Job titles to exclude
 
     Returns:
-        dict: Results with status and file path
+        dict: Actor input
     """
-
-    # Get API token
-    api_token = os.getenv("APIFY_API_TOKEN")
-    if not api_token:
-        return {
-            "status": "error",
-            "message": "APIFY_API_TOKEN not found in .env file"
-        }
-
-    # API endpoint
-    api_url = f"https://api.apify.com/v2/acts/code_crafter~leads-finder/run-sync-get-dataset-items?token={api_token}"
-
     # Handle employee_count - convert to list if it's a string or already a list
     employee_sizes = []
     if employee_count:
@@ -56,11 +86,15 @@ def scrape_leads_direct(query, limit=25, location=None, employee_count=None, rev
         else:
             employee_sizes = [employee_count]
 
+    locations = []
+    if location:
+        locations = location if isinstance(location, list) else [location]
+
     # Configure actor input with CORRECT field names from Apify API
     actor_input = {
         "fetch_count": limit,  # CRITICAL: This is the correct field for limiting leads
         "company_keywords": query.split() if query else [],  # Split query into keywords
-        "contact_location": [location.lower()] if location else [],  # Must be lowercase
+        "contact_location": [loc.strip().lower() for loc in locations],  # Must be lowercase
         "size": employee_sizes,  # Can be multiple size ranges
         "company_industry": industries if industries else [],
         "company_not_industry": excluded_industries if excluded_industries else [],
@@ -84,13 +118,796 @@ def scrape_leads_direct(query, limit=25, location=None, employee_count=None, rev
         if len(parts) >= 2:
             actor_input["max_revenue"] = parts[1].strip()  # e.g., "50M"
 
-    print(f"🔍 Starting direct API lead scrape...")
-    print(f"   Company Keywords: {query}")
-    print(f"   Location: {location or 'Not specified'}")
-    print(f"   Company Size: {employee_count or 'Not specified'}")
-    print(f"   Revenue Range: {revenue_range or 'Not specified'}")
-    print(f"   Fetch Count (EXACT LIMIT): {limit}")
-    print(f"   API: code_crafter/leads-finder")
+    return actor_input
+
+
+def apify_request(method, path, api_token, max_retries=4, session=None, **kwargs):
+    """
+    Call the Apify API, retrying transient failures with exponential backoff.
+
+    Args:
+        method (str): HTTP method
+        path (str): API path (e.g. "/actor-runs/abc")
+        api_token (str): Apify API token
+        max_retries (int): Maximum attempts for timeouts, connection errors, 429s and 5xx
+        session (requests.Session): Optional session for connection pooling
+        **kwargs: Passed to requests (json, params, timeout)
+
+    Returns:
+        requests.Response: Final response (may be a non-retryable error status)
+    """
+    http_client = session if session else requests
+    params = dict(kwargs.pop("params", None) or {})
+    params["token"] = api_token
+    kwargs.setdefault("timeout", 90)
+
+    for attempt in range(max_retries):
+        try:
+            response = http_client.request(method, f"{APIFY_API_BASE}{path}", params=params, **kwargs)
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt == max_retries - 1:
+                return response
+            print(f"   ⚠️  Apify returned {response.status_code}, retrying...")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if attempt == max_retries - 1:
+                raise
+            print(f"   ⚠️  Apify request failed, retrying...")
+        time.sleep(2 ** attempt)
+
+
+def save_scrape_state(state_file, state):
+    """Atomically persist async scrape state (run ID, dataset ID, paging offset)."""
+    os.makedirs(os.path.dirname(state_file) if os.path.dirname(state_file) else ".tmp", exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def count_spooled_items(part_file):
+    """
+    Count complete items in a spool file, dropping a partially written last line.
+
+    Args:
+        part_file (str): NDJSON spool path
+
+    Returns:
+        int: Number of complete items (the offset to resume paging from)
+    """
+    if not os.path.exists(part_file):
+        return 0
+
+    count = 0
+    valid_bytes = 0
+    with open(part_file, 'rb') as f:
+        for line in f:
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            valid_bytes += len(line)
+
+    # Truncate anything after the last complete item (crash mid-write)
+    if valid_bytes != os.path.getsize(part_file):
+        with open(part_file, 'rb+') as f:
+            f.truncate(valid_bytes)
+
+    return count
+
+
+def write_json_array_from_spool(part_file, output_file, limit):
+    """
+    Convert the NDJSON spool into the output file, one item at a time.
+
+    The output is the JSON array the rest of the pipeline reads, or NDJSON if
+    output_file has a .ndjson/.jsonl extension. Each lead is stamped with its lead_id.
+
+    Args:
+        part_file (str): NDJSON spool path
+        output_file (str): Output file path
+        limit (int): Maximum items to write
+
+    Returns:
+        int: Items written
+    """
+    return write_leads(output_file, assign_lead_ids(itertools.islice(iter_leads(part_file), limit)))
+
+
+def start_actor_run(actor_input, api_token, session=None):
+    """
+    Start an asynchronous actor run.
+
+    Args:
+        actor_input (dict): Actor input
+        api_token (str): Apify API token
+        session (requests.Session): Optional session for connection pooling
+
+    Returns:
+        dict: Run data ("id", "defaultDatasetId", "status", ...)
+
+    Raises:
+        RuntimeError: If Apify refuses to start the run
+    """
+    response = apify_request("POST", f"/acts/{ACTOR_ID}/runs", api_token, session=session, json=actor_input)
+    if response.status_code not in [200, 201]:
+        raise RuntimeError(f"API returned status {response.status_code}: {response.text}")
+    return response.json()["data"]
+
+
+def abort_actor_run(run_id, api_token, session=None):
+    """Abort a running actor run so it stops fetching (and billing) leads we no longer need."""
+    try:
+        apify_request("POST", f"/actor-runs/{run_id}/abort", api_token, max_retries=2, session=session)
+    except requests.exceptions.RequestException:
+        pass
+
+
+def page_run_items(state, limit, api_token, session=None, poll_interval=10, page_size=1000, stop_event=None):
+    """
+    Page a run's dataset items as they appear until `limit` items are read or the run ends.
+
+    `state["offset"]` and `state["status"]` are updated before each page is yielded,
+    so the caller can persist them once the page is safely stored.
+
+    Args:
+        state (dict): Run state with "run_id", "dataset_id" and "offset"
+        limit (int): Maximum items to read from the dataset
+        api_token (str): Apify API token
+        session (requests.Session): Optional session for connection pooling
+        poll_interval (float): Seconds to wait when the run has no new items yet
+        page_size (int): Dataset items fetched per request
+        stop_event (threading.Event, optional): Stop paging early when set
+
+    Yields:
+        list: Dataset items, one page at a time
+
+    Raises:
+        RuntimeError: If the run status or a dataset page can't be read
+    """
+    while state["offset"] < limit and not (stop_event and stop_event.is_set()):
+        # Check status before paging so a page read after a terminal status is final
+        run_response = apify_request("GET", f"/actor-runs/{state['run_id']}", api_token, session=session)
+        if run_response.status_code != 200:
+            raise RuntimeError(f"Could not read run status ({run_response.status_code})")
+        state["status"] = run_response.json()["data"]["status"]
+        run_finished = state["status"] in TERMINAL_RUN_STATUSES
+
+        # Drain everything currently in the dataset
+        while state["offset"] < limit and not (stop_event and stop_event.is_set()):
+            page_response = apify_request(
+                "GET", f"/datasets/{state['dataset_id']}/items", api_token, session=session,
+                params={"offset": state["offset"], "limit": min(page_size, limit - state["offset"]), "clean": "true", "format": "json"}
+            )
+            if page_response.status_code != 200:
+                raise RuntimeError(f"Dataset page at offset {state['offset']} failed ({page_response.status_code})")
+
+            items = page_response.json()
+            if not items:
+                break
+
+            state["offset"] += len(items)
+            yield items
+
+        if run_finished:
+            return
+        if state["offset"] < limit:
+            if stop_event:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+
+
+def scrape_leads_async(actor_input, limit, output_file, api_token, state_file=DEFAULT_STATE_FILE,
+                       resume=False, poll_interval=10, page_size=1000):
+    """
+    Run the actor asynchronously and stream its dataset to disk page by page.
+
+    The run ID, dataset ID and paging offset are saved to `state_file` after every
+    page, and items are appended to an NDJSON spool (`<output>.part.ndjson`) as they
+    arrive, so nothing already fetched is lost if the process dies. With `resume`,
+    paging continues from the last complete item of the saved run.
+
+    Args:
+        actor_input (dict): Actor input from build_actor_input()
+        limit (int): Number of leads to keep
+        output_file (str): Output JSON file path
+        api_token (str): Apify API token
+        state_file (str): Where run/paging state is saved
+        resume (bool): Continue the saved run instead of starting a new one
+        poll_interval (float): Seconds to wait when the run has no new items yet
+        page_size (int): Dataset items fetched per request
+
+    Returns:
+        dict: Results with status, count, file path, run ID and whether the filters were
+            exhausted (the run succeeded with fewer than `limit` leads)
+    """
+    part_file = f"{output_file}.part.ndjson"
+    session = requests.Session()
+
+    state = None
+    if resume and os.path.exists(state_file):
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("actor_input") != actor_input or state.get("output_file") != output_file:
+            return {
+                "status": "error",
+                "message": f"Saved state in {state_file} is for a different query/output; re-run without --resume"
+            }
+        state["offset"] = count_spooled_items(part_file)
+        print(f"♻️  Resuming run {state['run_id']} from item {state['offset']}")
+    elif resume:
+        print(f"⚠️  No saved state in {state_file}, starting a new run")
+
+    if state is None:
+        print(f"\n⏳ Starting actor run on Apify...")
+        try:
+            run = start_actor_run(actor_input, api_token, session)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        state = {
+            "run_id": run["id"],
+            "dataset_id": run["defaultDatasetId"],
+            "status": run.get("status"),
+            "offset": 0,
+            "limit": limit,
+            "actor_input": actor_input,
+            "output_file": output_file,
+            "started_at": datetime.now().isoformat()
+        }
+        save_scrape_state(state_file, state)
+        print(f"   Run {state['run_id']} started (state saved to {state_file})")
+
+    os.makedirs(os.path.dirname(part_file) if os.path.dirname(part_file) else ".tmp", exist_ok=True)
+
+    with open(part_file, 'a', encoding='utf-8') as spool:
+        try:
+            for items in page_run_items(state, limit, api_token, session, poll_interval, page_size):
+                for item in items:
+                    spool.write(json.dumps(item, ensure_ascii=False) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+
+                save_scrape_state(state_file, state)
+                print(f"   📄 {state['offset']}/{limit} leads saved (run {state['status']})")
+        except RuntimeError as e:
+            return {
+                "status": "error",
+                "message": f"{e}; resume with --resume"
+            }
+
+    session.close()
+
+    if state["status"] not in ("SUCCEEDED", "RUNNING", "READY") and state["offset"] == 0:
+        return {
+            "status": "error",
+            "message": f"Actor run {state['run_id']} ended with status {state['status']} and no items"
+        }
+    if state["status"] not in ("SUCCEEDED", "RUNNING", "READY"):
+        print(f"⚠️  Actor run ended with status {state['status']}; keeping the {state['offset']} leads fetched")
+
+    count = write_json_array_from_spool(part_file, output_file, limit)
+    os.remove(part_file)
+    os.remove(state_file)
+
+    print(f"✅ Retrieved exactly {count} leads")
+    print(f"💾 Saved results to: {output_file}")
+
+    return {
+        "status": "success",
+        "count": count,
+        "file": output_file,
+        "exhausted": count < limit and state["status"] == "SUCCEEDED",
+        "run_id": state["run_id"],
+        "run_status": state["status"]
+    }
+
+
+def lead_dedup_key(lead):
+    """
+    Key used to merge leads across shards: email, else company domain + contact name.
+
+    Args:
+        lead (dict): Lead data
+
+    Returns:
+        str: Dedup key
+    """
+    email = (lead.get("email") or lead.get("personal_email") or "").strip().lower()
+    if email:
+        return f"email:{email}"
+
+    domain = get_lead_domain(lead)
+    name = f"{lead.get('first_name') or ''} {lead.get('last_name') or ''}".strip().lower() or lead.get("full_name", "").lower()
+    return f"contact:{domain}|{name}"
+
+
+def plan_shards(actor_input, facets=SHARD_FACETS, max_shards=60):
+    """
+    Split an actor input into independent sub-queries, one per combination of facet values.
+
+    Facets with a single value (or none) are left as they are. If the full cross
+    product exceeds `max_shards`, the last facets are left unsplit until it fits.
+
+    Args:
+        actor_input (dict): Actor input from build_actor_input()
+        facets (tuple): Actor input list fields to split on, in priority order
+        max_shards (int): Upper bound on the number of shards
+
+    Returns:
+        list: (facet values dict, shard actor input) tuples
+    """
+    split_facets = [facet for facet in facets if len(actor_input.get(facet) or []) > 1]
+
+    while split_facets and math.prod(len(actor_input[facet]) for facet in split_facets) > max_shards:
+        split_facets.pop()
+
+    shards = []
+    for values in itertools.product(*[actor_input[facet] for facet in split_facets]):
+        shard_input = dict(actor_input)
+        for facet, value in zip(split_facets, values):
+            shard_input[facet] = [value]
+        shards.append((dict(zip(split_facets, values)), shard_input))
+
+    return shards
+
+
+def scrape_leads_sharded(actor_input, limit, output_file, api_token, concurrency=4, overfetch=1.5,
+                         poll_interval=10, page_size=1000, max_shards=60):
+    """
+    Scrape by running facet shards concurrently and merging them with dedup.
+
+    Shards are started lazily as workers free up. Each shard's fetch_count is the
+    remaining deficit split over the shards not yet started (times `overfetch` to
+    absorb duplicates and thin shards), so leads a short shard could not supply
+    are picked up by later ones. Once `limit` unique leads are saved, running shards
+    are aborted and the rest are never started.
+
+    Args:
+        actor_input (dict): Actor input from build_actor_input()
+        limit (int): Number of unique leads to keep
+        output_file (str): Output JSON file path
+        api_token (str): Apify API token
+        concurrency (int): Maximum shards running at once
+        overfetch (float): Multiplier on each shard's share of the deficit
+        poll_interval (float): Seconds between status checks while a shard has no new items
+        page_size (int): Dataset items per page
+        max_shards (int): Upper bound on the number of shards
+
+    Returns:
+        dict: Results with status, count, file path, duplicates, per-shard stats, the
+            number of shards that failed and whether the filters were exhausted
+    """
+    shards = plan_shards(actor_input, max_shards=max_shards)
+    print(f"\n🧩 Split into {len(shards)} shards over {', '.join(shards[0][0]) or 'no facets'} ({concurrency} at a time)")
+
+    part_file = f"{output_file}.part.ndjson"
+    os.makedirs(os.path.dirname(part_file) if os.path.dirname(part_file) else ".tmp", exist_ok=True)
+
+    lock = threading.Lock()
+    stop_event = threading.Event()
+    seen = set()
+    merged = {"count": 0, "duplicates": 0}
+    shard_stats = []
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    def run_shard(facet_values, shard_input, stats, spool):
+        run = start_actor_run(shard_input, api_token, session)
+        state = {"run_id": run["id"], "dataset_id": run["defaultDatasetId"], "status": run.get("status"), "offset": 0}
+        stats["run_id"] = run["id"]
+
+        for items in page_run_items(state, shard_input["fetch_count"], api_token, session, poll_interval, page_size, stop_event):
+            with lock:
+                stats["fetched"] += len(items)
+                for item in items:
+                    if merged["count"] >= limit:
+                        break
+                    key = lead_dedup_key(item)
+                    if key in seen:
+                        merged["duplicates"] += 1
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(key)
+                    spool.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    merged["count"] += 1
+                    stats["new"] += 1
+                spool.flush()
+                if merged["count"] >= limit:
+                    stop_event.set()
+
+        stats["status"] = state["status"]
+        if stop_event.is_set() and state["status"] not in TERMINAL_RUN_STATUSES:
+            abort_actor_run(run["id"], api_token, session)
+            stats["status"] = "ABORTED (limit reached)"
+
+    pending = deque(shards)
+    errors = []
+
+    with open(part_file, 'w', encoding='utf-8') as spool, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        in_flight = {}
+
+        def outstanding():
+            # Leads still expected from running shards (their quota minus what they've delivered)
+            return sum(max(0, s["quota"] - s["fetched"]) for s in in_flight.values())
+
+        while pending or in_flight:
+            with lock:
+                deficit = limit - merged["count"] - outstanding()
+            while pending and len(in_flight) < concurrency and not stop_event.is_set() and (deficit > 0 or not in_flight):
+                facet_values, shard_input = pending.popleft()
+                quota = min(limit, max(1, math.ceil(max(deficit, 1) / (len(pending) + 1) * overfetch)))
+                shard_input["fetch_count"] = quota
+                stats = {"facets": facet_values, "quota": quota, "fetched": 0, "new": 0, "duplicates": 0, "status": "PENDING"}
+                shard_stats.append(stats)
+                print(f"   🚀 Shard {len(shard_stats)}/{len(shards)} {facet_values or ''}: fetching up to {quota}")
+                in_flight[executor.submit(run_shard, facet_values, shard_input, stats, spool)] = stats
+                deficit -= quota / overfetch
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stats = in_flight.pop(future)
+                try:
+                    future.result()
+                except (RuntimeError, requests.exceptions.RequestException) as e:
+                    stats["status"] = f"ERROR: {str(e)[:100]}"
+                    errors.append(str(e))
+                print(f"   ✅ Shard {stats['facets'] or ''}: {stats['new']} new, {stats['duplicates']} duplicates ({stats['status']}) - {merged['count']}/{limit} total")
+
+            if stop_event.is_set():
+                for facet_values, _ in pending:
+                    shard_stats.append({"facets": facet_values, "status": "SKIPPED (limit reached)"})
+                pending.clear()
+
+    session.close()
+
+    if merged["count"] == 0:
+        os.remove(part_file)
+        return {
+            "status": "error",
+            "message": f"No leads from {len(shard_stats)} shards" + (f": {errors[0]}" if errors else "")
+        }
+
+    count = write_json_array_from_spool(part_file, output_file, limit)
+    os.remove(part_file)
+
+    if count < limit:
+        print(f"⚠️  Shards ran out at {count}/{limit} unique leads (raise --shard-overfetch or broaden filters)")
+    print(f"✅ Retrieved {count} unique leads ({merged['duplicates']} cross-shard duplicates dropped)")
+    print(f"💾 Saved results to: {output_file}")
+
+    return {
+        "status": "success",
+        "count": count,
+        "file": output_file,
+        # Short only because the filters ran out: every shard's run finished normally
+        "exhausted": count < limit and not errors and all(s["status"] == "SUCCEEDED" for s in shard_stats),
+        "shard_errors": len(errors),
+        "duplicates": merged["duplicates"],
+        "shards": shard_stats
+    }
+
+
+def normalize_domain(value):
+    """
+    Normalise a domain or website URL to a bare lowercase host without www.
+
+    Args:
+        value (str): Domain or URL
+
+    Returns:
+        str: Bare domain ("" if none)
+    """
+    if not isinstance(value, str):
+        return ""
+    host = value.strip().lower().split("://")[-1].split("/")[0].split("?")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def get_lead_domain(lead):
+    """Return the normalised company domain of a lead ("" if unknown)."""
+    return normalize_domain(lead.get("company_domain") or lead.get("company_website") or lead.get("website") or "")
+
+
+def collect_known_domains(patterns=DEFAULT_KNOWN_LEADS, exclude_files=()):
+    """
+    Collect company domains from previous runs' output files.
+
+    Any JSON file matching the patterns is walked recursively, so plain lead arrays
+    and reports that embed leads (validation, verification, upload) all count.
+
+    Args:
+        patterns (list): Glob patterns of files to read
+        exclude_files (iterable): Paths to skip (e.g. the current output file)
+
+    Returns:
+        dict: domain -> mtime of the newest file it appeared in
+    """
+    excluded = {os.path.abspath(path) for path in exclude_files if path}
+    known = {}
+
+    files = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)})
+    for path in files:
+        # In-progress async spools (.part.ndjson) aren't leads we hold yet
+        if os.path.abspath(path) in excluded or path.endswith(".part.ndjson") or not (path.endswith(".json") or is_ndjson_path(path)):
+            continue
+        try:
+            if is_ndjson_path(path):
+                data = list(iter_leads(path))
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        mtime = os.path.getmtime(path)
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                domain = get_lead_domain(node)
+                if domain and "." in domain:
+                    known[domain] = max(known.get(domain, 0), mtime)
+                stack.extend(value for value in node.values() if isinstance(value, (list, dict)))
+
+    return known
+
+
+def scrape_leads_delta(actor_input, limit, output_file, api_token, known_domains, max_exclusions=1000,
+                       max_rounds=5, async_run=False, poll_interval=10, page_size=1000):
+    """
+    Scrape `limit` net-new leads, excluding companies we already hold.
+
+    Known domains are pushed into the actor's company_not_domain filter. One request
+    takes at most `max_exclusions` domains, so a longer list (domains this run already
+    returned, then known domains, most recently seen first) is split into chunks of
+    `max_exclusions` and each round's fetch is spread over one request per chunk, the
+    results merged. Anything that still comes back for a known domain is dropped
+    locally, and further rounds request just the shortfall (scaled by the net-new rate
+    seen so far) until `limit` net-new leads are collected or the filters run dry.
+
+    Args:
+        actor_input (dict): Actor input from build_actor_input()
+        limit (int): Number of net-new leads to keep
+        output_file (str): Output JSON file path
+        api_token (str): Apify API token
+        known_domains (dict): domain -> last seen timestamp, from collect_known_domains()
+        max_exclusions (int): Maximum domains in one request's exclusion filter (longer lists are chunked)
+        max_rounds (int): Maximum scrape rounds
+        async_run (bool): Use async paged runs for each round
+        poll_interval (float): Seconds between status checks in async mode
+        page_size (int): Dataset items per page in async mode
+
+    Returns:
+        dict: Results with status, count, file path and a "delta" block
+    """
+    known_by_recency = sorted(known_domains, key=known_domains.get, reverse=True)
+    returned_domains = set()
+    seen_keys = set()
+    net_new = []
+    stats = {"known_domains": len(known_domains), "rounds": 0, "requests": 0, "fetched": 0, "dropped_known": 0,
+             "dropped_duplicate": 0}
+    net_rate = 1.0
+    round_file = f"{output_file}.delta_round.json"
+
+    while len(net_new) < limit and stats["rounds"] < max_rounds:
+        needed = limit - len(net_new)
+        fetch_count = min(max(needed, math.ceil(needed / max(net_rate, 0.1))), limit * 3)
+
+        # Domains this run already returned come first (they'd otherwise just come back
+        # again); every domain gets a place in some request's filter
+        exclusions = list(returned_domains) + [domain for domain in known_by_recency if domain not in returned_domains]
+        chunks = [exclusions[i:i + max_exclusions] for i in range(0, len(exclusions), max_exclusions)] or [[]]
+        chunk_count = math.ceil(fetch_count / len(chunks))
+
+        stats["rounds"] += 1
+        print(f"\n🔁 Delta round {stats['rounds']}: fetching {fetch_count} for {needed} net-new "
+              f"({len(exclusions)} domains excluded over {len(chunks)} request{'s' if len(chunks) > 1 else ''})")
+
+        kept = 0
+        round_count = 0
+        requested = 0
+        failure = None
+        for chunk in chunks:
+            round_input = dict(actor_input, fetch_count=chunk_count, company_not_domain=chunk)
+            stats["requests"] += 1
+            if async_run:
+                result = scrape_leads_async(round_input, chunk_count, round_file, api_token, state_file=f"{round_file}.state",
+                                            poll_interval=poll_interval, page_size=page_size)
+            else:
+                result = scrape_leads_sync(round_input, chunk_count, round_file, api_token)
+            if result["status"] != "success":
+                failure = result
+                break
+            requested += chunk_count
+
+            for lead in iter_leads(round_file):
+                round_count += 1
+                domain = get_lead_domain(lead)
+                if domain:
+                    returned_domains.add(domain)
+                if domain and domain in known_domains:
+                    stats["dropped_known"] += 1
+                    continue
+                key = lead_dedup_key(lead)
+                if key in seen_keys:
+                    stats["dropped_duplicate"] += 1
+                    continue
+                seen_keys.add(key)
+                net_new.append(lead)
+                kept += 1
+
+            os.remove(round_file)
+
+        if failure:
+            if not net_new:
+                return failure
+            print(f"⚠️  Round failed ({failure['message']}); keeping {len(net_new)} net-new leads")
+            stats["fetched"] += round_count
+            break
+
+        stats["fetched"] += round_count
+        print(f"   {kept}/{round_count} net-new ({len(net_new)}/{limit} total)")
+
+        if round_count < requested:
+            # The filters are exhausted; another round would return nothing new
+            break
+        net_rate = max(len(net_new), 1) / stats["fetched"]
+
+    net_new = net_new[:limit]
+    write_leads(output_file, assign_lead_ids(net_new))
+
+    if len(net_new) < limit:
+        print(f"⚠️  Only {len(net_new)}/{limit} net-new leads available for these filters")
+    print(f"✅ Retrieved {len(net_new)} net-new leads ({stats['dropped_known']} already-known dropped, {stats['fetched']} fetched over {stats['rounds']} rounds)")
+    print(f"💾 Saved results to: {output_file}")
+
+    stats["net_new"] = len(net_new)
+    return {
+        "status": "success",
+        "count": len(net_new),
+        "file": output_file,
+        "delta": stats
+    }
+
+
+def scrape_cache_key(actor_input):
+    """
+    Content address of a scrape: a canonical hash of the actor input without fetch_count.
+
+    fetch_count is left out so one cached run can serve any smaller request for the
+    same filters.
+
+    Args:
+        actor_input (dict): Actor input
+
+    Returns:
+        str: Cache key
+    """
+    filters = {k: v for k, v in actor_input.items() if k != "fetch_count"}
+    # List order doesn't change what the actor returns
+    filters = {k: sorted(v) if isinstance(v, list) else v for k, v in filters.items()}
+    return stable_hash({"actor": ACTOR_ID, "input": filters})
+
+
+def load_cached_scrape(cache_dir, actor_input, limit, output_file, ttl_hours=168):
+    """
+    Serve a scrape from the cache if a fresh entry covers the requested limit.
+
+    An entry covers the request if it holds at least `limit` leads, or if the scrape
+    that stored it recorded that the filters were exhausted (the actor finished
+    normally with fewer leads than asked for; a failed or partial run never is).
+
+    Args:
+        cache_dir (str): Scrape cache directory
+        actor_input (dict): Actor input
+        limit (int): Number of leads requested
+        output_file (str): Output JSON file path
+        ttl_hours (float): Maximum age of a usable entry, 0 for no expiry
+
+    Returns:
+        dict or None: Scrape result (with a "cache" block) on a hit, None on a miss
+    """
+    key = scrape_cache_key(actor_input)
+    meta_file = os.path.join(cache_dir, f"{key}.meta.json")
+    data_file = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(meta_file) or not os.path.exists(data_file):
+        print(f"   Scrape cache: miss ({key[:12]})")
+        return None
+
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    age_hours = (time.time() - meta["created_at"]) / 3600
+    if ttl_hours and age_hours > ttl_hours:
+        print(f"   Scrape cache: expired ({age_hours:.1f}h old, TTL {ttl_hours}h)")
+        return None
+
+    if meta["count"] < limit and not meta.get("exhausted"):
+        print(f"   Scrape cache: miss (cached {meta['count']} leads < {limit} requested)")
+        return None
+
+    served = write_leads(output_file, assign_lead_ids(itertools.islice(iter_leads(data_file), limit)))
+
+    print(f"✅ Served {served} leads from scrape cache ({age_hours:.1f}h old, {meta['count']} cached) - no Apify run")
+    print(f"💾 Saved results to: {output_file}")
+
+    return {
+        "status": "success",
+        "count": served,
+        "file": output_file,
+        "cache": {
+            "hit": True,
+            "key": key,
+            "age_hours": round(age_hours, 2),
+            "cached_count": meta["count"],
+            "cached_at": datetime.fromtimestamp(meta["created_at"]).isoformat()
+        }
+    }
+
+
+def store_cached_scrape(cache_dir, actor_input, output_file, count, exhausted=False):
+    """
+    Store a finished scrape's output in the cache (replacing any previous entry for the same filters).
+
+    Args:
+        cache_dir (str): Scrape cache directory
+        actor_input (dict): Actor input the output was fetched with
+        output_file (str): Output JSON file that was written
+        count (int): Leads in the output
+        exhausted (bool): The scrape finished normally with fewer leads than asked for
+
+    Returns:
+        dict: "cache" block for the scrape result
+    """
+    key = scrape_cache_key(actor_input)
+    meta_file = os.path.join(cache_dir, f"{key}.meta.json")
+    os.makedirs(cache_dir, exist_ok=True)
+    shutil.copyfile(output_file, os.path.join(cache_dir, f"{key}.json"))
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "actor_input": actor_input,
+            "fetch_count": actor_input.get("fetch_count", count),
+            "count": count,
+            "exhausted": exhausted,
+            "created_at": time.time()
+        }, f, indent=2, ensure_ascii=False)
+
+    return {"hit": False, "key": key, "age_hours": 0, "stored": True}
+
+
+def scrape_leads_sync(actor_input, limit, output_file, api_token):
+    """
+    Run the actor with run-sync-get-dataset-items and save the response (small runs).
+
+    Args:
+        actor_input (dict): Actor input from build_actor_input()
+        limit (int): Number of leads to keep
+        output_file (str): Output JSON file path
+        api_token (str): Apify API token
+
+    Returns:
+        dict: Results with status, file path and whether the filters were exhausted
+    """
+    # API endpoint
+    api_url = f"{APIFY_API_BASE}/acts/{ACTOR_ID}/run-sync-get-dataset-items?token={api_token}"
 
     try:
         # Make POST request to run actor synchronously
@@ -129,19 +946,16 @@ def scrape_leads_direct(query, limit=25, location=None, employee_count=None, rev
 
         print(f"✅ Retrieved exactly {len(results)} leads")
 
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
-
         # Save to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        write_leads(output_file, assign_lead_ids(results))
 
         print(f"💾 Saved results to: {output_file}")
 
         return {
             "status": "success",
             "count": len(results),
-            "file": output_file
+            "file": output_file,
+            "exhausted": len(results) < limit
         }
 
     except requests.exceptions.Timeout:
@@ -169,20 +983,243 @@ def scrape_leads_direct(query, limit=25, location=None, employee_count=None, rev
         }
 
 
+def store_scraped_leads(store_file, output_file):
+    """
+    Add a finished scrape's leads to the SQLite lead store.
+
+    Args:
+        store_file (str): Lead store path
+        output_file (str): Scrape output file
+
+    Returns:
+        str: Lead store path
+    """
+    store = LeadStore(store_file)
+    try:
+        count = store.upsert_leads(iter_leads(output_file), source="apify")
+    finally:
+        store.close()
+    print(f"🗄️  Added {count} leads to lead store: {store_file}")
+    return store_file
+
+
+def scrape_leads_direct(query, limit=25, location=None, employee_count=None, revenue_range=None,
+                         industries=None, excluded_industries=None, excluded_job_titles=None, output_file="leads.json",
+                         async_run=False, resume=False, state_file=DEFAULT_STATE_FILE, poll_interval=10, page_size=1000,
+                         shard=False, shard_concurrency=4, shard_overfetch=1.5,
+                         cache_dir=DEFAULT_CACHE_DIR, cache_ttl_hours=168,
+                         delta=False, known_leads=None, max_exclusions=1000,
+                         plan_yield=None, validation_report=DEFAULT_VALIDATION_REPORT,
+                         yield_history=DEFAULT_HISTORY_FILE, target_probability=0.9, icp_criteria=None, store_file=None):
+    """
+    Scrape leads using direct Apify API endpoint.
+
+    Args:
+        query (str): Search query
+        limit (int): Number of leads to scrape (uploadable leads wanted if plan_yield)
+        location (str or list): Geographic filter (one or several locations)
+        employee_count (str or list): Employee count filter (e.g., "51-100" or ["1-10", "11-20"])
+        revenue_range (str): Revenue range filter (e.g., "$25M-$50M")
+        output_file (str): Output JSON file path
+        async_run (bool): Start the run asynchronously and page dataset items to disk (for large limits)
+        resume (bool): Resume paging the run saved in state_file (implies async_run)
+        state_file (str): Async run state path
+        poll_interval (float): Seconds between status checks while the async run has no new items
+        page_size (int): Dataset items per page in async mode
+        shard (bool): Split the query over location/size/industry values and run the shards concurrently
+        shard_concurrency (int): Maximum shards running at once
+        shard_overfetch (float): Multiplier on each shard's share of the remaining leads
+        cache_dir (str, optional): Scrape cache directory, None to disable
+        cache_ttl_hours (float): Maximum age of cached results to reuse, 0 for no expiry (default: 168)
+        delta (bool): Exclude companies found in previous runs' outputs and fetch `limit` net-new leads
+        known_leads (list, optional): Glob patterns of previous outputs for delta mode (default: .tmp/*.json, .tmp/*.ndjson)
+        max_exclusions (int): Maximum domains in one request's exclusion filter in delta mode
+        plan_yield (bool, optional): Scrape enough leads that `limit` survive validation and verification
+            (default None: plan when validation_report is a usable test-batch report scored
+            against icp_criteria)
+        validation_report (str): Test-batch validation report used by plan_yield
+        yield_history (str): Stage yield history used by plan_yield
+        target_probability (float): Probability of ending with `limit` leads under plan_yield
+        icp_criteria (dict, optional): This run's ICP, matched against the validation report's
+        store_file (str, optional): SQLite lead store to add the scraped leads to
+
+    Returns:
+        dict: Results with status, file path, a "cache" block (hit/miss, age) and the
+            "yield_plan" if the fetch count was planned. A plan that hits its cap (the test
+            batch predicts almost nothing survives) is refused with an error instead of scraped
+    """
+
+    # Get API token
+    api_token = os.getenv("APIFY_API_TOKEN")
+    if not api_token:
+        return {
+            "status": "error",
+            "message": "APIFY_API_TOKEN not found in .env file"
+        }
+
+    yield_plan = None
+    if plan_yield is None:
+        # Plan by default once a test batch has been validated for this ICP; a report left by
+        # another campaign would size (or refuse) the scrape on someone else's pass rate
+        usable = load_validation_counts(validation_report) is not None
+        plan_yield = usable and report_matches_icp(validation_report, icp_criteria)
+        if usable and not plan_yield:
+            reason = "is for a different ICP" if icp_criteria else "can't be matched to this run (no --icp-* criteria given)"
+            print(f"⚠️  {validation_report} {reason}: fetching exactly {limit} (--plan-yield to plan from it anyway)")
+    if plan_yield:
+        yield_plan = plan_from_files(limit, validation_report, yield_history, target_probability)
+        print(f"📐 Yield plan: {limit} uploadable leads at {target_probability:.0%} confidence -> fetching {yield_plan['fetch_count']}")
+        print(f"   Validation pass {yield_plan['validation_rate']:.0%} ({yield_plan['validation_sample']} test leads), "
+              f"verification keep {yield_plan['verification_rate']:.0%} ({yield_plan['verification_sample']} leads)")
+        if not yield_plan["validation_report"]:
+            print(f"⚠️  No usable validation report at {validation_report}, assuming every lead passes validation")
+        if yield_plan["capped"]:
+            error_msg = (f"Yield plan capped at {yield_plan['fetch_count']} leads: only {yield_plan['expected_survival_rate']:.1%} "
+                         f"are expected to survive validation and verification, so {limit} uploadable leads would "
+                         f"need more. Fix the query/ICP and re-run the test batch, or pass --no-plan-yield to "
+                         f"fetch exactly --limit")
+            print(f"❌ {error_msg}")
+            return {
+                "status": "error",
+                "message": error_msg,
+                "yield_plan": yield_plan
+            }
+        limit = yield_plan["fetch_count"]
+
+    actor_input = build_actor_input(query, limit, location, employee_count, revenue_range,
+                                    industries, excluded_industries, excluded_job_titles)
+
+    print(f"🔍 Starting direct API lead scrape...")
+    print(f"   Company Keywords: {query}")
+    print(f"   Location: {', '.join(location) if isinstance(location, list) else location or 'Not specified'}")
+    print(f"   Company Size: {employee_count or 'Not specified'}")
+    print(f"   Revenue Range: {revenue_range or 'Not specified'}")
+    print(f"   Fetch Count (EXACT LIMIT): {limit}")
+    print(f"   API: code_crafter/leads-finder ({'sharded' if shard else 'async run, paged' if async_run or resume else 'sync'})")
+
+    if delta:
+        if shard or resume:
+            return {
+                "status": "error",
+                "message": "--delta can't be combined with --shard or --resume"
+            }
+        known_domains = collect_known_domains(known_leads or DEFAULT_KNOWN_LEADS, exclude_files=[output_file])
+        print(f"   Delta mode: {len(known_domains)} known company domains from {', '.join(known_leads or DEFAULT_KNOWN_LEADS)}")
+        try:
+            # Not cached: the exclusion list changes every time we scrape
+            result = scrape_leads_delta(actor_input, limit, output_file, api_token, known_domains,
+                                        max_exclusions=max_exclusions, async_run=async_run,
+                                        poll_interval=poll_interval, page_size=page_size)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Request error: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {
+                "status": "error",
+                "message": error_msg
+            }
+        if yield_plan:
+            result["yield_plan"] = yield_plan
+        if store_file and result["status"] == "success":
+            result["store"] = store_scraped_leads(store_file, output_file)
+        return result
+
+    cached = None
+    if cache_dir and not resume:
+        cached = load_cached_scrape(cache_dir, actor_input, limit, output_file, cache_ttl_hours)
+
+    if cached:
+        result = cached
+    elif shard:
+        if resume:
+            return {
+                "status": "error",
+                "message": "--resume is not supported with --shard"
+            }
+        try:
+            result = scrape_leads_sharded(actor_input, limit, output_file, api_token, concurrency=shard_concurrency,
+                                          overfetch=shard_overfetch, poll_interval=poll_interval, page_size=page_size)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Request error: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {
+                "status": "error",
+                "message": error_msg
+            }
+    elif async_run or resume:
+        try:
+            result = scrape_leads_async(actor_input, limit, output_file, api_token, state_file=state_file,
+                                        resume=resume, poll_interval=poll_interval, page_size=page_size)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Request error: {str(e)} (progress saved, re-run with --resume)"
+            print(f"❌ {error_msg}")
+            return {
+                "status": "error",
+                "message": error_msg
+            }
+    else:
+        result = scrape_leads_sync(actor_input, limit, output_file, api_token)
+
+    # A sharded scrape with failed shards is missing leads the filters do match: never cache it
+    if cache_dir and not cached and result["status"] == "success" and not result.get("shard_errors"):
+        result["cache"] = store_cached_scrape(cache_dir, actor_input, output_file, result["count"],
+                                              exhausted=result.get("exhausted", False))
+
+    if yield_plan:
+        result["yield_plan"] = yield_plan
+
+    if store_file and result["status"] == "success":
+        result["store"] = store_scraped_leads(store_file, output_file)
+
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description="Scrape leads using direct Apify API")
     parser.add_argument("--query", required=True, help="Search query")
     parser.add_argument("--limit", type=int, default=25, help="Number of leads to scrape")
-    parser.add_argument("--location", help="Geographic filter")
+    parser.add_argument("--location", action="append", help="Geographic filter (repeat for several locations)")
     parser.add_argument("--employees", help="Employee count filter (e.g., '51-100')")
     parser.add_argument("--revenue", help="Revenue range filter (e.g., '$25M-$50M')")
     parser.add_argument("--industries", help="Comma-separated list of industries")
     parser.add_argument("--exclude-industries", help="Comma-separated list of industries to exclude")
     parser.add_argument("--exclude-titles", help="Comma-separated list of job titles to exclude")
     parser.add_argument("--output", default=".tmp/leads.json", help="Output file path")
+    parser.add_argument("--async-run", action="store_true", help="Start the actor asynchronously and page results to disk (use for large limits)")
+    parser.add_argument("--resume", action="store_true", help="Resume paging the saved async run after an interruption")
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE, help=f"Async run state file (default: {DEFAULT_STATE_FILE})")
+    parser.add_argument("--poll-interval", type=float, default=10, help="Seconds between status checks in async mode (default: 10)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Dataset items per page in async mode (default: 1000)")
+    parser.add_argument("--shard", action="store_true", help="Split over location/size/industry values and scrape the shards concurrently")
+    parser.add_argument("--shard-concurrency", type=int, default=4, help="Shards running at once (default: 4)")
+    parser.add_argument("--shard-overfetch", type=float, default=1.5, help="Multiplier on each shard's share of the remaining leads (default: 1.5)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Scrape cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-ttl-hours", type=float, default=168, help="Reuse cached results up to this age, 0 = never expire (default: 168)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the scrape cache")
+    parser.add_argument("--delta", action="store_true", help="Exclude companies already in previous outputs and fetch --limit net-new leads")
+    parser.add_argument("--known-leads", action="append", help="Glob of previous outputs for --delta (repeatable, default: .tmp/*.json and .tmp/*.ndjson)")
+    parser.add_argument("--max-exclusions", type=int, default=1000, help="Max domains excluded per Apify request in --delta mode; longer lists are spread over several requests (default: 1000)")
+    parser.add_argument("--plan-yield", dest="plan_yield", action="store_true", default=None, help="Treat --limit as uploadable leads wanted and over-fetch for expected validation/verification losses (default: on when --validation-report was scored against the --icp-* criteria)")
+    parser.add_argument("--no-plan-yield", dest="plan_yield", action="store_false", help="Fetch exactly --limit, even when a test-batch validation report exists")
+    parser.add_argument("--validation-report", default=DEFAULT_VALIDATION_REPORT, help=f"Test-batch validation report for --plan-yield (default: {DEFAULT_VALIDATION_REPORT})")
+    parser.add_argument("--yield-history", default=DEFAULT_HISTORY_FILE, help=f"Verification yield history for --plan-yield (default: {DEFAULT_HISTORY_FILE})")
+    parser.add_argument("--icp-industry", help="ICP industry the test batch was validated against (yield planning only uses a matching report)")
+    parser.add_argument("--icp-location", help="ICP location the test batch was validated against")
+    parser.add_argument("--icp-employees", help="ICP employee range the test batch was validated against")
+    parser.add_argument("--icp-revenue", help="ICP revenue range the test batch was validated against")
+    parser.add_argument("--icp-description", help="ICP description the test batch was validated against")
+    parser.add_argument("--icp-job-title", help="ICP job titles the test batch was validated against")
+    parser.add_argument("--store", help="Also record results in this SQLite lead store (e.g. .tmp/leads.sqlite)")
+    parser.add_argument("--target-probability", type=float, default=0.9, help="Probability of ending with --limit leads under --plan-yield (default: 0.9)")
 
     args = parser.parse_args()
 
+    icp_criteria = {}
+    for key, value in (("industry", args.icp_industry), ("location", args.icp_location),
+                       ("employees", args.icp_employees), ("revenue", args.icp_revenue),
+                       ("description", args.icp_description), ("job_title", args.icp_job_title)):
+        if value:
+            icp_criteria[key] = value
+
     result = scrape_leads_direct(
         query=args.query,
         limit=args.limit,
@@ -192,7 +1229,26 @@ def main():
         industries=args.industries.split(',') if args.industries else None,
         excluded_industries=args.exclude_industries.split(',') if args.exclude_industries else None,
         excluded_job_titles=args.exclude_titles.split(',') if args.exclude_titles else None,
-        output_file=args.output
+        output_file=args.output,
+        async_run=args.async_run,
+        resume=args.resume,
+        state_file=args.state_file,
+        poll_interval=args.poll_interval,
+        page_size=args.page_size,
+        shard=args.shard,
+        shard_concurrency=args.shard_concurrency,
+        shard_overfetch=args.shard_overfetch,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_ttl_hours=args.cache_ttl_hours,
+        delta=args.delta,
+        known_leads=args.known_leads,
+        max_exclusions=args.max_exclusions,
+        plan_yield=args.plan_yield,
+        validation_report=args.validation_report,
+        yield_history=args.yield_history,
+        target_probability=args.target_probability,
+        icp_criteria=icp_criteria,
+        store_file=args.store
     )
 
     # Print result as JSON for easy parsing
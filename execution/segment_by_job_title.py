@@ -4,6 +4,9 @@ Segment leads by job title using AI to cluster into functional groups.
 Uses Claude AI to analyze job titles and group them into 3-6 low-cardinality segments
 based on business function (e.g., Executive, Operations, Marketing, Sales).
 
+Leads are read in two streaming passes: one to collect and count job titles, one to
+write each lead to its segment file, so the lead list is never held in memory.
+
 Usage:
     python segment_by_job_title.py --input .tmp/full_leads_normalized.json --output-mapping .tmp/segment_mapping.json --output-dir .tmp --min-segment-size 10
 """
@@ -13,9 +16,11 @@ import sys
 import json
 import argparse
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter
 from anthropic import Anthropic
 from dotenv import load_dotenv
+from lead_io import iter_leads, LeadWriter
+from lead_store import LeadStore
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -231,7 +236,7 @@ def fallback_segmentation(job_titles):
     return {"segments": segments}
 
 
-def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min_segment_size=10):
+def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min_segment_size=10, store_file=None, leads=None):
     """
     Segment leads by job title using AI clustering.
 
@@ -240,6 +245,9 @@ def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min
         output_mapping_file (str): Path to output segment mapping JSON file
         output_dir (str): Directory to save segment lead files
         min_segment_size (int): Minimum leads required per segment
+        store_file (str, optional): SQLite lead store to record each lead's segment in
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; each segment's leads are then returned in result["segment_leads"]
 
     Returns:
         dict: Segmentation results
@@ -253,29 +261,32 @@ def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min
             "message": "ANTHROPIC_API_KEY not found in .env file"
         }
 
-    # Load leads
+    # Count job titles (first pass)
+    title_counts = Counter()
+    first_seen_titles = {}
+    total_leads = 0
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
+        for lead in (leads if leads is not None else iter_leads(input_file)):
+            total_leads += 1
+            job_title = lead.get('job_title') or lead.get('title') or ''
+            title_counts[job_title.strip().lower()] += 1
+            if job_title:
+                first_seen_titles.setdefault(job_title, None)
     except FileNotFoundError:
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
+    except ValueError:
         return {
             "status": "error",
             "message": f"Invalid JSON in input file: {input_file}"
         }
 
-    print(f"👔 Segmenting {len(leads)} leads by job title...")
+    print(f"👔 Segmenting {total_leads} leads by job title...")
 
-    # Extract unique job titles
-    job_titles = []
-    for lead in leads:
-        job_title = lead.get('job_title') or lead.get('title') or ''
-        if job_title and job_title not in job_titles:
-            job_titles.append(job_title)
+    # Unique job titles, in first-seen order
+    job_titles = list(first_seen_titles)
 
     if not job_titles:
         print("⚠️  No job titles found in leads, creating single 'General' segment")
@@ -305,88 +316,83 @@ def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min
         for title in segment['job_titles']:
             title_to_segment[title.lower()] = segment['segment_id']
 
-    # Split leads by segment
-    segment_leads = defaultdict(list)
-    unmatched_leads = []
-
-    for lead in leads:
-        job_title = (lead.get('job_title') or lead.get('title') or '').strip()
-
-        # Try exact match (case-insensitive)
-        segment_id = title_to_segment.get(job_title.lower())
-
+    # Count leads per segment from the title counts
+    segment_counts = Counter()
+    unmatched_count = 0
+    for title, count in title_counts.items():
+        segment_id = title_to_segment.get(title)
         if segment_id:
-            segment_leads[segment_id].append(lead)
+            segment_counts[segment_id] += count
         else:
-            # No match found - assign to unmatched
-            unmatched_leads.append(lead)
+            unmatched_count += count
 
     # Handle unmatched leads - assign to exec segment (most conservative)
-    if unmatched_leads:
-        print(f"   ⚠️  {len(unmatched_leads)} leads with unmatched job titles, assigning to Executive segment")
-        segment_leads['exec'].extend(unmatched_leads)
+    if unmatched_count:
+        print(f"   ⚠️  {unmatched_count} leads with unmatched job titles, assigning to Executive segment")
+        segment_counts['exec'] += unmatched_count
 
-    # Filter out segments below minimum size and save segment files
+    # Segments below minimum size are merged into exec
     filtered_segments = []
-    total_saved_leads = 0
+    destination = {}
 
     for segment in segment_definitions['segments']:
         segment_id = segment['segment_id']
-        leads_in_segment = segment_leads[segment_id]
-        lead_count = len(leads_in_segment)
+        lead_count = segment_counts[segment_id]
 
-        if lead_count >= min_segment_size:
-            segment['lead_count'] = lead_count
+        if lead_count >= min_segment_size or (segment_id == 'exec' and lead_count > 0):
+            destination[segment_id] = segment_id
             filtered_segments.append(segment)
 
-            # Save segment leads to file
-            segment_file = os.path.join(output_dir, f"segment_{segment_id}_leads.json")
-            os.makedirs(output_dir, exist_ok=True)
-
-            with open(segment_file, 'w', encoding='utf-8') as f:
-                json.dump(leads_in_segment, f, indent=2, ensure_ascii=False)
-
-            total_saved_leads += lead_count
-            print(f"   ✅ {segment['segment_name']}: {lead_count} leads → {segment_file}")
-
         elif lead_count > 0:
             # Segment too small - merge into exec
             print(f"   ⚠️  {segment['segment_name']} has only {lead_count} leads (min: {min_segment_size}), merging into Executive")
+            destination[segment_id] = 'exec'
 
-            # Find exec segment and merge
-            for existing_segment in filtered_segments:
-                if existing_segment['segment_id'] == 'exec':
-                    existing_segment['lead_count'] += lead_count
-                    segment_leads['exec'].extend(leads_in_segment)
-                    break
-            else:
+            if not any(existing['segment_id'] == 'exec' for existing in filtered_segments):
                 # No exec segment yet, create one
-                exec_segment = {
+                filtered_segments.append({
                     "segment_id": "exec",
                     "segment_name": "Executive Leadership",
                     "job_titles": segment['job_titles'],
-                    "messaging_angle": "Revenue growth and strategic outcomes",
-                    "lead_count": lead_count
-                }
-                filtered_segments.append(exec_segment)
-                segment_leads['exec'].extend(leads_in_segment)
-
-    # Re-save exec segment if it was modified by merges
-    if 'exec' in segment_leads and len(segment_leads['exec']) > 0:
-        segment_file = os.path.join(output_dir, "segment_exec_leads.json")
-        with open(segment_file, 'w', encoding='utf-8') as f:
-            json.dump(segment_leads['exec'], f, indent=2, ensure_ascii=False)
-
-        # Update lead count in mapping
-        for seg in filtered_segments:
-            if seg['segment_id'] == 'exec':
-                seg['lead_count'] = len(segment_leads['exec'])
-                break
+                    "messaging_angle": "Revenue growth and strategic outcomes"
+                })
+
+    if unmatched_count and not any(seg['segment_id'] == 'exec' for seg in filtered_segments):
+        filtered_segments.append({
+            "segment_id": "exec",
+            "segment_name": "Executive Leadership",
+            "job_titles": [],
+            "messaging_angle": "Revenue growth and strategic outcomes"
+        })
+
+    # Write each lead to its segment file (second pass)
+    os.makedirs(output_dir, exist_ok=True)
+    writers = {
+        seg['segment_id']: LeadWriter(os.path.join(output_dir, f"segment_{seg['segment_id']}_leads.json"), keep=leads is not None)
+        for seg in filtered_segments
+    }
+    try:
+        for lead in (leads if leads is not None else iter_leads(input_file)):
+            job_title = (lead.get('job_title') or lead.get('title') or '').strip()
+            segment_id = destination.get(title_to_segment.get(job_title.lower()), 'exec')
+            writers[segment_id].write(lead)
+    except Exception:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    total_saved_leads = 0
+    for segment in filtered_segments:
+        writer = writers[segment['segment_id']]
+        writer.close()
+        segment['lead_count'] = writer.count
+        total_saved_leads += writer.count
+        print(f"   ✅ {segment['segment_name']}: {writer.count} leads → {writer.path}")
 
     # Save mapping
     mapping = {
         "segments": filtered_segments,
-        "total_leads": len(leads),
+        "total_leads": total_leads,
         "total_segments": len(filtered_segments),
         "generated_at": datetime.now().isoformat()
     }
@@ -398,7 +404,7 @@ def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min
     # Print summary
     print("\n" + "="*50)
     print(f"📊 Segmentation Results:")
-    print(f"   Total leads: {len(leads)}")
+    print(f"   Total leads: {total_leads}")
     print(f"   Segments created: {len(filtered_segments)}")
     print(f"   Leads assigned: {total_saved_leads}")
 
@@ -407,13 +413,28 @@ def segment_by_job_title(input_file, output_mapping_file, output_dir=".tmp", min
 
     print(f"\n💾 Segment mapping saved to: {output_mapping_file}")
 
-    return {
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            for segment in filtered_segments:
+                writer = writers[segment['segment_id']]
+                segment_leads = writer.leads if writer.leads is not None else iter_leads(writer.path)
+                store.record_segments("job_title", ((lead, segment['segment_id']) for lead in segment_leads))
+        finally:
+            store.close()
+        print(f"🗄️  Segments recorded in lead store: {store_file}")
+
+    result = {
         "status": "success",
-        "total_leads": len(leads),
+        "total_leads": total_leads,
         "total_segments": len(filtered_segments),
         "mapping_file": output_mapping_file,
         "segments": filtered_segments
     }
+    if leads is not None:
+        result["segment_leads"] = {segment_id: writer.leads for segment_id, writer in writers.items()}
+
+    return result
 
 
 def main():
@@ -422,6 +443,7 @@ def main():
     parser.add_argument("--output-mapping", required=True, help="Output segment mapping JSON file")
     parser.add_argument("--output-dir", default=".tmp", help="Directory for segment lead files")
     parser.add_argument("--min-segment-size", type=int, default=10, help="Minimum leads per segment")
+    parser.add_argument("--store", help="Also record segments in this SQLite lead store (e.g. .tmp/leads.sqlite)")
 
     args = parser.parse_args()
 
@@ -429,7 +451,8 @@ def main():
         input_file=args.input,
         output_mapping_file=args.output_mapping,
         output_dir=args.output_dir,
-        min_segment_size=args.min_segment_size
+        min_segment_size=args.min_segment_size,
+        store_file=args.store
     )
 
     # Print result
@@ -1,7 +1,8 @@
 """
 Segment leads by personalization status into separate files for different campaigns.
 
-Splits personalized leads into one file and non-personalized leads into another.
+Splits personalized leads into one file and non-personalized leads into another,
+streaming each lead straight to its segment file.
 
 Usage:
     python segment_by_personalization.py --input .tmp/csv_leads_personalized.json --personalized-output .tmp/personalized_segment.json --non-personalized-output .tmp/non_personalized_segment.json
@@ -11,13 +12,15 @@ import os
 import sys
 import json
 import argparse
+from lead_io import iter_leads, LeadWriter, LeadFileError
+from lead_store import LeadStore
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 
-def segment_by_personalization(input_file, personalized_output, non_personalized_output):
+def segment_by_personalization(input_file, personalized_output, non_personalized_output, store_file=None, leads=None):
     """
     Segment leads by personalization status.
 
@@ -25,87 +28,107 @@ def segment_by_personalization(input_file, personalized_output, non_personalized
         input_file (str): Path to JSON file with all leads
         personalized_output (str): Output path for personalized leads
         non_personalized_output (str): Output path for non-personalized leads
+        store_file (str, optional): SQLite lead store to record each lead's segment in
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; each segment's leads are then returned in result["segment_leads"]
 
     Returns:
         dict: Results with segmentation statistics
     """
 
-    # Load leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
+    if leads is None and not os.path.exists(input_file):
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
+
+    print(f"📊 Segmenting leads from {input_file} by personalization status...\n")
+
+    # Segment leads, streaming each one to its segment file
+    total_leads = 0
+    personalized_writer = LeadWriter(personalized_output, keep=leads is not None)
+    non_personalized_writer = LeadWriter(non_personalized_output, keep=leads is not None)
+
+    try:
+        for lead in (leads if leads is not None else iter_leads(input_file)):
+            total_leads += 1
+            personalization = lead.get('personalization')
+
+            # Lead has personalization if:
+            # 1. personalization field exists and is not None
+            # 2. personalization is not an empty string
+            if personalization and personalization.strip():
+                personalized_writer.write(lead)
+            else:
+                non_personalized_writer.write(lead)
+    except LeadFileError:
+        personalized_writer.abort()
+        non_personalized_writer.abort()
         return {
             "status": "error",
             "message": f"Invalid JSON in file: {input_file}"
         }
 
-    if not leads:
+    personalized_count = personalized_writer.count
+    non_personalized_count = non_personalized_writer.count
+
+    # Only keep segment files that have leads
+    for writer in (personalized_writer, non_personalized_writer):
+        if writer.count:
+            writer.close()
+        else:
+            writer.abort()
+
+    if not total_leads:
         return {
             "status": "error",
             "message": "No leads found in input file"
         }
 
-    print(f"📊 Segmenting {len(leads)} leads by personalization status...\n")
-
-    # Segment leads
-    personalized_leads = []
-    non_personalized_leads = []
-
-    for lead in leads:
-        personalization = lead.get('personalization')
-
-        # Lead has personalization if:
-        # 1. personalization field exists and is not None
-        # 2. personalization is not an empty string
-        if personalization and personalization.strip():
-            personalized_leads.append(lead)
-        else:
-            non_personalized_leads.append(lead)
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            for segment_id, writer in (("personalized", personalized_writer),
+                                       ("non_personalized", non_personalized_writer)):
+                if writer.count:
+                    segment_leads = writer.leads if writer.leads is not None else iter_leads(writer.path)
+                    store.record_segments("personalization", ((lead, segment_id) for lead in segment_leads))
+        finally:
+            store.close()
 
     # Print statistics
     print(f"✅ Segmentation complete:")
-    print(f"   Total leads: {len(leads)}")
-    print(f"   Personalized: {len(personalized_leads)} ({len(personalized_leads)/len(leads)*100:.1f}%)")
-    print(f"   Non-personalized: {len(non_personalized_leads)} ({len(non_personalized_leads)/len(leads)*100:.1f}%)")
-
-    # Save personalized leads
-    if personalized_leads:
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(personalized_output), exist_ok=True)
-
-        with open(personalized_output, 'w', encoding='utf-8') as f:
-            json.dump(personalized_leads, f, indent=2, ensure_ascii=False)
-        print(f"\n✅ Saved {len(personalized_leads)} personalized leads to: {personalized_output}")
+    print(f"   Total leads: {total_leads}")
+    print(f"   Personalized: {personalized_count} ({personalized_count/total_leads*100:.1f}%)")
+    print(f"   Non-personalized: {non_personalized_count} ({non_personalized_count/total_leads*100:.1f}%)")
+
+    if personalized_count:
+        print(f"\n✅ Saved {personalized_count} personalized leads to: {personalized_output}")
     else:
         print(f"\n⚠️  No personalized leads to save")
 
-    # Save non-personalized leads
-    if non_personalized_leads:
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(non_personalized_output), exist_ok=True)
-
-        with open(non_personalized_output, 'w', encoding='utf-8') as f:
-            json.dump(non_personalized_leads, f, indent=2, ensure_ascii=False)
-        print(f"✅ Saved {len(non_personalized_leads)} non-personalized leads to: {non_personalized_output}")
+    if non_personalized_count:
+        print(f"✅ Saved {non_personalized_count} non-personalized leads to: {non_personalized_output}")
     else:
         print(f"\n⚠️  No non-personalized leads to save")
 
-    return {
+    result = {
         "status": "success",
-        "total_leads": len(leads),
-        "personalized_count": len(personalized_leads),
-        "non_personalized_count": len(non_personalized_leads),
-        "personalized_percentage": round(len(personalized_leads)/len(leads)*100, 1) if leads else 0,
-        "personalized_output": personalized_output if personalized_leads else None,
-        "non_personalized_output": non_personalized_output if non_personalized_leads else None,
-        "message": f"Successfully segmented {len(leads)} leads into {len(personalized_leads)} personalized and {len(non_personalized_leads)} non-personalized"
+        "total_leads": total_leads,
+        "personalized_count": personalized_count,
+        "non_personalized_count": non_personalized_count,
+        "personalized_percentage": round(personalized_count/total_leads*100, 1),
+        "personalized_output": personalized_output if personalized_count else None,
+        "non_personalized_output": non_personalized_output if non_personalized_count else None,
+        "message": f"Successfully segmented {total_leads} leads into {personalized_count} personalized and {non_personalized_count} non-personalized"
     }
+    if leads is not None:
+        result["segment_leads"] = {
+            "personalized": personalized_writer.leads,
+            "non_personalized": non_personalized_writer.leads
+        }
+
+    return result
 
 
 def main():
@@ -113,6 +136,7 @@ def main():
     parser.add_argument('--input', required=True, help='Input JSON file with all leads')
     parser.add_argument('--personalized-output', required=True, help='Output file for personalized leads')
     parser.add_argument('--non-personalized-output', required=True, help='Output file for non-personalized leads')
+    parser.add_argument('--store', help='Also record segments in this SQLite lead store (e.g. .tmp/leads.sqlite)')
 
     args = parser.parse_args()
 
@@ -120,7 +144,8 @@ def main():
     result = segment_by_personalization(
         args.input,
         args.personalized_output,
-        args.non_personalized_output
+        args.non_personalized_output,
+        store_file=args.store
     )
 
     # Print results
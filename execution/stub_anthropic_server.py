@@ -0,0 +1,259 @@
+"""
+Local stand-in for the Anthropic Messages and Message Batches APIs (offline testing).
+
+Implements just enough of the API for validate_lead_quality.py:
+- POST /v1/messages                          (interactive validation calls)
+- POST /v1/messages/batches                  (create a batch job)
+- GET  /v1/messages/batches/{id}             (poll status)
+- GET  /v1/messages/batches/{id}/results     (JSONL results)
+
+Validation prompts are answered deterministically: a company scores high if its
+description/industry/keywords mention a word from the ICP industry, low otherwise.
+Batch jobs stay "in_progress" for --batch-delay seconds so polling and crash resume
+can be exercised. Jobs are kept in memory only.
+
+Usage:
+    python stub_anthropic_server.py --port 8765 --batch-delay 5
+
+    # In another terminal, point the Anthropic client at the stub:
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub python validate_lead_quality.py --input leads.json --icp-industry "HVAC" --bulk --poll-interval 2
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+STOPWORDS = {"and", "the", "for", "companies", "company", "services", "service", "business", "businesses"}
+
+
+def iso_timestamp(epoch):
+    """Format a Unix timestamp the way the API does (RFC 3339, UTC)."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def score_validation_prompt(prompt):
+    """
+    Answer a validation prompt built by build_validation_prompt().
+
+    Args:
+        prompt (str): Prompt text
+
+    Returns:
+        str: JSON array response text (same shape Claude is asked to return)
+    """
+    industry_match = re.search(r"^- Industry: (.+)$", prompt, re.MULTILINE)
+    industry_words = set()
+    if industry_match:
+        industry_words = {w for w in re.findall(r"[a-z]{3,}", industry_match.group(1).lower()) if w not in STOPWORDS}
+
+    companies_match = re.search(r"COMPANIES TO ANALYZE:\n(.*?)\n\nRESPONSE FORMAT", prompt, re.DOTALL)
+    companies = json.loads(companies_match.group(1)) if companies_match else []
+
+    results = []
+    for company in companies:
+        text = " ".join(str(company.get(field, "")) for field in ("description", "industry", "keywords")).lower()
+        # Crude stemming so "plumbers" matches "plumbing"
+        matched = any(word[:5] in text for word in industry_words) if industry_words else True
+        results.append({
+            "id": company.get("id"),
+            "company_name": company.get("company_name"),
+            "percentage": 85 if matched else 30,
+            "reason": f"Stub: {'matches' if matched else 'does not match'} target industry"
+        })
+
+    return json.dumps(results)
+
+
+def build_message(params):
+    """
+    Build a Messages API response object for request params.
+
+    Args:
+        params (dict): Messages API request body (model, max_tokens, messages)
+
+    Returns:
+        dict: Message object
+    """
+    prompt = params["messages"][-1]["content"]
+    if isinstance(prompt, list):
+        prompt = "".join(block.get("text", "") for block in prompt)
+
+    text = score_validation_prompt(prompt)
+    output_tokens = len(text) // 4 + 1
+    stop_reason = "end_turn"
+    max_tokens = params.get("max_tokens", 4096)
+    if output_tokens > max_tokens:
+        text = text[:max_tokens * 4]
+        output_tokens = max_tokens
+        stop_reason = "max_tokens"
+
+    return {
+        "id": f"msg_stub_{random.getrandbits(48):012x}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(prompt) // 4 + 1, "output_tokens": output_tokens}
+    }
+
+
+class StubState:
+    """In-memory batch jobs shared by all request handler threads."""
+
+    def __init__(self, batch_delay=5.0, error_rate=0.0):
+        self.batch_delay = batch_delay
+        self.error_rate = error_rate
+        self.batches = {}
+        self.lock = threading.Lock()
+
+    def create_batch(self, requests_payload):
+        batch_id = f"msgbatch_stub_{random.getrandbits(48):012x}"
+        with self.lock:
+            self.batches[batch_id] = {"created": time.time(), "requests": requests_payload, "results": None}
+        return batch_id
+
+    def batch_object(self, batch_id, base_url):
+        with self.lock:
+            job = self.batches.get(batch_id)
+            if job is None:
+                return None
+
+            ended = time.time() - job["created"] >= self.batch_delay
+            if ended and job["results"] is None:
+                job["results"] = []
+                for request in job["requests"]:
+                    if random.random() < self.error_rate:
+                        result = {"type": "errored", "error": {"type": "error", "error": {"type": "api_error", "message": "Stub error"}}}
+                    else:
+                        result = {"type": "succeeded", "message": build_message(request["params"])}
+                    job["results"].append({"custom_id": request["custom_id"], "result": result})
+
+            total = len(job["requests"])
+            succeeded = sum(1 for item in job["results"] or [] if item["result"]["type"] == "succeeded")
+            return {
+                "id": batch_id,
+                "type": "message_batch",
+                "processing_status": "ended" if ended else "in_progress",
+                "request_counts": {
+                    "processing": 0 if ended else total,
+                    "succeeded": succeeded,
+                    "errored": total - succeeded if ended else 0,
+                    "canceled": 0,
+                    "expired": 0
+                },
+                "created_at": iso_timestamp(job["created"]),
+                "expires_at": iso_timestamp(job["created"] + 86400),
+                "ended_at": iso_timestamp(job["created"] + self.batch_delay) if ended else None,
+                "cancel_initiated_at": None,
+                "archived_at": None,
+                "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None
+            }
+
+    def batch_results(self, batch_id):
+        with self.lock:
+            job = self.batches.get(batch_id)
+            return job["results"] if job else None
+
+
+def make_handler(state):
+    """Create a request handler class bound to the shared stub state."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            print(f"   🛰️  {self.command} {self.path} -> {args[1] if len(args) > 1 else ''}")
+
+        def _base_url(self):
+            host = self.headers.get("Host") or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+            return f"http://{host}"
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _not_found(self):
+            self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": f"Unknown path {self.path}"}})
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_POST(self):
+            path = self.path.split("?")[0].rstrip("/")
+            try:
+                body = self._read_json()
+            except json.JSONDecodeError:
+                self._send(400, {"type": "error", "error": {"type": "invalid_request_error", "message": "Invalid JSON"}})
+                return
+
+            if path == "/v1/messages":
+                self._send(200, build_message(body))
+            elif path == "/v1/messages/batches":
+                batch_id = state.create_batch(body.get("requests") or [])
+                self._send(200, state.batch_object(batch_id, self._base_url()))
+            else:
+                self._not_found()
+
+        def do_GET(self):
+            path = self.path.split("?")[0].rstrip("/")
+            match = re.fullmatch(r"/v1/messages/batches/([\w-]+)(/results)?", path)
+            if not match:
+                self._not_found()
+                return
+
+            batch = state.batch_object(match.group(1), self._base_url())
+            if batch is None:
+                self._not_found()
+            elif not match.group(2):
+                self._send(200, batch)
+            elif batch["processing_status"] != "ended":
+                self._send(400, {"type": "error", "error": {"type": "invalid_request_error", "message": "Batch is still processing"}})
+            else:
+                lines = "\n".join(json.dumps(item) for item in state.batch_results(match.group(1)))
+                self._send(200, lines + "\n", content_type="application/binary")
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic Messages/Message Batches APIs")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--batch-delay", type=float, default=5.0, help="Seconds a batch job stays in progress (default: 5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of batch requests returned as errored (default: 0)")
+
+    args = parser.parse_args()
+
+    state = StubState(batch_delay=args.batch_delay, error_rate=args.error_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"🧪 Stub Anthropic API listening on http://{args.host}:{args.port}")
+    print(f"   Batch jobs end after {args.batch_delay}s, error rate {args.error_rate:.0%}")
+    print(f"   Use: ANTHROPIC_BASE_URL=http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping stub server")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Token-budget-aware adaptive batching for Claude validation prompts.
+
+Instead of a fixed number of entries per call, entries are packed into a batch until
+the estimated prompt tokens reach a target budget or the estimated completion tokens
+would approach the response's max_tokens. The batch size cap then adapts to feedback:
+- Truncated responses (stop_reason == "max_tokens") halve the cap
+- Slow responses shrink it; fast, full batches grow it
+- Observed output tokens per entry refine the completion estimate
+
+Usage (from validate_lead_quality.py):
+    batcher = AdaptiveBatcher(target_prompt_tokens=6000, max_output_tokens=3000)
+    batch = batcher.next_batch(pending_deque)
+    batcher.feedback(len(batch), latency, output_tokens, scored, truncated)
+"""
+
+import json
+import threading
+from validation_cache import stable_hash
+
+# Rough English/JSON average; good enough for budgeting (never used for billing)
+CHARS_PER_TOKEN = 4
+
+# Initial guess of response tokens per entry: id, name, percentage and a short reason
+DEFAULT_COMPLETION_TOKENS_PER_ENTRY = 60
+
+# Fraction of max_tokens the estimated completion may use, leaving headroom for long reasons
+COMPLETION_HEADROOM = 0.75
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of a piece of text.
+
+    Args:
+        text (str): Text to estimate
+
+    Returns:
+        int: Estimated tokens
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class AdaptiveBatcher:
+    """
+    Packs (entry_id, payload) tuples into batches under prompt and completion token budgets.
+    """
+
+    def __init__(self, target_prompt_tokens=6000, max_output_tokens=3000, max_batch_size=40, min_batch_size=1,
+                 initial_batch_size=20, target_latency=20.0):
+        self.target_prompt_tokens = target_prompt_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_batch_size = max(1, max_batch_size)
+        self.min_batch_size = max(1, min_batch_size)
+        self.size_cap = max(self.min_batch_size, min(initial_batch_size, self.max_batch_size))
+        self.target_latency = target_latency
+        self.completion_per_entry = DEFAULT_COMPLETION_TOKENS_PER_ENTRY
+
+        self._lock = threading.Lock()
+        self._prompt_estimates = {}
+        self.stats = {"batches": 0, "entries": 0, "shrinks": 0, "grows": 0, "truncations": 0}
+
+    def prompt_tokens(self, entry):
+        """Estimated prompt tokens contributed by one (entry_id, payload) tuple."""
+        entry_id, payload = entry
+        # Keyed on the payload too: callers reuse entry IDs ("C0", "C1", ...) for new companies
+        key = (entry_id, stable_hash(payload))
+        if key not in self._prompt_estimates:
+            self._prompt_estimates[key] = estimate_tokens(json.dumps({"id": entry_id, **payload}, indent=2))
+        return self._prompt_estimates[key]
+
+    def next_batch(self, pending, size_limit=None):
+        """
+        Pop the next batch off the front of a deque of entries.
+
+        Args:
+            pending (collections.deque): Entries still to send
+            size_limit (int, optional): Extra per-call cap on entries (e.g. to spread a small wave)
+
+        Returns:
+            list: Entries for one API call (at least one if anything is pending)
+        """
+        with self._lock:
+            cap = self.size_cap if not size_limit else min(self.size_cap, size_limit)
+            completion_budget = self.max_output_tokens * COMPLETION_HEADROOM
+
+            batch, prompt_total = [], 0
+            while pending and len(batch) < cap:
+                entry_tokens = self.prompt_tokens(pending[0])
+                over_prompt = prompt_total + entry_tokens > self.target_prompt_tokens
+                over_completion = (len(batch) + 1) * self.completion_per_entry > completion_budget
+                if batch and (over_prompt or over_completion):
+                    break
+                batch.append(pending.popleft())
+                prompt_total += entry_tokens
+
+            self.stats["batches"] += 1
+            self.stats["entries"] += len(batch)
+            return batch
+
+    def feedback(self, batch_len, latency, output_tokens=0, scored=0, truncated=False):
+        """
+        Adapt the batch size cap after a call completes.
+
+        Args:
+            batch_len (int): Entries sent in the call
+            latency (float): API seconds for the call
+            output_tokens (int): Response tokens used
+            scored (int): Entries successfully parsed from the response
+            truncated (bool): True if the response hit max_tokens
+        """
+        with self._lock:
+            if scored and output_tokens and not truncated:
+                # Exponential moving average of observed response tokens per entry
+                observed = output_tokens / scored
+                self.completion_per_entry = 0.7 * self.completion_per_entry + 0.3 * observed
+
+            if truncated:
+                self.stats["truncations"] += 1
+                self._shrink(max(self.min_batch_size, batch_len // 2))
+            elif self.target_latency and latency > self.target_latency:
+                self._shrink(max(self.min_batch_size, int(self.size_cap * 0.75)))
+            elif (self.target_latency and latency < self.target_latency / 2
+                  and batch_len >= self.size_cap and self.size_cap < self.max_batch_size):
+                self.size_cap = min(self.max_batch_size, self.size_cap + max(1, self.size_cap // 4))
+                self.stats["grows"] += 1
+
+    def shrink_for_retry(self):
+        """Halve the size cap before a retry round (smaller batches fail less)."""
+        with self._lock:
+            self._shrink(max(self.min_batch_size, self.size_cap // 2))
+
+    def _shrink(self, new_cap):
+        if new_cap < self.size_cap:
+            self.size_cap = new_cap
+            self.stats["shrinks"] += 1
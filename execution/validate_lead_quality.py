@@ -15,15 +15,38 @@ Usage:
 
     # With website enrichment:
     python validate_lead_quality.py --input test_leads.json --icp-industry "HVAC companies" --enrich-web --threshold 80 --output validation_report.json
+
+    # Large full-batch runs via the Message Batches API (resumes a saved job if re-run after a crash):
+    python validate_lead_quality.py --input leads.json --icp-industry "HVAC companies" --bulk --output validation_report.json
 """
 
 import os
+import re
 import sys
 import json
+import math
+import random
+import queue
 import argparse
+import threading
+import time
 import requests
+from html import unescape
+from datetime import datetime
+from urllib.parse import urlparse
+from statistics import NormalDist
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from anthropic import Anthropic
+from validation_cache import ValidationCache, lead_fingerprint, icp_fingerprint
+from icp_prefilter import FirmographicPrefilter
+from job_title_fit import score_job_title
+from token_batcher import AdaptiveBatcher
+from page_cache import PageCache
+from lead_io import read_leads
+from lead_store import LeadStore, lead_id_for
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -32,44 +55,1196 @@ if sys.platform == 'win32':
 # Load environment variables
 load_dotenv()
 
+VALIDATION_MODEL = "claude-3-5-haiku-20241022"
+
+# Bump whenever the prompt or response format changes so cached results are not reused
+PROMPT_VERSION = 4
+
+# Lead match % = company fit (Claude, once per company) blended with job title fit (local, per contact)
+COMPANY_FIT_WEIGHT = 0.8
+JOB_TITLE_FIT_WEIGHT = 0.2
+
+# Claude 3.5 Haiku pricing (USD per million tokens) for cost reporting
+INPUT_COST_PER_MTOK = 0.80
+OUTPUT_COST_PER_MTOK = 4.00
+
+# Message Batches API requests are billed at half the interactive price
+BATCH_API_DISCOUNT = 0.5
+
+DEFAULT_CACHE_FILE = ".tmp/validation_cache.sqlite"
+DEFAULT_BATCH_JOB_FILE = ".tmp/validation_batch_job.json"
+DEFAULT_PAGE_CACHE_FILE = ".tmp/page_cache.sqlite"
+
+
+def summarize_html(html, max_chars=500):
+    """
+    Reduce a homepage to its title, meta description and leading visible text.
+
+    Args:
+        html (str): Raw HTML
+        max_chars (int): Maximum length of the visible-text excerpt
+
+    Returns:
+        str: Compact summary for the validation prompt
+    """
+    title_match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+    meta_match = re.search(
+        r"<meta[^>]+name=[\"']description[\"'][^>]*content=[\"'](.*?)[\"']", html, re.IGNORECASE | re.DOTALL
+    )
+    body = re.sub(r"<(script|style|noscript|svg|title)[^>]*>.*?</\1>", " ", html, flags=re.IGNORECASE | re.DOTALL)
+    text = unescape(" ".join(re.sub(r"<[^>]+>", " ", body).split()))
+
+    parts = []
+    if title_match:
+        parts.append(f"Title: {unescape(' '.join(title_match.group(1).split()))[:150]}")
+    if meta_match:
+        parts.append(f"Description: {unescape(' '.join(meta_match.group(1).split()))[:300]}")
+    if text:
+        parts.append(f"Text: {text[:max_chars]}")
+    return " | ".join(parts) or "Website accessible but no readable text"
+
 
-def fetch_website_summary(url, timeout=10):
+def fetch_website_summary(url, timeout=10, session=None):
     """
     Fetch and summarize a company website for validation enrichment.
 
     Args:
         url (str): Company website URL
         timeout (int): Request timeout in seconds
+        session (requests.Session): Optional session for connection pooling
 
     Returns:
-        str: Summary of website content or error message
+        tuple: (HTTP status or 0 if the request failed, summary or error message)
     """
+    http_client = session if session else requests
+
     try:
-        if not url or not url.startswith('http'):
-            return "No valid website URL provided"
+        if not url:
+            return 0, "No valid website URL provided"
+        if not url.startswith('http'):
+            url = f"https://{url}"
 
         # Fetch homepage
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        response = http_client.get(url, headers=headers, timeout=timeout, allow_redirects=True)
 
         if response.status_code == 200:
-            # Get first 3000 characters of text content
-            text = response.text[:3000]
-            return f"Website accessible. Preview: {text[:500]}"
+            # Only the head of the page is needed for a summary
+            return 200, summarize_html(response.text[:200000])
         else:
-            return f"Website returned status {response.status_code}"
+            return response.status_code, f"Website returned status {response.status_code}"
 
     except requests.exceptions.Timeout:
-        return "Website request timed out"
+        return 0, "Website request timed out"
     except requests.exceptions.RequestException as e:
-        return f"Could not fetch website: {str(e)[:100]}"
+        return 0, f"Could not fetch website: {str(e)[:100]}"
     except Exception as e:
-        return f"Error: {str(e)[:100]}"
+        return 0, f"Error: {str(e)[:100]}"
+
+
+def prefetch_website_summaries(sites, page_cache=None, concurrency=10, deadline=60, timeout=10):
+    """
+    Fetch homepage summaries for many companies concurrently, bounded by a per-run deadline.
+
+    Each domain is fetched at most once (cache hits skip the network) over one pooled
+    session. Fetches still running when the deadline passes are abandoned and their
+    companies are validated without a website summary, so enrichment adds at most
+    `deadline` seconds per scoring pass.
+
+    Args:
+        sites (dict): Domain -> website URL
+        page_cache (PageCache, optional): On-disk page cache shared by domain
+        concurrency (int): Maximum concurrent fetches
+        deadline (float): Seconds the whole prefetch may take
+        timeout (int): Per-request timeout in seconds
+
+    Returns:
+        tuple: (summaries {domain: summary} for successful fetches, stats dict)
+    """
+    stats = {"domains": len(sites), "cache_hits": 0, "fetched": 0, "failed": 0, "timed_out": 0, "seconds": 0.0}
+    summaries = {}
+    to_fetch = {}
+
+    for domain, url in sites.items():
+        cached = page_cache.get(domain) if page_cache else None
+        if cached:
+            stats["cache_hits"] += 1
+            if cached["status"] == 200:
+                summaries[domain] = cached["content"]
+        else:
+            to_fetch[domain] = url
+
+    if not to_fetch:
+        return summaries, stats
+
+    started = time.monotonic()
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Daemon workers (not a ThreadPoolExecutor) so stragglers past the deadline can't delay exit
+    deadline_at = started + deadline
+    work = queue.Queue()
+    for item in to_fetch.items():
+        work.put(item)
+    fetched = queue.Queue()
+
+    def worker():
+        while time.monotonic() < deadline_at:
+            try:
+                domain, url = work.get_nowait()
+            except queue.Empty:
+                return
+            fetched.put((domain, fetch_website_summary(url, timeout, session)))
+
+    for _ in range(min(max(1, concurrency), len(to_fetch))):
+        threading.Thread(target=worker, daemon=True).start()
+
+    received = 0
+    while received < len(to_fetch):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            domain, (status, summary) = fetched.get(timeout=remaining)
+        except queue.Empty:
+            break
+        received += 1
+        if page_cache:
+            page_cache.put(domain, to_fetch[domain], status, summary)
+        if status == 200:
+            summaries[domain] = summary
+            stats["fetched"] += 1
+        else:
+            stats["failed"] += 1
+
+    # Stragglers are not cached, so they are retried on the next run
+    stats["timed_out"] = len(to_fetch) - received
+    stats["seconds"] = round(time.monotonic() - started, 2)
+
+    return summaries, stats
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces out API calls to stay under a requests-per-minute cap.
+
+    Each caller reserves the next free time slot under a lock and then sleeps outside
+    the lock, so concurrent workers queue up fairly without serialising their requests.
+    """
+
+    def __init__(self, requests_per_minute=None):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller is allowed to send its next request."""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_company_name(lead):
+    """Return the best available company name for a lead."""
+    return lead.get("company_name") or lead.get("name") or lead.get("companyName") or "Unknown"
+
+
+def extract_firmographics(lead):
+    """
+    Extract the firmographic fields shown in the validation report.
+
+    Args:
+        lead (dict): Lead data
+
+    Returns:
+        dict: Industry, full location, employees and revenue
+    """
+    industry = lead.get("industry") or ""
+    location = lead.get("company_country") or lead.get("country") or ""
+    city = lead.get("company_city") or lead.get("city") or ""
+    state = lead.get("company_state") or lead.get("state") or ""
+    employees = lead.get("company_size") or lead.get("employees") or ""
+    revenue = lead.get("company_annual_revenue_clean") or lead.get("revenue") or ""
+
+    # Build location string
+    location_parts = [city, state, location]
+    full_location = ", ".join([p for p in location_parts if p])
+
+    return {
+        "industry": industry,
+        "location": full_location,
+        "employees": employees,
+        "revenue": revenue
+    }
 
 
-def validate_leads(input_file, icp_criteria, threshold=85, output_file="validation_report.json", enrich_web=False, offer_name=None, match_threshold=75):
+def get_company_key(lead):
+    """
+    Return a key identifying the lead's company, so each company is scored once.
+
+    Prefers the company domain (or website host), falling back to the lowercased name.
+
+    Args:
+        lead (dict): Lead data
+
+    Returns:
+        str: Company key
+    """
+    domain = lead.get("company_domain") or lead.get("company_website") or lead.get("website") or lead.get("url") or ""
+    if domain:
+        host = urlparse(domain if "://" in domain else f"//{domain}").netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        if host:
+            return host
+    return " ".join(get_company_name(lead).lower().split())
+
+
+def build_company_payload(lead, website_summary=None):
+    """
+    Build the prompt entry for a lead's company (only the fields Claude sees).
+
+    Contact-level fields such as job title are deliberately excluded: they are
+    scored locally so every contact at a company shares one Claude verdict.
+
+    Args:
+        lead (dict): Lead data
+        website_summary (str, optional): Homepage summary from --enrich-web
+
+    Returns:
+        dict: Prompt-relevant company fields
+    """
+    company_desc = lead.get("company_description") or lead.get("description") or ""
+    website = lead.get("company_website") or lead.get("website") or lead.get("url") or ""
+    keywords = lead.get("keywords") or ""
+    firmographics = extract_firmographics(lead)
+
+    payload = {
+        "company_name": get_company_name(lead),
+        "description": company_desc[:500] if company_desc else "N/A",
+        "industry": firmographics["industry"],
+        "keywords": keywords[:400] if keywords else "N/A",
+        "location": firmographics["location"],
+        "employees": firmographics["employees"],
+        "revenue": firmographics["revenue"],
+        "website": website
+    }
+    # Only present when fetched, so non-enriched cache entries stay valid
+    if website_summary:
+        payload["website_summary"] = website_summary
+    return payload
+
+
+def build_validation_prompt(batch_data, icp_criteria, offer_name=None):
+    """
+    Build the Claude prompt that scores a batch of companies against the ICP.
+
+    Args:
+        batch_data (list): Prompt entries from build_company_payload(), each with an "id"
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+
+    Returns:
+        str: Prompt text
+    """
+    offer_context = f"\n**OFFER/PRODUCT WE'RE SELLING**: {offer_name}\n" if offer_name else ""
+
+    # Build ICP description section
+    icp_description_context = ""
+    if icp_criteria.get('description'):
+        icp_description_context = f"\n**DETAILED ICP DESCRIPTION**:\n{icp_criteria['description']}\n"
+
+    # Build structured ICP criteria (exclude description and job_title - titles are scored locally per contact)
+    structured_criteria = {k: v for k, v in icp_criteria.items() if k not in ['description', 'job_title'] and v}
+    structured_icp = chr(10).join([f"- {k.title()}: {v}" for k, v in structured_criteria.items()]) if structured_criteria else ""
+
+    return f"""You are an expert at analyzing if companies match an Ideal Customer Profile (ICP).
+
+TARGET ICP:
+{structured_icp}
+{icp_description_context}{offer_context}
+
+TASK: Analyze each company below and provide ICP match percentages.
+
+ANALYSIS CRITERIA:
+1. **Industry/Niche Match** (40%): Does the company description, keywords, industry (and website_summary, when present) show they're in our target niche?
+2. **Firmographic Match** (35%): Do location, employee count, and revenue fit our ICP ranges?
+3. **ICP Description Fit** (15%): {f"Does the company match the detailed ICP description provided above?" if icp_criteria.get('description') else "Does the overall profile make sense?"}
+4. **Solution Fit** (10%): Based on what they do, would our offer be relevant?
+
+COMPANIES TO ANALYZE:
+{json.dumps(batch_data, indent=2)}
+
+RESPONSE FORMAT - Return ONLY a JSON array with this exact structure:
+[
+  {{"id": "C0", "company_name": "Company Name", "percentage": 85, "reason": "Brief reason"}},
+  {{"id": "C1", "company_name": "Company Name 2", "percentage": 70, "reason": "Brief reason"}}
+]
+
+CRITICAL: Return ONLY the JSON array, no other text. One entry per company, copying each company's "id" exactly."""
+
+
+def parse_json_response(response_text):
+    """
+    Extract JSON from a Claude response, handling markdown code blocks.
+
+    Args:
+        response_text (str): Raw response text
+
+    Returns:
+        list or dict: Parsed JSON
+    """
+    text = response_text.strip()
+
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+
+    return json.loads(text)
+
+
+def parse_batch_results(response_text, expected_ids):
+    """
+    Parse a validation response into per-entry results, keyed by entry ID.
+
+    If the response is not valid JSON as a whole (e.g. it was cut off at max_tokens),
+    every complete {...} object in it is salvaged individually.
+
+    Args:
+        response_text (str): Raw response text
+        expected_ids (set): Entry IDs that were sent in the batch
+
+    Returns:
+        dict: {entry_id: {"percentage", "reason"}} for every well-formed item
+    """
+    try:
+        items = parse_json_response(response_text)
+    except json.JSONDecodeError:
+        items = []
+        for match in re.findall(r"\{[^{}]*\}", response_text):
+            try:
+                items.append(json.loads(match))
+            except json.JSONDecodeError:
+                continue
+        if not items:
+            raise
+
+    if not isinstance(items, list):
+        raise ValueError(f"Expected a JSON array, got {type(items).__name__}")
+
+    # Keep every well-formed item; anything missing is retried by the caller
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        entry_id = str(item.get("id", ""))
+        try:
+            percentage = float(item.get("percentage"))
+        except (TypeError, ValueError):
+            continue
+        if entry_id in expected_ids:
+            percentage = max(0, min(100, percentage))
+            results[entry_id] = {
+                "percentage": int(percentage) if percentage.is_integer() else percentage,
+                "reason": item.get("reason") or "No reason provided"
+            }
+
+    return results
+
+
+def validate_batch(client, batch_entries, icp_criteria, offer_name=None, rate_limiter=None, max_tokens=3000):
+    """
+    Score one batch of companies with a single Claude call, matching results by entry ID.
+
+    Args:
+        client (Anthropic): Anthropic client (safe to share across threads)
+        batch_entries (list): (entry_id, prompt entry) tuples
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+        rate_limiter (RateLimiter, optional): Shared requests-per-minute limiter
+        max_tokens (int): Response token budget for the call
+
+    Returns:
+        dict: {"results": {entry_id: {"percentage", "reason"}} for every parseable item,
+               "error": error message or None, "latency": API seconds,
+               "input_tokens": int, "output_tokens": int, "truncated": bool}
+    """
+    batch_data = [{"id": entry_id, **payload} for entry_id, payload in batch_entries]
+    expected_ids = {entry_id for entry_id, _ in batch_entries}
+    prompt = build_validation_prompt(batch_data, icp_criteria, offer_name)
+
+    if rate_limiter:
+        rate_limiter.wait()
+
+    outcome = {"results": {}, "error": None, "latency": 0.0, "input_tokens": 0, "output_tokens": 0, "truncated": False}
+    started = time.monotonic()
+    try:
+        message = client.messages.create(
+            model=VALIDATION_MODEL,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        outcome["latency"] = time.monotonic() - started
+        outcome["input_tokens"] = message.usage.input_tokens
+        outcome["output_tokens"] = message.usage.output_tokens
+        outcome["truncated"] = getattr(message, "stop_reason", None) == "max_tokens"
+
+        outcome["results"] = parse_batch_results(message.content[0].text, expected_ids)
+
+    except Exception as e:
+        outcome["latency"] = time.monotonic() - started
+        outcome["error"] = str(e)
+
+    return outcome
+
+
+def run_validation_batches(client, batches, icp_criteria, offer_name=None, concurrency=5, rate_limiter=None, max_tokens=3000):
+    """
+    Dispatch validation batches concurrently and yield outcomes as they complete.
+
+    Batches are pulled from the iterable lazily, only when a worker is free, so no
+    more than `concurrency` requests are in flight and a generator-based batcher can
+    adapt later batches to earlier outcomes. The rate limiter additionally caps
+    requests per minute.
+
+    Args:
+        client (Anthropic): Anthropic client
+        batches (iterable): Lists of (entry_id, prompt entry) tuples
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+        concurrency (int): Maximum concurrent API calls
+        rate_limiter (RateLimiter, optional): Shared requests-per-minute limiter
+        max_tokens (int): Response token budget per call
+
+    Yields:
+        tuple: (batch_index, outcome dict from validate_batch())
+    """
+    concurrency = max(1, concurrency)
+    pending_batches = iter(enumerate(batches))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = {}
+
+        def submit_next():
+            try:
+                batch_index, batch_entries = next(pending_batches)
+            except StopIteration:
+                return False
+            future = executor.submit(validate_batch, client, batch_entries, icp_criteria, offer_name, rate_limiter, max_tokens)
+            in_flight[future] = batch_index
+            return True
+
+        while len(in_flight) < concurrency and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch_index = in_flight.pop(future)
+                yield batch_index, future.result()
+                submit_next()
+
+
+def estimate_cost(input_tokens, output_tokens):
+    """Estimate Claude spend in USD for the given token counts."""
+    return (input_tokens * INPUT_COST_PER_MTOK + output_tokens * OUTPUT_COST_PER_MTOK) / 1_000_000
+
+
+def score_entries(client, entries, icp_criteria, offer_name=None, batcher=None, concurrency=5, rate_limiter=None,
+                  max_retries=2, on_results=None, size_limit=None):
+    """
+    Score prompt entries with Claude, retrying only the items that failed.
+
+    Entries are packed into calls by the token-budget batcher, which adapts its
+    batch size to truncation and latency as outcomes arrive. Any entry whose result
+    is missing or unparseable (including every entry of a batch whose response
+    failed outright) is retried with a halved batch size cap, up to `max_retries`
+    rounds.
+
+    Args:
+        client (Anthropic): Anthropic client
+        entries (list): (entry_id, prompt entry) tuples
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+        batcher (AdaptiveBatcher, optional): Token-budget batcher (a default one is created if omitted)
+        concurrency (int): Maximum concurrent API calls
+        rate_limiter (RateLimiter, optional): Shared requests-per-minute limiter
+        max_retries (int): Maximum retry rounds for failed entries
+        on_results (callable, optional): Called with each batch's {entry_id: result} as it arrives
+        size_limit (int, optional): Hard cap on entries per call for this run
+
+    Returns:
+        tuple: (results {entry_id: {"percentage", "reason"}},
+                errors {entry_id: last error message},
+                stats dict with call/token/retry counters and per-call latencies)
+    """
+    batcher = batcher or AdaptiveBatcher()
+    results = {}
+    errors = {}
+    stats = {
+        "calls": 0,
+        "retry_calls": 0,
+        "retried_entries": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "retry_input_tokens": 0,
+        "retry_output_tokens": 0,
+        "latencies": []
+    }
+
+    pending = list(entries)
+    attempt = 0
+
+    while pending:
+        queue = deque(pending)
+        batches = []
+        failed = []
+        label = "Batch" if attempt == 0 else f"Retry {attempt} batch"
+
+        def batch_source():
+            while queue:
+                batch = batcher.next_batch(queue, size_limit)
+                batches.append(batch)
+                yield batch
+
+        for batch_index, outcome in run_validation_batches(client, batch_source(), icp_criteria, offer_name,
+                                                           concurrency, rate_limiter, batcher.max_output_tokens):
+            batch_entries = batches[batch_index]
+            stats["calls"] += 1
+            stats["input_tokens"] += outcome["input_tokens"]
+            stats["output_tokens"] += outcome["output_tokens"]
+            stats["latencies"].append(outcome["latency"])
+            if attempt > 0:
+                stats["retry_calls"] += 1
+                stats["retry_input_tokens"] += outcome["input_tokens"]
+                stats["retry_output_tokens"] += outcome["output_tokens"]
+
+            batcher.feedback(len(batch_entries), outcome["latency"], outcome["output_tokens"],
+                             len(outcome["results"]), outcome["truncated"])
+
+            missing = [entry for entry in batch_entries if entry[0] not in outcome["results"]]
+            failed.extend(missing)
+            for entry_id, _ in missing:
+                errors[entry_id] = outcome["error"] or "Missing or unparseable in Claude response"
+
+            if outcome["error"]:
+                print(f"   ⚠️  {label} {batch_index + 1} validation error: {outcome['error'][:100]}")
+            else:
+                truncated_note = ", truncated" if outcome["truncated"] else ""
+                print(f"   📦 {label} {batch_index + 1} done ({len(batch_entries) - len(missing)}/{len(batch_entries)} scored, {outcome['latency']:.1f}s{truncated_note}) [next cap {batcher.size_cap}]")
+
+            if outcome["results"]:
+                results.update(outcome["results"])
+                for entry_id in outcome["results"]:
+                    errors.pop(entry_id, None)
+                if on_results:
+                    on_results(outcome["results"])
+
+        if not failed or attempt >= max_retries:
+            break
+
+        attempt += 1
+        batcher.shrink_for_retry()
+        stats["retried_entries"] += len(failed)
+        print(f"   🔁 Retrying {len(failed)} unscored entries in batches of up to {batcher.size_cap} (attempt {attempt}/{max_retries})")
+        pending = failed
+
+    return results, errors, stats
+
+
+def load_batch_job(job_file, icp_hash):
+    """
+    Load a saved Message Batches job so polling can resume after a crash.
+
+    Args:
+        job_file (str): Path of the saved job state
+        icp_hash (str): ICP fingerprint of the current run
+
+    Returns:
+        dict or None: Saved job, or None if there is none for this ICP
+    """
+    if not job_file or not os.path.exists(job_file):
+        return None
+    try:
+        with open(job_file, 'r', encoding='utf-8') as f:
+            job = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if job.get("icp_hash") != icp_hash or not job.get("batch_id"):
+        print(f"   ⚠️  Ignoring saved batch job in {job_file} (different ICP/offer)")
+        return None
+    return job
+
+
+def save_batch_job(job_file, job):
+    """Persist Message Batches job state (batch ID + request mapping) before polling."""
+    os.makedirs(os.path.dirname(job_file) if os.path.dirname(job_file) else ".tmp", exist_ok=True)
+    with open(job_file, 'w', encoding='utf-8') as f:
+        json.dump(job, f, indent=2, ensure_ascii=False)
+
+
+def submit_batch_job(client, entries, icp_criteria, offer_name, batcher, icp_hash):
+    """
+    Submit every prompt as one Message Batches job.
+
+    Args:
+        client (Anthropic): Anthropic client
+        entries (list): (fingerprint, prompt entry) tuples
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+        batcher (AdaptiveBatcher): Packs companies into prompts under the token budget
+        icp_hash (str): ICP fingerprint (saved so a resume can't mix ICPs)
+
+    Returns:
+        dict: Job state {"batch_id", "icp_hash", "submitted_at", "requests": {custom_id: {entry_id: fingerprint}}}
+    """
+    queue = deque(entries)
+    requests_payload = []
+    request_map = {}
+
+    while queue:
+        batch = batcher.next_batch(queue)
+        custom_id = f"prompt-{len(requests_payload)}"
+        # IDs only need to be unique within one prompt; results are matched per custom_id
+        batch_data = [{"id": f"C{n}", **payload} for n, (_, payload) in enumerate(batch)]
+        request_map[custom_id] = {f"C{n}": fingerprint for n, (fingerprint, _) in enumerate(batch)}
+        requests_payload.append({
+            "custom_id": custom_id,
+            "params": {
+                "model": VALIDATION_MODEL,
+                "max_tokens": batcher.max_output_tokens,
+                "messages": [{"role": "user", "content": build_validation_prompt(batch_data, icp_criteria, offer_name)}]
+            }
+        })
+
+    message_batch = client.messages.batches.create(requests=requests_payload)
+    return {
+        "batch_id": message_batch.id,
+        "icp_hash": icp_hash,
+        "submitted_at": datetime.now().isoformat(),
+        "requests": request_map
+    }
+
+
+def wait_for_batch_job(client, batch_id, poll_interval=30):
+    """
+    Poll a Message Batches job until it has ended.
+
+    Args:
+        client (Anthropic): Anthropic client
+        batch_id (str): Message batch ID
+        poll_interval (float): Seconds between status checks
+    """
+    while True:
+        message_batch = client.messages.batches.retrieve(batch_id)
+        counts = message_batch.request_counts
+        print(f"   ⏳ Batch job {batch_id}: {message_batch.processing_status} "
+              f"({counts.succeeded} succeeded, {counts.errored} errored, {counts.processing} processing)")
+        if message_batch.processing_status == "ended":
+            return
+        time.sleep(poll_interval)
+
+
+def score_entries_bulk(client, entries, icp_criteria, offer_name=None, batcher=None, job_file=DEFAULT_BATCH_JOB_FILE,
+                       icp_hash="", poll_interval=30, on_results=None):
+    """
+    Score prompt entries through the Message Batches API (higher throughput, ~50% cheaper, not interactive).
+
+    The job ID and request mapping are saved to `job_file` right after submission, so
+    if the run dies while polling, re-running the same command resumes the saved job
+    instead of paying for a new one. Entries not covered by a resumed job are
+    submitted as a fresh job. Anything left unscored is returned as an error for the
+    caller to retry interactively.
+
+    Args:
+        client (Anthropic): Anthropic client
+        entries (list): (fingerprint, prompt entry) tuples
+        icp_criteria (dict): ICP criteria
+        offer_name (str, optional): Offer/product being sold
+        batcher (AdaptiveBatcher, optional): Token-budget batcher
+        job_file (str): Where the in-flight job state is saved
+        icp_hash (str): ICP fingerprint of the run
+        poll_interval (float): Seconds between status checks
+        on_results (callable, optional): Called with each prompt's {fingerprint: result}
+
+    Returns:
+        tuple: (results {fingerprint: result}, errors {fingerprint: message}, stats dict)
+    """
+    batcher = batcher or AdaptiveBatcher()
+    results = {}
+    errors = {}
+    stats = {"bulk_jobs": 0, "bulk_requests": 0, "bulk_input_tokens": 0, "bulk_output_tokens": 0,
+             "input_tokens": 0, "output_tokens": 0}
+
+    pending = list(entries)
+    job = load_batch_job(job_file, icp_hash)
+    if job:
+        print(f"   ♻️  Resuming batch job {job['batch_id']} submitted {job['submitted_at']}")
+
+    while pending:
+        if not job:
+            job = submit_batch_job(client, pending, icp_criteria, offer_name, batcher, icp_hash)
+            save_batch_job(job_file, job)
+            print(f"   📨 Submitted batch job {job['batch_id']} ({len(job['requests'])} prompts, {len(pending)} companies) - saved to {job_file}")
+
+        wait_for_batch_job(client, job["batch_id"], poll_interval)
+        stats["bulk_jobs"] += 1
+
+        covered = set()
+        for item in client.messages.batches.results(job["batch_id"]):
+            entry_map = job["requests"].get(item.custom_id)
+            if not entry_map:
+                continue
+            covered.update(entry_map.values())
+            stats["bulk_requests"] += 1
+
+            if item.result.type != "succeeded":
+                for fingerprint in entry_map.values():
+                    errors[fingerprint] = f"Batch request {item.result.type}"
+                continue
+
+            message = item.result.message
+            stats["bulk_input_tokens"] += message.usage.input_tokens
+            stats["bulk_output_tokens"] += message.usage.output_tokens
+            try:
+                parsed = parse_batch_results(message.content[0].text, set(entry_map))
+            except Exception as e:
+                parsed = {}
+                for fingerprint in entry_map.values():
+                    errors[fingerprint] = str(e)
+
+            batch_results = {entry_map[entry_id]: result for entry_id, result in parsed.items()}
+            for fingerprint in entry_map.values():
+                if fingerprint not in batch_results:
+                    errors.setdefault(fingerprint, "Missing or unparseable in Claude response")
+                else:
+                    errors.pop(fingerprint, None)
+            if batch_results:
+                results.update(batch_results)
+                if on_results:
+                    on_results(batch_results)
+
+        # Results are cached by the caller, so the saved job is no longer needed
+        if os.path.exists(job_file):
+            os.remove(job_file)
+
+        # A resumed job may predate some of this run's entries; submit those as a new job
+        pending = [entry for entry in pending if entry[0] not in covered]
+        job = None
+
+    stats["input_tokens"] = stats["bulk_input_tokens"]
+    stats["output_tokens"] = stats["bulk_output_tokens"]
+    return results, errors, stats
+
+
+class LeadValidator:
+    """
+    Scores leads against the ICP: local pre-filter, company dedup, result cache, then Claude.
+
+    State (company scores, cache connection, API counters) is kept across calls to
+    score(), so the sequential test gate can validate wave after wave without
+    re-scoring a company it has already seen.
+    """
+
+    def __init__(self, icp_criteria, offer_name=None, match_threshold=75, cache_file=DEFAULT_CACHE_FILE,
+                 concurrency=5, requests_per_minute=50, prefilter=True, prefilter_tolerance=0.5, max_retries=2,
+                 batcher=None, bulk=False, batch_job_file=DEFAULT_BATCH_JOB_FILE, poll_interval=30,
+                 enrich_web=False, page_cache_file=DEFAULT_PAGE_CACHE_FILE, web_concurrency=10, web_deadline=60):
+        self.icp_criteria = icp_criteria
+        self.offer_name = offer_name
+        self.match_threshold = match_threshold
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.batcher = batcher or AdaptiveBatcher()
+        self.bulk = bulk
+        self.batch_job_file = batch_job_file
+        self.poll_interval = poll_interval
+        self.client = None
+
+        self.enrich_web = enrich_web
+        self.web_concurrency = web_concurrency
+        self.web_deadline = web_deadline
+        self.page_cache = PageCache(page_cache_file) if enrich_web and page_cache_file else None
+        self.web_stats = {"domains": 0, "cache_hits": 0, "fetched": 0, "failed": 0, "timed_out": 0, "seconds": 0.0}
+
+        self.rules = FirmographicPrefilter(icp_criteria, tolerance=prefilter_tolerance) if prefilter else None
+        if self.rules and not self.rules.active:
+            self.rules = None
+
+        # Job titles are not part of the Claude prompt, so they don't invalidate cached company scores
+        self.cache = ValidationCache(cache_file) if cache_file else None
+        company_icp = {k: v for k, v in icp_criteria.items() if k != 'job_title'}
+        self.icp_key = icp_fingerprint(company_icp, offer_name, VALIDATION_MODEL, PROMPT_VERSION)
+
+        self.company_results = {}
+        self.company_contacts = {}
+        self.prefilter_reasons = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.stats = {"calls": 0, "retry_calls": 0, "retried_entries": 0, "input_tokens": 0, "output_tokens": 0,
+                      "retry_input_tokens": 0, "retry_output_tokens": 0, "latencies": [],
+                      "bulk_jobs": 0, "bulk_requests": 0, "bulk_input_tokens": 0, "bulk_output_tokens": 0}
+
+    def _get_client(self):
+        if self.client is None:
+            # Only needed when something is not cached
+            api_key = os.getenv("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise RuntimeError("ANTHROPIC_API_KEY not found in .env file")
+            self.client = Anthropic(api_key=api_key)
+        return self.client
+
+    def score(self, leads, size_limit=None):
+        """
+        Score a list of leads.
+
+        Args:
+            leads (list): Leads to score
+            size_limit (int, optional): Hard cap on companies per Claude call (the batcher decides otherwise)
+
+        Returns:
+            list: One result per lead, in order: {"percentage", "reason", ...} or {"error": message}
+        """
+        lead_results = [None] * len(leads)
+
+        # Reject obvious firmographic mismatches locally (no API call needed)
+        if self.rules:
+            for idx, lead in enumerate(leads):
+                rejection = self.rules.check(lead)
+                if rejection:
+                    rule, reason = rejection
+                    lead_results[idx] = {"percentage": 0, "reason": reason, "prefiltered": True}
+                    self.prefilter_reasons[rule] = self.prefilter_reasons.get(rule, 0) + 1
+
+        # Group the remaining leads by company so each company is scored by Claude once
+        companies = {}
+        for idx, lead in enumerate(leads):
+            if lead_results[idx] is not None:
+                continue
+            key = get_company_key(lead)
+            if key not in companies:
+                payload = build_company_payload(lead)
+                companies[key] = {"payload": payload, "fingerprint": lead_fingerprint(payload), "lead_indices": []}
+            companies[key]["lead_indices"].append(idx)
+            self.company_contacts[key] = self.company_contacts.get(key, 0) + 1
+
+        new_keys = [key for key in companies if key not in self.company_results]
+        if self.enrich_web and new_keys:
+            self._enrich_companies(leads, companies, new_keys)
+
+        if self.cache and new_keys:
+            cached = self.cache.get_many(self.icp_key, [companies[key]["fingerprint"] for key in new_keys])
+            for key in new_keys:
+                if companies[key]["fingerprint"] in cached:
+                    self.company_results[key] = cached[companies[key]["fingerprint"]]
+                    self.cache_hits += 1
+
+        miss_keys = [key for key in new_keys if key not in self.company_results]
+        self.cache_misses += len(miss_keys)
+
+        pending_keys = miss_keys
+        if miss_keys and self.bulk:
+            client = self._get_client()
+            fingerprint_keys = {companies[key]["fingerprint"]: key for key in miss_keys}
+
+            def record_bulk_results(batch_results):
+                # A resumed job can cover companies this run didn't ask for (a wider earlier
+                # run, or companies cached since): cache their scores, don't map them
+                self._record_results(companies, {fingerprint_keys[fp]: result for fp, result in batch_results.items()
+                                                 if fp in fingerprint_keys})
+                if self.cache:
+                    self.cache.put_many(self.icp_key, [(fp, result["percentage"], result["reason"])
+                                                       for fp, result in batch_results.items()
+                                                       if fp not in fingerprint_keys])
+
+            _, bulk_errors, stats = score_entries_bulk(
+                client, [(fp, companies[key]["payload"]) for fp, key in fingerprint_keys.items()],
+                self.icp_criteria, self.offer_name,
+                batcher=self.batcher,
+                job_file=self.batch_job_file,
+                icp_hash=self.icp_key,
+                poll_interval=self.poll_interval,
+                on_results=record_bulk_results
+            )
+            for counter, value in stats.items():
+                self.stats[counter] += value
+
+            # Whatever the batch job failed to score falls through to interactive retries
+            pending_keys = [key for key in miss_keys if key not in self.company_results]
+            if pending_keys and not self.max_retries:
+                for key in pending_keys:
+                    error = bulk_errors.get(companies[key]["fingerprint"], "Missing from batch job results")
+                    self.company_results[key] = {"error": f"Validation error: {error[:100]}"}
+                pending_keys = []
+            elif pending_keys:
+                print(f"   🔁 {len(pending_keys)} companies unscored by the batch job, retrying interactively")
+
+        if pending_keys:
+            client = self._get_client()
+            entry_keys = {f"C{n}": key for n, key in enumerate(pending_keys)}
+
+            def record_results(batch_results):
+                self._record_results(companies, {entry_keys[entry_id]: result for entry_id, result in batch_results.items()})
+
+            entries = [(entry_id, companies[key]["payload"]) for entry_id, key in entry_keys.items()]
+            _, errors, stats = score_entries(
+                client, entries, self.icp_criteria, self.offer_name,
+                batcher=self.batcher,
+                concurrency=self.concurrency,
+                rate_limiter=self.rate_limiter,
+                max_retries=self.max_retries if not self.bulk else self.max_retries - 1,
+                on_results=record_results,
+                size_limit=size_limit
+            )
+            if self.bulk:
+                # Every interactive call after a batch job is a retry of what the job missed
+                stats["retry_calls"] = stats["calls"]
+                stats["retried_entries"] += len(entries)
+                stats["retry_input_tokens"] = stats["input_tokens"]
+                stats["retry_output_tokens"] = stats["output_tokens"]
+            for counter, value in stats.items():
+                self.stats[counter] += value
+
+            # Companies still unscored after all retries keep their last error (not cached, retried next run)
+            for entry_id, error in errors.items():
+                self.company_results[entry_keys[entry_id]] = {"error": f"Validation error: {error[:100]}"}
+
+        # Merge company fit with each contact's local job title fit
+        for key, company in companies.items():
+            company_result = self.company_results.get(key) or {"error": "Missing from Claude batch response"}
+            for idx in company["lead_indices"]:
+                if "error" in company_result:
+                    lead_results[idx] = company_result
+                    continue
+
+                lead = leads[idx]
+                job_title = lead.get("job_title") or lead.get("title") or lead.get("position") or ""
+                title_score, title_note = score_job_title(job_title, self.icp_criteria.get('job_title'))
+                lead_results[idx] = {
+                    "percentage": round(COMPANY_FIT_WEIGHT * company_result["percentage"] + JOB_TITLE_FIT_WEIGHT * title_score),
+                    "reason": f"{company_result['reason']} | Job title: {title_note}",
+                    "company_percentage": company_result["percentage"],
+                    "job_title_percentage": title_score
+                }
+
+        return lead_results
+
+    def _enrich_companies(self, leads, companies, keys):
+        """
+        Prefetch homepage summaries for companies with a website and add them to their payloads.
+
+        Args:
+            leads (list): Leads being scored
+            companies (dict): Company key -> {"payload", "fingerprint", "lead_indices"}
+            keys (list): Company keys still to be scored
+        """
+        sites = {}
+        for key in keys:
+            website = companies[key]["payload"]["website"]
+            if website and "." in key:
+                sites[key] = website
+
+        if not sites:
+            return
+
+        print(f"   🌐 Fetching {len(sites)} company websites ({self.web_concurrency} at a time, {self.web_deadline}s deadline)...")
+        summaries, stats = prefetch_website_summaries(
+            sites, self.page_cache, concurrency=self.web_concurrency, deadline=self.web_deadline
+        )
+        for counter, value in stats.items():
+            self.web_stats[counter] += value
+        print(f"   🌐 {len(summaries)} summaries ({stats['cache_hits']} cached, {stats['fetched']} fetched, "
+              f"{stats['failed']} failed, {stats['timed_out']} past deadline) in {stats['seconds']}s")
+
+        for key, summary in summaries.items():
+            company = companies[key]
+            payload = build_company_payload(leads[company["lead_indices"][0]], website_summary=summary)
+            company["payload"] = payload
+            company["fingerprint"] = lead_fingerprint(payload)
+
+    def _record_results(self, companies, company_results):
+        """
+        Store fresh company scores, print them and write them to the cache.
+
+        Args:
+            companies (dict): Company key -> {"payload", "fingerprint", "lead_indices"}
+            company_results (dict): Company key -> {"percentage", "reason"}
+        """
+        fresh_entries = []
+        for key, result in company_results.items():
+            company = companies[key]
+            self.company_results[key] = result
+            fresh_entries.append((company["fingerprint"], result["percentage"], result["reason"]))
+
+            status_icon = "✅" if result["percentage"] >= self.match_threshold else "❌"
+            print(f"   {status_icon} {company['payload']['company_name']} ({result['percentage']}% company fit, {len(company['lead_indices'])} contacts): {result['reason'][:60]}...")
+
+        if self.cache:
+            self.cache.put_many(self.icp_key, fresh_entries)
+
+    def close(self):
+        """Release the cache connections."""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        if self.page_cache:
+            self.page_cache.close()
+            self.page_cache = None
+
+
+def build_validation_detail(lead, result, match_threshold):
+    """
+    Build the validation_details entry for one scored lead.
+
+    Args:
+        lead (dict): Lead data
+        result (dict): Result from LeadValidator.score()
+        match_threshold (int): Minimum ICP match percentage to keep a lead
+
+    Returns:
+        dict: Validation detail
+    """
+    if result is None or "error" in result:
+        return {
+            "lead_id": lead_id_for(lead),
+            "company": get_company_name(lead),
+            "valid": False,
+            "match_percentage": 0,
+            "reason": result["error"] if result else "Missing from Claude batch response",
+            "validation_error": True,
+            "firmographics": {},
+            "data": lead
+        }
+
+    detail = {
+        "lead_id": lead_id_for(lead),
+        "company": get_company_name(lead),
+        "valid": result["percentage"] >= match_threshold,
+        "match_percentage": result["percentage"],
+        "reason": result["reason"],
+        "firmographics": extract_firmographics(lead),
+        "data": lead
+    }
+    if result.get("prefiltered"):
+        detail["prefiltered"] = True
+    else:
+        detail["company_match_percentage"] = result["company_percentage"]
+        detail["job_title_match_percentage"] = result["job_title_percentage"]
+    return detail
+
+
+def wilson_interval(successes, trials, z):
+    """
+    Wilson score interval for a binomial proportion.
+
+    Args:
+        successes (int): Number of valid leads
+        trials (int): Number of scored leads
+        z (float): Normal quantile for the desired confidence
+
+    Returns:
+        tuple: (low, high) bounds as fractions
+    """
+    if trials == 0:
+        return (0.0, 1.0)
+
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+def run_sequential_gate(validator, leads, threshold, confidence=0.95, wave_size=5, seed=0):
+    """
+    Validate leads in small waves and stop once pass/fail is statistically settled.
+
+    After each wave a Wilson interval is computed on the valid-lead proportion. The
+    error budget (1 - confidence) is split evenly across the maximum number of looks
+    (Bonferroni), so repeatedly peeking does not inflate the false decision rate.
+    The gate passes as soon as the lower bound clears the threshold and fails as
+    soon as the upper bound falls below it.
+
+    Args:
+        validator (LeadValidator): Validator to score leads with
+        leads (list): Candidate leads (the test batch)
+        threshold (int): Minimum percentage of valid leads to pass
+        confidence (float): Confidence required for an early decision (e.g. 0.95)
+        wave_size (int): Leads validated per wave
+        seed (int): Seed for the evaluation order (leads are shuffled so waves are random samples)
+
+    Returns:
+        tuple: (lead indices that were spent, their results, sequential summary dict)
+    """
+    wave_size = max(1, wave_size)
+    order = list(range(len(leads)))
+    random.Random(seed).shuffle(order)
+
+    max_looks = math.ceil(len(leads) / wave_size)
+    alpha_per_look = (1 - confidence) / max_looks
+    z = NormalDist().inv_cdf(1 - alpha_per_look / 2)
+    target = threshold / 100
+
+    spent, results = [], []
+    valid, scored = 0, 0
+    decision, interval, waves = "exhausted", (0.0, 1.0), 0
+
+    for start in range(0, len(order), wave_size):
+        wave = order[start:start + wave_size]
+        waves += 1
+        # Split the wave across concurrent calls rather than one large batch
+        wave_batch_size = max(1, math.ceil(len(wave) / max(1, validator.concurrency)))
+        wave_results = validator.score([leads[idx] for idx in wave], size_limit=wave_batch_size)
+
+        for idx, result in zip(wave, wave_results):
+            spent.append(idx)
+            results.append(result)
+            if result and "error" not in result:
+                scored += 1
+                if result["percentage"] >= validator.match_threshold:
+                    valid += 1
+
+        interval = wilson_interval(valid, scored, z)
+        print(f"   🧪 Wave {waves}/{max_looks}: {valid}/{scored} valid, {confidence:.0%} interval {interval[0]:.0%}-{interval[1]:.0%} vs {threshold}% threshold")
+
+        if scored and interval[0] >= target:
+            decision = "pass"
+            break
+        if scored and interval[1] < target:
+            decision = "fail"
+            break
+
+    return spent, results, {
+        "decision": decision,
+        "confidence": confidence,
+        "interval": [round(interval[0] * 100, 1), round(interval[1] * 100, 1)],
+        "waves": waves,
+        "wave_size": wave_size,
+        "leads_spent": len(spent),
+        "leads_available": len(leads)
+    }
+
+
+def validate_leads(input_file, icp_criteria, threshold=85, output_file="validation_report.json", enrich_web=False, offer_name=None, match_threshold=75,
+                   concurrency=5, requests_per_minute=50, cache_file=DEFAULT_CACHE_FILE, prefilter=True, prefilter_tolerance=0.5,
+                   max_retries=2, sequential=False, confidence=0.95, wave_size=5,
+                   target_prompt_tokens=6000, max_output_tokens=3000, max_batch_size=40, target_latency=20.0,
+                   bulk=False, batch_job_file=DEFAULT_BATCH_JOB_FILE, poll_interval=30,
+                   page_cache_file=DEFAULT_PAGE_CACHE_FILE, web_concurrency=10, web_deadline=60, store_file=None, leads=None):
     """
     Validate that scraped leads match the target ICP using Claude AI percentage matching.
 
@@ -78,41 +1253,60 @@ def validate_leads(input_file, icp_criteria, threshold=85, output_file="validati
         icp_criteria (dict): ICP criteria including industry, location, employees, revenue, etc.
         threshold (int): Minimum percentage of valid leads to pass (default: 85)
         output_file (str): Output file for validation report
-        enrich_web (bool): Whether to fetch company websites for enrichment
+        enrich_web (bool): Whether to fetch company homepage summaries and add them to the prompt
         offer_name (str, optional): Name of offer/product being sold (helps AI understand fit)
         match_threshold (int): Minimum ICP match percentage to keep a lead (default: 75)
+        concurrency (int): Maximum number of batches validated in parallel (default: 5)
+        requests_per_minute (int): Cap on Claude API calls per minute, 0 to disable (default: 50)
+        cache_file (str, optional): SQLite validation cache path, None to disable caching
+        prefilter (bool): Reject plainly out-of-ICP location/size/revenue locally before calling Claude
+        prefilter_tolerance (float): Fractional widening of ICP size/revenue ranges for the pre-filter
+        max_retries (int): Retry rounds for leads missing/unparseable in a Claude response (default: 2)
+        sequential (bool): Test-gate mode: validate in waves and stop once pass/fail is settled
+        confidence (float): Confidence required for a sequential early decision (default: 0.95)
+        wave_size (int): Leads per wave in sequential mode (default: 5)
+        target_prompt_tokens (int): Estimated prompt tokens to pack into each Claude call (default: 6000)
+        max_output_tokens (int): Response token budget per call; batches leave headroom under it (default: 3000)
+        max_batch_size (int): Upper bound on companies per call when growing batches (default: 40)
+        target_latency (float): Calls slower than this shrink the batch size, much faster ones grow it (default: 20s)
+        bulk (bool): Submit all prompts as one Message Batches job instead of interactive calls
+        batch_job_file (str): Where the in-flight batch job is saved so a re-run resumes it
+        poll_interval (float): Seconds between batch job status checks (default: 30)
+        page_cache_file (str, optional): On-disk page cache for --enrich-web, None to disable
+        web_concurrency (int): Concurrent website fetches for --enrich-web (default: 10)
+        web_deadline (float): Seconds the website prefetch may add per scoring pass (default: 60)
+        store_file (str, optional): SQLite lead store to record each lead's verdict in
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of reading input_file
 
     Returns:
         dict: Validation results with pass/fail status
     """
 
-    # Check if Anthropic API key exists
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        return {
-            "status": "error",
-            "message": "ANTHROPIC_API_KEY not found in .env file"
-        }
-
     # Load leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": f"Input file not found: {input_file}"
-        }
-    except json.JSONDecodeError:
+    if leads is None:
+        try:
+            leads = read_leads(input_file)
+        except FileNotFoundError:
+            return {
+                "status": "error",
+                "message": f"Input file not found: {input_file}"
+            }
+        except ValueError:
+            return {
+                "status": "error",
+                "message": f"Invalid JSON in file: {input_file}"
+            }
+
+    if not leads:
         return {
             "status": "error",
-            "message": f"Invalid JSON in file: {input_file}"
+            "message": "No leads found in input file"
         }
 
-    if not leads:
+    if bulk and sequential:
         return {
             "status": "error",
-            "message": "No leads found in input file"
+            "message": "--bulk and --sequential can't be combined (batch jobs are not interactive)"
         }
 
     # Build ICP summary for display
@@ -130,6 +1324,30 @@ def validate_leads(input_file, icp_criteria, threshold=85, output_file="validati
 
     icp_summary = " | ".join(icp_parts) if icp_parts else "No ICP criteria specified"
 
+    validator = LeadValidator(
+        icp_criteria, offer_name,
+        match_threshold=match_threshold,
+        cache_file=cache_file,
+        concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+        prefilter=prefilter,
+        prefilter_tolerance=prefilter_tolerance,
+        max_retries=max_retries,
+        bulk=bulk,
+        batch_job_file=batch_job_file,
+        poll_interval=poll_interval,
+        enrich_web=enrich_web,
+        page_cache_file=page_cache_file,
+        web_concurrency=web_concurrency,
+        web_deadline=web_deadline,
+        batcher=AdaptiveBatcher(
+            target_prompt_tokens=target_prompt_tokens,
+            max_output_tokens=max_output_tokens,
+            max_batch_size=max_batch_size,
+            target_latency=target_latency
+        )
+    )
+
     print(f"🔍 Validating {len(leads)} leads against ICP:")
     print(f"   {icp_summary}")
     if icp_criteria.get('description'):
@@ -138,171 +1356,64 @@ def validate_leads(input_file, icp_criteria, threshold=85, output_file="validati
         print(f"   Offer: {offer_name}")
     print(f"   Match threshold: {match_threshold}% (leads below this are filtered)")
     print(f"   Pass threshold: {threshold}% (minimum valid leads to pass)")
-    print(f"   Website enrichment: {'✅ Enabled' if enrich_web else '❌ Disabled'}")
+    print(f"   Website enrichment: {f'✅ Enabled ({web_concurrency} concurrent, {web_deadline}s deadline)' if enrich_web else '❌ Disabled'}")
+    print(f"   Concurrency: {concurrency} batches in parallel, max {requests_per_minute or 'unlimited'} requests/min")
+    print(f"   Batching: ~{target_prompt_tokens} prompt tokens/call, {max_output_tokens} max output tokens, up to {max_batch_size} companies/call")
+    print(f"   Result cache: {cache_file or '❌ Disabled'}")
+    print(f"   Firmographic pre-filter: {'✅ ' + json.dumps(validator.rules.describe()) if validator.rules else '❌ Disabled'}")
+    if sequential:
+        print(f"   Sequential gate: waves of {wave_size}, stop at {confidence:.0%} confidence")
+    if bulk:
+        print(f"   Bulk mode: Message Batches job (state in {batch_job_file}, polling every {poll_interval}s)")
     print()
 
-    # Initialize Claude
-    client = Anthropic(api_key=api_key)
-
-    # Validate leads in batches for speed
-    valid_count = 0
-    validation_details = []
-    batch_size = 20  # Validate 20 leads per API call (optimized for large batches)
-
-    # Process leads in batches
-    for batch_start in range(0, len(leads), batch_size):
-        batch_end = min(batch_start + batch_size, len(leads))
-        batch_leads = leads[batch_start:batch_end]
-
-        print(f"   📦 Processing batch {batch_start//batch_size + 1}/{(len(leads) + batch_size - 1)//batch_size} ({len(batch_leads)} leads)...")
-
-        # Build batch data for prompt
-        batch_data = []
-        for lead in batch_leads:
-            company_name = lead.get("company_name") or lead.get("name") or lead.get("companyName") or "Unknown"
-            company_desc = lead.get("company_description") or lead.get("description") or ""
-            website = lead.get("company_website") or lead.get("website") or lead.get("url") or ""
-            industry = lead.get("industry") or ""
-            location = lead.get("company_country") or lead.get("country") or ""
-            city = lead.get("company_city") or lead.get("city") or ""
-            state = lead.get("company_state") or lead.get("state") or ""
-            employees = lead.get("company_size") or lead.get("employees") or ""
-            revenue = lead.get("company_annual_revenue_clean") or lead.get("revenue") or ""
-            keywords = lead.get("keywords") or ""
-            job_title = lead.get("job_title") or lead.get("title") or lead.get("position") or ""
-
-            # Build location string
-            location_parts = [city, state, location]
-            full_location = ", ".join([p for p in location_parts if p])
-
-            batch_data.append({
-                "company_name": company_name,
-                "description": company_desc[:500] if company_desc else "N/A",
-                "industry": industry,
-                "keywords": keywords[:400] if keywords else "N/A",
-                "location": full_location,
-                "employees": employees,
-                "revenue": revenue,
-                "website": website,
-                "job_title": job_title if job_title else "N/A"
-            })
-
-        # Create batch validation prompt
-        offer_context = f"\n**OFFER/PRODUCT WE'RE SELLING**: {offer_name}\n" if offer_name else ""
-
-        # Build ICP description section
-        icp_description_context = ""
-        if icp_criteria.get('description'):
-            icp_description_context = f"\n**DETAILED ICP DESCRIPTION**:\n{icp_criteria['description']}\n"
-
-        # Build structured ICP criteria (exclude description and job_title as they're shown separately)
-        structured_criteria = {k: v for k, v in icp_criteria.items() if k not in ['description', 'job_title'] and v}
-        structured_icp = chr(10).join([f"- {k.title()}: {v}" for k, v in structured_criteria.items()]) if structured_criteria else ""
-
-        prompt = f"""You are an expert at analyzing if companies match an Ideal Customer Profile (ICP).
-
-TARGET ICP:
-{structured_icp}
-{icp_description_context}{offer_context}
-
-TASK: Analyze each company below and provide ICP match percentages.
-
-ANALYSIS CRITERIA:
-1. **Industry/Niche Match** (30%): Does the company description, keywords, and industry show they're in our target niche?
-2. **Firmographic Match** (30%): Do location, employee count, and revenue fit our ICP ranges?
-3. **Job Title Match** (20%): {f"Does the contact's job title match our target roles: {icp_criteria['job_title']}?" if icp_criteria.get('job_title') else "Is this a decision-maker or relevant contact?"}
-4. **ICP Description Fit** (10%): {f"Does the company match the detailed ICP description provided above?" if icp_criteria.get('description') else "Does the overall profile make sense?"}
-5. **Solution Fit** (10%): Based on what they do, would our offer be relevant?
-
-COMPANIES TO ANALYZE:
-{json.dumps(batch_data, indent=2)}
-
-RESPONSE FORMAT - Return ONLY a JSON array with this exact structure:
-[
-  {{"company_name": "Company Name", "percentage": 85, "reason": "Brief reason"}},
-  {{"company_name": "Company Name 2", "percentage": 70, "reason": "Brief reason"}}
-]
-
-CRITICAL: Return ONLY the JSON array, no other text. One entry per company in the same order."""
-
-        try:
-            # Call Claude API for batch validation
-            message = client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=3000,  # Increased for larger batches (20 leads)
-                messages=[{"role": "user", "content": prompt}]
+    sequential_summary = None
+    started = time.monotonic()
+    try:
+        if sequential:
+            spent, lead_results, sequential_summary = run_sequential_gate(
+                validator, leads, threshold, confidence=confidence, wave_size=wave_size
             )
-
-            response_text = message.content[0].text.strip()
-
-            # Extract JSON from response
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-
-            # Parse batch results
-            batch_results = json.loads(response_text)
-
-            # Process each result
-            for idx, result in enumerate(batch_results):
-                if idx >= len(batch_leads):
-                    break
-
-                lead = batch_leads[idx]
-                company_name = lead.get("company_name") or lead.get("name") or lead.get("companyName") or "Unknown"
-
-                match_percentage = result.get("percentage", 0)
-                reason = result.get("reason", "No reason provided")
-
-                is_valid = match_percentage >= match_threshold
-                if is_valid:
-                    valid_count += 1
-
-                # Extract firmographics for report
-                industry = lead.get("industry") or ""
-                location = lead.get("company_country") or lead.get("country") or ""
-                city = lead.get("company_city") or lead.get("city") or ""
-                state = lead.get("company_state") or lead.get("state") or ""
-                employees = lead.get("company_size") or lead.get("employees") or ""
-                revenue = lead.get("company_annual_revenue_clean") or lead.get("revenue") or ""
-                location_parts = [city, state, location]
-                full_location = ", ".join([p for p in location_parts if p])
-
-                validation_details.append({
-                    "company": company_name,
-                    "valid": is_valid,
-                    "match_percentage": match_percentage,
-                    "reason": reason,
-                    "firmographics": {
-                        "industry": industry,
-                        "location": full_location,
-                        "employees": employees,
-                        "revenue": revenue
-                    },
-                    "data": lead
-                })
-
-                status_icon = "✅" if is_valid else "❌"
-                print(f"   {status_icon} {company_name} ({match_percentage}%): {reason[:60]}...")
-
-        except Exception as e:
-            print(f"   ⚠️  Batch validation error: {str(e)}")
-            # Fall back to marking all as invalid in this batch
-            for lead in batch_leads:
-                company_name = lead.get("company_name") or lead.get("name") or lead.get("companyName") or "Unknown"
-                validation_details.append({
-                    "company": company_name,
-                    "valid": False,
-                    "match_percentage": 0,
-                    "reason": f"Batch validation error: {str(e)[:100]}",
-                    "firmographics": {},
-                    "data": lead
-                })
-
-    # Calculate quality percentage
-    quality_percentage = (valid_count / len(leads)) * 100
-    passed = quality_percentage >= threshold
+            # Report spent leads in their original order
+            spent_order = sorted(range(len(spent)), key=lambda i: spent[i])
+            leads = [leads[spent[i]] for i in spent_order]
+            lead_results = [lead_results[i] for i in spent_order]
+        else:
+            lead_results = validator.score(leads)
+    except RuntimeError as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        validator.close()
+    wall_clock = time.monotonic() - started
+
+    if validator.prefilter_reasons:
+        print(f"   🚫 Pre-filter rejected {sum(validator.prefilter_reasons.values())} leads {validator.prefilter_reasons}")
+
+    # Assemble details in original lead order
+    validation_details = [build_validation_detail(lead, result, match_threshold) for lead, result in zip(leads, lead_results)]
+    valid_count = sum(1 for detail in validation_details if detail["valid"])
+    unscored_count = sum(1 for detail in validation_details if detail.get("validation_error"))
+
+    stats = validator.stats
+    bulk_savings = (1 - BATCH_API_DISCOUNT) * estimate_cost(stats["bulk_input_tokens"], stats["bulk_output_tokens"])
+    estimated_cost = estimate_cost(stats["input_tokens"], stats["output_tokens"]) - bulk_savings
+    contacts_to_score = sum(validator.company_contacts.values())
+    unique_companies = len(validator.company_contacts)
+
+    # Sequential time is what the same calls would have cost back-to-back
+    sequential_seconds = sum(stats["latencies"])
+    speedup = sequential_seconds / wall_clock if wall_clock > 0 and stats["latencies"] else 1.0
+
+    # Calculate quality percentage over leads that actually got a score
+    scored_count = len(leads) - unscored_count
+    quality_percentage = (valid_count / scored_count) * 100 if scored_count else 0
+    if sequential_summary and sequential_summary["decision"] != "exhausted":
+        passed = sequential_summary["decision"] == "pass"
+    else:
+        passed = scored_count > 0 and quality_percentage >= threshold
 
     result = {
         "status": "success",
@@ -311,22 +1422,104 @@ CRITICAL: Return ONLY the JSON array, no other text. One entry per company in th
         "threshold": threshold,
         "valid_count": valid_count,
         "total_count": len(leads),
+        "unscored_count": unscored_count,
         "icp_criteria": icp_criteria,
+        "cache": {
+            "enabled": bool(cache_file),
+            "file": cache_file,
+            "hits": validator.cache_hits,
+            "misses": validator.cache_misses
+        },
+        "company_dedup": {
+            "leads_scored": contacts_to_score,
+            "unique_companies": unique_companies,
+            "contacts_per_company": round(contacts_to_score / unique_companies, 2) if unique_companies else 0
+        },
+        "prefilter": {
+            "enabled": bool(validator.rules),
+            "rules": validator.rules.describe() if validator.rules else None,
+            "rejected": sum(validator.prefilter_reasons.values()),
+            "reasons": validator.prefilter_reasons
+        },
+        "api_usage": {
+            "calls": stats["calls"],
+            "retry_calls": stats["retry_calls"],
+            "retried_companies": stats["retried_entries"],
+            "input_tokens": stats["input_tokens"],
+            "output_tokens": stats["output_tokens"],
+            "estimated_cost_usd": round(estimated_cost, 4),
+            "retry_cost_usd": round(estimate_cost(stats["retry_input_tokens"], stats["retry_output_tokens"]), 4)
+        },
+        "web_enrichment": {
+            "enabled": enrich_web,
+            "page_cache": page_cache_file if enrich_web else None,
+            **validator.web_stats
+        },
+        "bulk": {
+            "enabled": bulk,
+            "jobs": stats["bulk_jobs"],
+            "requests": stats["bulk_requests"],
+            "input_tokens": stats["bulk_input_tokens"],
+            "output_tokens": stats["bulk_output_tokens"],
+            "discount_savings_usd": round(bulk_savings, 4)
+        },
+        "batching": {
+            "batches": stats["calls"],
+            "avg_companies_per_batch": round(validator.batcher.stats["entries"] / validator.batcher.stats["batches"], 1) if validator.batcher.stats["batches"] else 0,
+            "tokens_per_lead": round((stats["input_tokens"] + stats["output_tokens"]) / contacts_to_score, 1) if contacts_to_score else 0,
+            "tokens_per_company": round((stats["input_tokens"] + stats["output_tokens"]) / unique_companies, 1) if unique_companies else 0,
+            "completion_tokens_per_company": round(validator.batcher.completion_per_entry, 1),
+            "final_batch_size_cap": validator.batcher.size_cap,
+            "truncations": validator.batcher.stats["truncations"],
+            "shrinks": validator.batcher.stats["shrinks"],
+            "grows": validator.batcher.stats["grows"]
+        },
+        "performance": {
+            "batches": stats["calls"],
+            "concurrency": concurrency,
+            "requests_per_minute": requests_per_minute,
+            "wall_clock_seconds": round(wall_clock, 2),
+            "sequential_seconds": round(sequential_seconds, 2),
+            "speedup": round(speedup, 2)
+        },
         "validation_details": validation_details
     }
+    if sequential_summary:
+        result["sequential"] = sequential_summary
 
     # Save report
     os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(result, f, indent=2, ensure_ascii=False)
 
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            store.record_validation(validation_details)
+        finally:
+            store.close()
+
     # Print summary
     print("\n" + "="*50)
     print(f"📊 Validation Results:")
-    print(f"   Valid leads: {valid_count}/{len(leads)} ({quality_percentage:.1f}%)")
+    print(f"   Valid leads: {valid_count}/{scored_count} scored ({quality_percentage:.1f}%)")
+    if unscored_count:
+        print(f"   ⚠️  Unscored after retries: {unscored_count} (excluded from quality %)")
     print(f"   Threshold: {threshold}%")
     print(f"   Status: {'✅ PASSED' if passed else '❌ FAILED'}")
+    if sequential_summary:
+        print(f"   Sequential decision: {sequential_summary['decision'].upper()} after {sequential_summary['leads_spent']}/{sequential_summary['leads_available']} leads ({sequential_summary['waves']} waves, {confidence:.0%} confidence)")
+    print(f"   Pre-filtered locally: {sum(validator.prefilter_reasons.values())}/{len(leads)}")
+    print(f"   Companies scored: {unique_companies} for {contacts_to_score} leads (cache hits: {validator.cache_hits})")
+    print(f"   Claude calls: {stats['calls']} ({stats['retry_calls']} retries for {stats['retried_entries']} companies), est. cost ${estimated_cost:.4f}")
+    if bulk:
+        print(f"   Batch jobs: {stats['bulk_jobs']} ({stats['bulk_requests']} prompts, saved ${bulk_savings:.4f} vs interactive)")
+    if contacts_to_score:
+        print(f"   Tokens per lead: {(stats['input_tokens'] + stats['output_tokens']) / contacts_to_score:.0f} over {stats['calls']} batches")
+    print(f"   Wall clock: {wall_clock:.1f}s (sequential estimate {sequential_seconds:.1f}s, {speedup:.1f}x speedup)")
     print(f"   Report saved to: {output_file}")
+    if store_file:
+        print(f"   Verdicts recorded in lead store: {store_file}")
 
     if not passed:
         print(f"\n💡 Suggestions:")
@@ -361,6 +1554,40 @@ def main():
 
     parser.add_argument("--output", default=".tmp/validation_report.json", help="Output file path")
     parser.add_argument("--enrich-web", action="store_true", help="Fetch company websites for enrichment (slower but more accurate)")
+    parser.add_argument("--web-concurrency", type=int, default=10, help="Concurrent website fetches for --enrich-web (default: 10)")
+    parser.add_argument("--web-deadline", type=float, default=60, help="Max seconds website fetching may add to the run (default: 60)")
+    parser.add_argument("--page-cache", default=DEFAULT_PAGE_CACHE_FILE, help=f"Website page cache for --enrich-web (default: {DEFAULT_PAGE_CACHE_FILE})")
+    parser.add_argument("--no-page-cache", action="store_true", help="Always re-fetch websites")
+    parser.add_argument("--store", help="Also record results in this SQLite lead store (e.g. .tmp/leads.sqlite)")
+
+    # Concurrency
+    parser.add_argument("--concurrency", type=int, default=5, help="Number of batches validated in parallel (default: 5)")
+    parser.add_argument("--rpm", type=int, default=50, help="Max Claude API requests per minute, 0 for unlimited (default: 50)")
+
+    # Result cache
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help=f"SQLite validation cache file (default: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-validate with Claude, ignoring and not updating the cache")
+
+    # Firmographic pre-filter
+    parser.add_argument("--no-prefilter", action="store_true", help="Send every lead to Claude, even plain location/size/revenue mismatches")
+    parser.add_argument("--max-retries", type=int, default=2, help="Retry rounds for leads missing from a Claude response (default: 2)")
+    parser.add_argument("--prefilter-tolerance", type=float, default=0.5, help="Widen ICP size/revenue ranges by this fraction before rejecting locally (default: 0.5)")
+
+    # Token-budget batching
+    parser.add_argument("--target-prompt-tokens", type=int, default=6000, help="Estimated prompt tokens packed into each Claude call (default: 6000)")
+    parser.add_argument("--max-output-tokens", type=int, default=3000, help="Response token budget per Claude call (default: 3000)")
+    parser.add_argument("--max-batch-size", type=int, default=40, help="Max companies per Claude call when batches grow (default: 40)")
+    parser.add_argument("--target-latency", type=float, default=20.0, help="Seconds per call above which batches shrink (default: 20)")
+
+    # Sequential test gate
+    parser.add_argument("--sequential", action="store_true", help="Test gate mode: validate in waves and stop as soon as pass/fail is statistically settled")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence required for a sequential early decision (default: 0.95)")
+    parser.add_argument("--wave-size", type=int, default=5, help="Leads validated per wave in --sequential mode (default: 5)")
+
+    # Message Batches bulk mode
+    parser.add_argument("--bulk", action="store_true", help="Submit all prompts as one Message Batches job (cheaper, for large full-batch runs)")
+    parser.add_argument("--batch-job-file", default=DEFAULT_BATCH_JOB_FILE, help=f"Saved batch job state for crash resume (default: {DEFAULT_BATCH_JOB_FILE})")
+    parser.add_argument("--poll-interval", type=float, default=30, help="Seconds between batch job status checks (default: 30)")
 
     args = parser.parse_args()
 
@@ -393,7 +1620,27 @@ def main():
         output_file=args.output,
         enrich_web=args.enrich_web,
         offer_name=args.offer,
-        match_threshold=args.match_threshold
+        match_threshold=args.match_threshold,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        cache_file=None if args.no_cache else args.cache,
+        prefilter=not args.no_prefilter,
+        prefilter_tolerance=args.prefilter_tolerance,
+        max_retries=args.max_retries,
+        sequential=args.sequential,
+        confidence=args.confidence,
+        wave_size=args.wave_size,
+        target_prompt_tokens=args.target_prompt_tokens,
+        max_output_tokens=args.max_output_tokens,
+        max_batch_size=args.max_batch_size,
+        target_latency=args.target_latency,
+        bulk=args.bulk,
+        batch_job_file=args.batch_job_file,
+        poll_interval=args.poll_interval,
+        page_cache_file=None if args.no_page_cache else args.page_cache,
+        web_concurrency=args.web_concurrency,
+        web_deadline=args.web_deadline,
+        store_file=args.store
     )
 
     # Print result as JSON
@@ -0,0 +1,149 @@
+"""
+On-disk SQLite cache for Claude ICP validation results.
+
+Results are keyed by a stable fingerprint of the prompt-relevant lead fields plus a
+hash of the ICP criteria, offer and prompt version. The match threshold is NOT part
+of the key: the cache stores raw match percentages, so re-running with a different
+--match-threshold re-classifies leads without any API calls.
+
+Usage (from validate_lead_quality.py):
+    cache = ValidationCache(".tmp/validation_cache.sqlite")
+    icp_key = icp_fingerprint(icp_criteria, offer_name, model, prompt_version)
+    hits = cache.get_many(icp_key, [lead_fingerprint(p) for p in payloads])
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+def stable_hash(value):
+    """
+    Hash any JSON-serialisable value independently of dict key order.
+
+    Args:
+        value: JSON-serialisable value
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def lead_fingerprint(payload):
+    """
+    Fingerprint the prompt entry built for a lead.
+
+    Args:
+        payload (dict): Prompt-relevant lead fields (as sent to Claude)
+
+    Returns:
+        str: Lead fingerprint
+    """
+    return stable_hash(payload)
+
+
+def icp_fingerprint(icp_criteria, offer_name, model, prompt_version):
+    """
+    Fingerprint everything outside the lead that changes how Claude scores it.
+
+    Args:
+        icp_criteria (dict): ICP criteria
+        offer_name (str): Offer/product being sold
+        model (str): Claude model name
+        prompt_version (int): Version of the validation prompt
+
+    Returns:
+        str: ICP fingerprint
+    """
+    return stable_hash({
+        "icp_criteria": icp_criteria or {},
+        "offer_name": offer_name or "",
+        "model": model,
+        "prompt_version": prompt_version
+    })
+
+
+class ValidationCache:
+    """
+    Thread-safe SQLite store of (icp_hash, lead_fingerprint) -> match percentage + reason.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS validation_results (
+                icp_hash TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                percentage REAL NOT NULL,
+                reason TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (icp_hash, fingerprint)
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, icp_hash, fingerprints):
+        """
+        Look up cached results for a list of lead fingerprints.
+
+        Args:
+            icp_hash (str): ICP fingerprint
+            fingerprints (list): Lead fingerprints
+
+        Returns:
+            dict: fingerprint -> {"percentage", "reason"} for every cache hit
+        """
+        hits = {}
+        unique = list(dict.fromkeys(fingerprints))
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT fingerprint, percentage, reason FROM validation_results "
+                    f"WHERE icp_hash = ? AND fingerprint IN ({placeholders})",
+                    [icp_hash, *chunk]
+                ).fetchall()
+                for fingerprint, percentage, reason in rows:
+                    hits[fingerprint] = {
+                        "percentage": int(percentage) if float(percentage).is_integer() else percentage,
+                        "reason": reason
+                    }
+
+        return hits
+
+    def put_many(self, icp_hash, entries):
+        """
+        Store freshly scored results.
+
+        Args:
+            icp_hash (str): ICP fingerprint
+            entries (list): (fingerprint, percentage, reason) tuples
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO validation_results (icp_hash, fingerprint, percentage, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(icp_hash, fingerprint, percentage, reason, now) for fingerprint, percentage, reason in entries]
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,9 @@
 """
 Verify email addresses using AnyMailFinder API.
 
-This script reads leads from a JSON file, verifies their email addresses,
-and outputs only leads with valid/verified emails.
+This script streams leads from a JSON/NDJSON file, verifies their email addresses
+(with a bounded number of requests in flight), and writes only leads with
+valid/verified emails as each verification completes.
 
 Usage:
     python verify_emails.py --input .tmp/full_leads_normalized.json --output .tmp/full_leads_verified.json --report .tmp/verification_report.json
@@ -19,7 +20,10 @@ import requests
 import time
 import re
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from lead_io import iter_leads, LeadWriter, LeadFileError
+from lead_store import LeadStore
+from yield_planner import record_stage_yield
 
 # Set UTF-8 encoding for Windows console
 if sys.platform == 'win32':
@@ -153,7 +157,7 @@ def verify_email(email, api_key, max_retries=3, session=None):
     }
 
 
-def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_size=5):
+def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_size=5, store_file=None, leads=None):
     """
     Verify all email addresses in a leads file.
 
@@ -163,6 +167,9 @@ def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_s
         report_file (str): Path to verification report JSON file
         keep_risky (bool): Whether to keep leads with "risky" email status
         batch_size (int): Number of concurrent verification requests
+        store_file (str, optional): SQLite lead store to record each lead's verification in
+        leads (list, optional): Leads already in memory (run_pipeline.py), used instead of
+            reading input_file; the kept leads are then returned in result["leads"]
 
     Returns:
         dict: Verification summary with statistics
@@ -175,129 +182,138 @@ def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_s
             "message": "ANYMAILFINDER_API_KEY not found in .env file"
         }
 
-    # Load leads
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            leads = json.load(f)
-    except FileNotFoundError:
+    if leads is None and not os.path.exists(input_file):
         return {
             "status": "error",
             "message": f"Input file not found: {input_file}"
         }
-    except json.JSONDecodeError:
-        return {
-            "status": "error",
-            "message": f"Invalid JSON in file: {input_file}"
-        }
-
-    if not leads:
-        return {
-            "status": "error",
-            "message": "No leads found in input file"
-        }
 
-    print(f"🔍 Verifying emails for {len(leads)} leads...")
+    print(f"🔍 Verifying emails for leads in {input_file}...")
     print(f"   Batch size: {batch_size} concurrent requests")
     print(f"   Keep risky emails: {'✅ Yes' if keep_risky else '❌ No'}")
     print()
 
     # Verify emails in parallel
-    verified_leads = []
     verification_details = []
     stats = {
-        "total": len(leads),
+        "total": 0,
         "valid": 0,
         "risky": 0,
         "invalid": 0,
         "error": 0,
         "no_email": 0
     }
+    completed = 0
+
+    def record_result(future, lead, writer):
+        nonlocal completed
+        completed += 1
+        result = future.result()
+
+        status = result["status"]
+        email = result["email"]
+
+        # Update stats
+        if status in stats:
+            stats[status] += 1
+        else:
+            stats["error"] += 1
+
+        # Determine if lead should be kept
+        keep_lead = False
+        if status == "valid":
+            keep_lead = True
+            icon = "✅"
+        elif status == "risky" and keep_risky:
+            keep_lead = True
+            icon = "⚠️"
+        elif status == "risky":
+            icon = "⚠️"
+        elif status == "invalid":
+            icon = "❌"
+        else:
+            icon = "⚠️"
+
+        # Write to verified leads if keeping
+        if keep_lead:
+            writer.write(lead)
+
+        # Store verification details
+        verification_details.append({
+            **result,
+            "kept": keep_lead,
+            "lead": lead
+        })
+
+        print(f"   {icon} [{completed}] {email}: {result['reason']}")
 
     # Create session for connection pooling
     session = requests.Session()
 
-    # Use ThreadPoolExecutor for parallel verification
-    with ThreadPoolExecutor(max_workers=batch_size) as executor:
-        # Submit all verification tasks
-        future_to_lead = {}
-        for lead in leads:
-            email = lead.get("email") or lead.get("personal_email") or ""
-            if not email:
-                stats["no_email"] += 1
-                verification_details.append({
-                    "email": None,
-                    "status": "no_email",
-                    "reason": "No email in lead data",
-                    "lead": lead
-                })
-                continue
-
-            # Pre-filter: check email format before API call
-            if not is_valid_email_format(email):
-                stats["invalid"] += 1
-                verification_details.append({
-                    "email": email,
-                    "status": "invalid",
-                    "reason": "Invalid email format (pre-filtered)",
-                    "kept": False,
-                    "lead": lead
-                })
-                print(f"   ❌ [pre-filter] {email}: Invalid format (skipped API call)")
-                continue
-
-            future = executor.submit(verify_email, email, api_key, session=session)
-            future_to_lead[future] = lead
-
-        # Process results as they complete
-        for i, future in enumerate(as_completed(future_to_lead), 1):
-            lead = future_to_lead[future]
-            result = future.result()
-
-            status = result["status"]
-            email = result["email"]
-
-            # Update stats
-            if status in stats:
-                stats[status] += 1
-            else:
-                stats["error"] += 1
-
-            # Determine if lead should be kept
-            keep_lead = False
-            if status == "valid":
-                keep_lead = True
-                icon = "✅"
-            elif status == "risky" and keep_risky:
-                keep_lead = True
-                icon = "⚠️"
-            elif status == "risky":
-                icon = "⚠️"
-            elif status == "invalid":
-                icon = "❌"
-            else:
-                icon = "⚠️"
-
-            # Add to verified leads if keeping
-            if keep_lead:
-                verified_leads.append(lead)
-
-            # Store verification details
-            verification_details.append({
-                **result,
-                "kept": keep_lead,
-                "lead": lead
-            })
-
-            print(f"   {icon} [{i}/{len(future_to_lead)}] {email}: {result['reason']}")
+    # Use ThreadPoolExecutor for parallel verification, keeping only a few batches of
+    # leads in flight so the input is streamed rather than loaded whole
+    max_in_flight = batch_size * 4
+    try:
+        with LeadWriter(output_file, keep=leads is not None) as writer, ThreadPoolExecutor(max_workers=batch_size) as executor:
+            pending = {}
+            for lead in (leads if leads is not None else iter_leads(input_file)):
+                stats["total"] += 1
+                email = lead.get("email") or lead.get("personal_email") or ""
+                if not email:
+                    stats["no_email"] += 1
+                    verification_details.append({
+                        "email": None,
+                        "status": "no_email",
+                        "reason": "No email in lead data",
+                        "lead": lead
+                    })
+                    continue
+
+                # Pre-filter: check email format before API call
+                if not is_valid_email_format(email):
+                    stats["invalid"] += 1
+                    completed += 1
+                    verification_details.append({
+                        "email": email,
+                        "status": "invalid",
+                        "reason": "Invalid email format (pre-filtered)",
+                        "kept": False,
+                        "lead": lead
+                    })
+                    print(f"   ❌ [pre-filter] {email}: Invalid format (skipped API call)")
+                    continue
+
+                pending[executor.submit(verify_email, email, api_key, session=session)] = lead
+
+                # Process results as they complete once the window is full
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record_result(future, pending.pop(future), writer)
+
+            for future in wait(pending).done:
+                record_result(future, pending.pop(future), writer)
+    except LeadFileError:
+        return {
+            "status": "error",
+            "message": f"Invalid JSON in file: {input_file}"
+        }
+    finally:
+        # Close session
+        session.close()
 
-    # Close session
-    session.close()
+    if not stats["total"]:
+        os.remove(output_file)
+        return {
+            "status": "error",
+            "message": "No leads found in input file"
+        }
 
     # Calculate percentages
     total_verified = stats["valid"] + stats["risky"] + stats["invalid"]
     valid_percentage = (stats["valid"] / total_verified * 100) if total_verified > 0 else 0
-    kept_count = len(verified_leads)
-    kept_percentage = (kept_count / len(leads) * 100) if len(leads) > 0 else 0
+    kept_count = writer.count
+    kept_percentage = (kept_count / stats["total"] * 100) if stats["total"] > 0 else 0
 
     # Create report
     report = {
@@ -305,7 +321,7 @@ def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_s
         "statistics": {
             **stats,
             "kept": kept_count,
-            "removed": len(leads) - kept_count,
+            "removed": stats["total"] - kept_count,
             "valid_percentage": round(valid_percentage, 1),
             "kept_percentage": round(kept_percentage, 1)
         },
@@ -316,16 +332,21 @@ def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_s
         "verification_details": verification_details
     }
 
-    # Save verified leads
-    os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".tmp", exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(verified_leads, f, indent=2, ensure_ascii=False)
-
     # Save report
     os.makedirs(os.path.dirname(report_file) if os.path.dirname(report_file) else ".tmp", exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
 
+    # Feed the full-scrape planner's keep-rate history (yield_planner.py)
+    record_stage_yield("verification", stats["total"], kept_count)
+
+    if store_file:
+        store = LeadStore(store_file)
+        try:
+            store.record_verification(verification_details)
+        finally:
+            store.close()
+
     # Print summary
     print("\n" + "="*60)
     print(f"📊 Email Verification Summary:")
@@ -336,9 +357,14 @@ def verify_leads(input_file, output_file, report_file, keep_risky=False, batch_s
     print(f"   ⚠️  Errors: {stats['error']}")
     print(f"   ⚠️  No email: {stats['no_email']}")
     print(f"\n   Leads kept: {kept_count} ({kept_percentage:.1f}%)")
-    print(f"   Leads removed: {len(leads) - kept_count}")
+    print(f"   Leads removed: {stats['total'] - kept_count}")
     print(f"\n   Verified leads saved to: {output_file}")
     print(f"   Report saved to: {report_file}")
+    if store_file:
+        print(f"   Results recorded in lead store: {store_file}")
+
+    if writer.leads is not None:
+        report["leads"] = writer.leads
 
     return report
 
@@ -350,6 +376,7 @@ def main():
     parser.add_argument("--report", default=".tmp/verification_report.json", help="Verification report output file")
     parser.add_argument("--keep-risky", action="store_true", help="Keep leads with 'risky' email status (default: remove)")
     parser.add_argument("--batch-size", type=int, default=10, help="Number of concurrent verification requests (default: 10)")
+    parser.add_argument("--store", help="Also record results in this SQLite lead store (e.g. .tmp/leads.sqlite)")
 
     args = parser.parse_args()
 
@@ -358,7 +385,8 @@ def main():
         output_file=args.output,
         report_file=args.report,
         keep_risky=args.keep_risky,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        store_file=args.store
     )
 
     # Print result as JSON
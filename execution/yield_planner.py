@@ -0,0 +1,266 @@
+"""
+Yield-aware fetch planning for the full scrape.
+
+Every full scrape loses leads downstream: some fail ICP validation (filtered out) and
+some fail email verification. This plans how many leads to scrape so that at least
+N survive to upload with a target probability, instead of scraping exactly N and
+running a second round.
+
+- Validation pass rate: from the test-batch validation report (valid / scored leads)
+- Verification keep rate: from the history verify_emails.py appends to
+  .tmp/yield_history.jsonl (pooled over the most recent runs)
+
+Both rates are uncertain (a 25-lead test batch says little), so each is modelled as
+a Beta posterior and the survival probability for a candidate fetch count is
+averaged over draws from them.
+
+Usage:
+    python yield_planner.py --target 500 --validation-report .tmp/validation_report.json --probability 0.9
+
+    # From scrape_leads_direct_api.py (--limit becomes the number of uploadable leads wanted):
+    python scrape_leads_direct_api.py --query "HVAC" --limit 500 --plan-yield --output .tmp/full_leads.json
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import argparse
+from datetime import datetime
+from statistics import NormalDist
+
+# Set UTF-8 encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_VALIDATION_REPORT = ".tmp/validation_report.json"
+DEFAULT_HISTORY_FILE = ".tmp/yield_history.jsonl"
+
+# Prior used when there is no verification history yet (~60% kept, weak: worth 10 leads)
+DEFAULT_VERIFICATION_PRIOR = (6, 4)
+
+# Posterior draws used to average over rate uncertainty (fixed seed: plans are reproducible)
+RATE_DRAWS = 2000
+
+
+def record_stage_yield(stage, total, kept, history_file=DEFAULT_HISTORY_FILE):
+    """
+    Append one stage's yield to the history used for planning.
+
+    Args:
+        stage (str): Pipeline stage (e.g. "verification")
+        total (int): Leads that entered the stage
+        kept (int): Leads that survived it
+        history_file (str): JSONL history path
+    """
+    if not total:
+        return
+    os.makedirs(os.path.dirname(history_file) if os.path.dirname(history_file) else ".tmp", exist_ok=True)
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({"stage": stage, "total": total, "kept": kept, "recorded_at": datetime.now().isoformat()}) + "\n")
+
+
+def load_stage_counts(stage, history_file=DEFAULT_HISTORY_FILE, last_runs=10):
+    """
+    Pool a stage's (kept, total) counts over its most recent runs.
+
+    Args:
+        stage (str): Pipeline stage
+        history_file (str): JSONL history path
+        last_runs (int): Number of most recent runs to pool
+
+    Returns:
+        tuple: (kept, total, runs) - all zero if there is no history
+    """
+    if not os.path.exists(history_file):
+        return 0, 0, 0
+
+    entries = []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("stage") == stage:
+                entries.append(entry)
+
+    entries = entries[-last_runs:]
+    return sum(e["kept"] for e in entries), sum(e["total"] for e in entries), len(entries)
+
+
+def load_validation_counts(report_file=DEFAULT_VALIDATION_REPORT):
+    """
+    Read (valid, scored) lead counts from a validation report.
+
+    Args:
+        report_file (str): Validation report from validate_lead_quality.py
+
+    Returns:
+        tuple or None: (valid, scored), or None if the report is missing or unusable
+    """
+    try:
+        with open(report_file, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    scored = report.get("total_count", 0) - report.get("unscored_count", 0)
+    if report.get("status") != "success" or scored <= 0:
+        return None
+    return report.get("valid_count", 0), scored
+
+
+def report_matches_icp(report_file, icp_criteria):
+    """
+    Whether a validation report was scored against the same ICP as this run.
+
+    Values are compared case- and whitespace-insensitively; empty ones are ignored.
+
+    Args:
+        report_file (str): Validation report from validate_lead_quality.py
+        icp_criteria (dict, optional): This run's ICP criteria (None never matches)
+
+    Returns:
+        bool: True if the report's icp_criteria are the same as icp_criteria
+    """
+    if not icp_criteria:
+        return False
+    try:
+        with open(report_file, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    def canonical(criteria):
+        return {key: " ".join(str(value).lower().split()) for key, value in (criteria or {}).items() if value}
+
+    return canonical(report.get("icp_criteria")) == canonical(icp_criteria)
+
+
+def survival_probability(fetch_count, target, rate_draws):
+    """
+    Probability that at least `target` of `fetch_count` scraped leads survive.
+
+    Args:
+        fetch_count (int): Leads scraped
+        target (int): Leads needed at the end
+        rate_draws (list): Sampled end-to-end survival rates
+
+    Returns:
+        float: Probability averaged over the rate draws
+    """
+    normal = NormalDist()
+    total = 0.0
+    for rate in rate_draws:
+        mean = fetch_count * rate
+        variance = fetch_count * rate * (1 - rate)
+        if variance <= 0:
+            total += 1.0 if mean >= target else 0.0
+            continue
+        # Normal approximation to the binomial tail, with continuity correction
+        total += 1 - normal.cdf((target - 0.5 - mean) / math.sqrt(variance))
+    return total / len(rate_draws)
+
+
+def plan_fetch_count(target, validation_counts=None, verification_counts=None, probability=0.9, max_multiplier=20):
+    """
+    Smallest fetch count that ends with `target` uploadable leads at the given probability.
+
+    Args:
+        target (int): Uploadable leads wanted
+        validation_counts (tuple, optional): (valid, scored) from the test batch, None to assume all pass
+        verification_counts (tuple, optional): (kept, total) verification history, None to use the prior
+        probability (float): Required probability of reaching the target
+        max_multiplier (int): Upper bound on fetch count as a multiple of target
+
+    Returns:
+        dict: Plan with fetch_count, rates and the achieved probability
+    """
+    rng = random.Random(0)
+
+    # Beta posteriors with a uniform prior (verification falls back to a weak prior)
+    valid, scored = validation_counts or (0, 0)
+    kept, verified = verification_counts or (0, 0)
+    validation_alpha, validation_beta = (valid + 1, scored - valid + 1) if validation_counts else (1e6, 1)
+    verification_alpha, verification_beta = (kept + 1, verified - kept + 1) if verified else DEFAULT_VERIFICATION_PRIOR
+
+    rate_draws = [
+        rng.betavariate(validation_alpha, validation_beta) * rng.betavariate(verification_alpha, verification_beta)
+        for _ in range(RATE_DRAWS)
+    ]
+    expected_rate = sum(rate_draws) / len(rate_draws)
+
+    # Survival probability grows with fetch count, so binary search the smallest that's enough
+    low, high = target, max(target, target * max_multiplier)
+    if survival_probability(high, target, rate_draws) < probability:
+        fetch_count = high
+    else:
+        while low < high:
+            mid = (low + high) // 2
+            if survival_probability(mid, target, rate_draws) >= probability:
+                high = mid
+            else:
+                low = mid + 1
+        fetch_count = low
+
+    return {
+        "target": target,
+        "fetch_count": fetch_count,
+        "probability": probability,
+        "achieved_probability": round(survival_probability(fetch_count, target, rate_draws), 3),
+        "expected_survivors": round(fetch_count * expected_rate),
+        "expected_survival_rate": round(expected_rate, 3),
+        "validation_rate": round(validation_alpha / (validation_alpha + validation_beta), 3),
+        "validation_sample": scored,
+        "verification_rate": round(verification_alpha / (verification_alpha + verification_beta), 3),
+        "verification_sample": verified,
+        "capped": fetch_count == target * max_multiplier
+    }
+
+
+def plan_from_files(target, validation_report=DEFAULT_VALIDATION_REPORT, history_file=DEFAULT_HISTORY_FILE, probability=0.9):
+    """
+    Plan a fetch count from the test validation report and the verification history.
+
+    Args:
+        target (int): Uploadable leads wanted
+        validation_report (str): Test-batch validation report
+        history_file (str): Stage yield history
+        probability (float): Required probability of reaching the target
+
+    Returns:
+        dict: Plan from plan_fetch_count() plus the sources used
+    """
+    validation_counts = load_validation_counts(validation_report)
+    kept, total, runs = load_stage_counts("verification", history_file)
+
+    plan = plan_fetch_count(target, validation_counts, (kept, total) if total else None, probability)
+    plan["validation_report"] = validation_report if validation_counts else None
+    plan["verification_runs"] = runs
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan the full-scrape fetch count from expected downstream yield")
+    parser.add_argument("--target", type=int, required=True, help="Uploadable leads wanted")
+    parser.add_argument("--validation-report", default=DEFAULT_VALIDATION_REPORT, help=f"Test-batch validation report (default: {DEFAULT_VALIDATION_REPORT})")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_FILE, help=f"Stage yield history (default: {DEFAULT_HISTORY_FILE})")
+    parser.add_argument("--probability", type=float, default=0.9, help="Required probability of reaching the target (default: 0.9)")
+
+    args = parser.parse_args()
+
+    plan = plan_from_files(args.target, args.validation_report, args.history, args.probability)
+
+    print(f"📐 Fetch plan for {plan['target']} uploadable leads ({plan['probability']:.0%} confidence):")
+    print(f"   Validation pass rate: {plan['validation_rate']:.0%} (from {plan['validation_sample']} test leads)")
+    print(f"   Verification keep rate: {plan['verification_rate']:.0%} (from {plan['verification_sample']} leads over {plan['verification_runs']} runs)")
+    print(f"   Fetch count: {plan['fetch_count']} (expected survivors {plan['expected_survivors']}, P(≥ target) = {plan['achieved_probability']:.0%})")
+
+    print("\n" + "="*50)
+    print(json.dumps(plan, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from icp_prefilter import parse_range
+
+
+def test_parse_range_between_and():
+    assert parse_range("Between 10 and 50") == (10.0, 50.0)
+    assert parse_range("between $1M and $10M") == (1_000_000.0, 10_000_000.0)
+    assert parse_range("from 10 to 50") == (10.0, 50.0)
+
+
+def test_parse_range_existing_forms():
+    assert parse_range("10-50") == (10.0, 50.0)
+    assert parse_range("$1-10M") == (1_000_000.0, 10_000_000.0)
+    assert parse_range("500+") == (500.0, float("inf"))
+    assert parse_range("under 10") == (0.0, 10.0)
+    assert parse_range(25) == (25.0, 25.0)
@@ -0,0 +1,26 @@
+import pytest
+
+from lead_io import iter_leads, LeadFileError
+
+
+def test_decode_errors_raise_lead_file_error(tmp_path):
+    bad_ndjson = tmp_path / "bad.ndjson"
+    bad_ndjson.write_text('{"email": "a@x.com"}\n{"email": \n', encoding="utf-8")
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text('[{"email": "a@x.com"}, {"email": ', encoding="utf-8")
+    latin1 = tmp_path / "latin1.ndjson"
+    latin1.write_bytes('{"company_name": "Caf\xe9"}\n'.encode("latin-1"))
+
+    for path in (bad_ndjson, truncated, latin1):
+        with pytest.raises(LeadFileError):
+            list(iter_leads(str(path)))
+
+
+def test_processing_errors_are_not_reported_as_bad_files(tmp_path):
+    path = tmp_path / "leads.ndjson"
+    path.write_text('{"employees": "n/a"}\n', encoding="utf-8")
+
+    with pytest.raises(ValueError) as excinfo:
+        for lead in iter_leads(str(path)):
+            int(lead["employees"])
+    assert not isinstance(excinfo.value, LeadFileError)
@@ -0,0 +1,26 @@
+import pytest
+
+from link_discovery import link_score, rank_links
+
+
+@pytest.mark.parametrize("url, text, score", [
+    ("https://acme.co.uk/case-studies/school-refit", "", 10),
+    ("https://acme.co.uk/p/123", "Client Testimonials", 9),
+    ("https://acme.co.uk/reviews", "", 7),
+    ("https://acme.co.uk/our-clients", "", 6),
+    ("https://acme.co.uk/our-work/boiler-refit", "", 5),
+    ("https://acme.co.uk/work", "", 3),
+    ("https://acme.co.uk/network-installation", "", 0),
+    ("https://acme.co.uk/framework-agreements", "", 0),
+    ("https://acme.co.uk/preview", "", 0),
+    ("https://acme.co.uk/client-login", "", 0),
+    ("https://acme.co.uk/portal", "Client Login", 0),
+])
+def test_keywords_match_whole_words(url, text, score):
+    assert link_score(url, text) == score
+
+
+def test_rank_links_skips_lookalikes():
+    links = [("https://acme.co.uk/network", "Our network"), ("https://acme.co.uk/client-login", "Clients"),
+             ("https://acme.co.uk/projects", "Projects"), ("https://acme.co.uk/about", "About")]
+    assert rank_links(links) == [("https://acme.co.uk/projects", 6), ("https://acme.co.uk/about", 2)]
@@ -0,0 +1,108 @@
+from run_pipeline import run_streaming_stages, MIN_QUALITY_SAMPLE
+
+
+def test_streaming_filter_stops_once_pass_rate_is_below_min_quality(tmp_path):
+    leads = [{"email": f"lead{i}@example.com"} for i in range(10 * MIN_QUALITY_SAMPLE)]
+    details = [{"data": lead, "valid": i % 10 == 0, "reason": "Industry mismatch"} for i, lead in enumerate(leads)]
+    paths = {"filtered": str(tmp_path / "filtered.json"), "filter_report": str(tmp_path / "filter_report.json")}
+    fed = []
+
+    def source():
+        for lead in leads:
+            fed.append(lead)
+            yield lead
+
+    results = run_streaming_stages(["filter"], source(), paths, {}, validation_details=details,
+                                   queue_size=10, min_quality=50)
+
+    status, result = results["filter"]
+    assert status == "error"
+    assert "10.0% of the first 100 leads" in result["message"]
+    assert len(fed) < len(leads) // 2
+
+
+def test_streaming_failure_names_the_failing_stage_and_keeps_the_filter_report(tmp_path, monkeypatch):
+    import json
+    import run_pipeline
+
+    def broken_verify(email, api_key, session=None):
+        raise ConnectionError("AnyMailFinder unreachable")
+
+    monkeypatch.setenv("ANYMAILFINDER_API_KEY", "test-key")
+    monkeypatch.setattr(run_pipeline, "verify_email", broken_verify)
+    leads = [{"email": f"lead{i}@acme-hvac.co.uk"} for i in range(5)]
+    details = [{"data": lead, "valid": True} for lead in leads]
+    paths = {name: str(tmp_path / f"{name}.json")
+             for name in ("filtered", "filter_report", "verified", "verification_report")}
+
+    results = run_streaming_stages(["filter", "verify"], iter(leads), paths, {}, validation_details=details)
+
+    assert results["filter"][0] == "incomplete"
+    assert results["verify"][0] == "error"
+    assert "verify stage failed" in results["verify"][1]["message"]
+    assert json.loads((tmp_path / "filter_report.json").read_text())["failed_stage"] == "verify"
+
+
+def test_streaming_filter_checks_small_runs_before_verifying(tmp_path, monkeypatch):
+    import run_pipeline
+
+    verified = []
+
+    def fake_verify(email, api_key, session=None):
+        verified.append(email)
+        return {"email": email, "status": "valid"}
+
+    monkeypatch.setenv("ANYMAILFINDER_API_KEY", "test-key")
+    monkeypatch.setattr(run_pipeline, "verify_email", fake_verify)
+    leads = [{"email": f"lead{i}@acme-hvac.co.uk"} for i in range(30)]
+    details = [{"data": lead, "valid": i % 5 == 0, "reason": "Industry mismatch"} for i, lead in enumerate(leads)]
+    paths = {name: str(tmp_path / f"{name}.json")
+             for name in ("filtered", "filter_report", "verified", "verification_report")}
+
+    results = run_streaming_stages(["filter", "verify"], iter(leads), paths, {}, validation_details=details,
+                                   min_quality=50)
+
+    assert results["filter"][0] == "error"
+    assert "20.0% of the first 30 leads" in results["filter"][1]["message"]
+    assert verified == []
+
+
+def test_streaming_filter_releases_held_leads_when_quality_is_fine(tmp_path, monkeypatch):
+    import run_pipeline
+
+    monkeypatch.setenv("ANYMAILFINDER_API_KEY", "test-key")
+    monkeypatch.setattr(run_pipeline, "verify_email",
+                        lambda email, api_key, session=None: {"email": email, "status": "valid"})
+    leads = [{"email": f"lead{i}@acme-hvac.co.uk"} for i in range(30)]
+    details = [{"data": lead, "valid": i % 5 != 0, "reason": "Industry mismatch"} for i, lead in enumerate(leads)]
+    paths = {name: str(tmp_path / f"{name}.json")
+             for name in ("filtered", "filter_report", "verified", "verification_report")}
+
+    results = run_streaming_stages(["filter", "verify"], iter(leads), paths, {}, validation_details=details,
+                                   min_quality=50)
+
+    assert results["filter"][0] == "success"
+    assert results["verify"][1]["statistics"]["kept"] == 24
+
+
+def test_streaming_enrich_uses_the_page_cache(tmp_path, monkeypatch):
+    import run_pipeline
+
+    caches = []
+
+    def fake_enrich(lead, api_key, delay=0.5, page_cache=None):
+        caches.append(page_cache)
+        return {**lead, "personalization": "Refitted a school", "personalization_status": "success"}
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(run_pipeline, "enrich_lead", fake_enrich)
+    monkeypatch.setattr(run_pipeline, "DEFAULT_PAGE_CACHE_FILE", str(tmp_path / "pages.sqlite"))
+    leads = [{"email": "ceo@acme-hvac.co.uk", "website": "acme-hvac.co.uk"}]
+    paths = {"personalized": str(tmp_path / "personalized.json"),
+             "personalization_report": str(tmp_path / "personalization_report.json")}
+
+    results = run_streaming_stages(["enrich"], iter(leads), paths, {})
+
+    assert results["enrich"][0] == "success"
+    assert caches and caches[0] is not None
+    assert (tmp_path / "pages.sqlite").exists()
@@ -0,0 +1,99 @@
+import json
+
+from scrape_leads_direct_api import scrape_leads_direct
+
+
+def test_capped_yield_plan_is_refused_not_scraped(tmp_path, monkeypatch):
+    monkeypatch.setenv("APIFY_API_TOKEN", "test-token")
+    report = tmp_path / "validation_report.json"
+    report.write_text(json.dumps({"status": "success", "total_count": 25, "unscored_count": 0, "valid_count": 0,
+                                  "icp_criteria": {"industry": "HVAC", "location": "UK"}}))
+
+    # No plan_yield argument: a usable test report for this ICP turns the planner on by default
+    result = scrape_leads_direct("HVAC companies", limit=500, output_file=str(tmp_path / "leads.json"),
+                                 validation_report=str(report), yield_history=str(tmp_path / "history.jsonl"),
+                                 icp_criteria={"industry": "hvac", "location": " UK"})
+
+    assert result["status"] == "error"
+    assert result["yield_plan"]["capped"]
+    assert "--no-plan-yield" in result["message"]
+    assert not (tmp_path / "leads.json").exists()
+
+
+def test_delta_spreads_known_domains_over_chunked_requests(tmp_path, monkeypatch):
+    import scrape_leads_direct_api
+
+    pool = [{"email": f"ceo@company{i}.com", "company_domain": f"company{i}.com"} for i in range(40)]
+    known = {f"company{i}.com": float(i) for i in range(25)}
+    requests_seen = []
+
+    def fake_sync(actor_input, limit, output_file, api_token):
+        excluded = set(actor_input["company_not_domain"])
+        requests_seen.append(excluded)
+        leads = [lead for lead in pool if lead["company_domain"] not in excluded][:limit]
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(leads, f)
+        return {"status": "success", "file": output_file}
+
+    monkeypatch.setattr(scrape_leads_direct_api, "scrape_leads_sync", fake_sync)
+    output = tmp_path / "leads.json"
+    result = scrape_leads_direct_api.scrape_leads_delta({"fetch_count": 0}, 10, str(output), "token", known,
+                                                        max_exclusions=10)
+
+    assert result["status"] == "success"
+    assert max(len(excluded) for excluded in requests_seen) <= 10
+    # Every known domain was excluded by some request, not just the 10 most recent
+    assert set(known) <= set().union(*requests_seen[:3])
+    assert all(lead["company_domain"] not in known for lead in json.loads(output.read_text()))
+
+
+def test_cache_serves_short_scrapes_only_when_the_filters_were_exhausted(tmp_path):
+    from scrape_leads_direct_api import store_cached_scrape, load_cached_scrape
+
+    scraped = tmp_path / "scraped.json"
+    scraped.write_text(json.dumps([{"email": f"ceo@company{i}.com"} for i in range(5)]))
+    cache_dir = str(tmp_path / "cache")
+    actor_input = {"fetch_count": 10, "company_keywords": ["hvac"]}
+
+    store_cached_scrape(cache_dir, actor_input, str(scraped), 5)
+    assert load_cached_scrape(cache_dir, actor_input, 10, str(tmp_path / "out.json")) is None
+    assert load_cached_scrape(cache_dir, actor_input, 5, str(tmp_path / "out.json"))["count"] == 5
+
+    store_cached_scrape(cache_dir, actor_input, str(scraped), 5, exhausted=True)
+    assert load_cached_scrape(cache_dir, actor_input, 10, str(tmp_path / "out.json"))["count"] == 5
+
+
+def test_sharded_scrape_with_failed_shards_is_not_cached(tmp_path, monkeypatch):
+    import scrape_leads_direct_api
+
+    def partial_shards(actor_input, limit, output_file, api_token, **kwargs):
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump([{"email": "ceo@company1.com"}], f)
+        return {"status": "success", "count": 1, "file": output_file, "exhausted": False, "shard_errors": 2}
+
+    monkeypatch.setenv("APIFY_API_TOKEN", "test-token")
+    monkeypatch.setattr(scrape_leads_direct_api, "scrape_leads_sharded", partial_shards)
+    cache_dir = tmp_path / "cache"
+    result = scrape_leads_direct_api.scrape_leads_direct("HVAC", limit=10, output_file=str(tmp_path / "leads.json"),
+                                                         shard=True, cache_dir=str(cache_dir), plan_yield=False)
+
+    assert result["status"] == "success"
+    assert "cache" not in result
+    assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+
+def test_report_for_another_icp_does_not_plan_the_scrape(tmp_path, monkeypatch):
+    import scrape_leads_direct_api
+
+    monkeypatch.setenv("APIFY_API_TOKEN", "test-token")
+    monkeypatch.setattr(scrape_leads_direct_api, "scrape_leads_sync",
+                        lambda actor_input, limit, output_file, api_token: {"status": "error", "message": f"fetch {limit}"})
+    report = tmp_path / "validation_report.json"
+    report.write_text(json.dumps({"status": "success", "total_count": 25, "unscored_count": 0, "valid_count": 0,
+                                  "icp_criteria": {"industry": "Dentists"}}))
+
+    for icp_criteria in ({"industry": "HVAC"}, None):
+        result = scrape_leads_direct("HVAC companies", limit=25, output_file=str(tmp_path / "leads.json"),
+                                     validation_report=str(report), cache_dir=None, icp_criteria=icp_criteria)
+        assert result["message"] == "fetch 25"
+        assert "yield_plan" not in result
@@ -0,0 +1,12 @@
+from token_batcher import AdaptiveBatcher
+
+
+def test_prompt_tokens_not_reused_across_payloads_with_the_same_entry_id():
+    batcher = AdaptiveBatcher()
+
+    small = batcher.prompt_tokens(("C0", {"d": "x"}))
+    large = batcher.prompt_tokens(("C0", {"d": "x" * 20000}))
+
+    assert small < 20
+    assert large > 5000
+    assert batcher.prompt_tokens(("C0", {"d": "x"})) == small
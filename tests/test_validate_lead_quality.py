@@ -0,0 +1,59 @@
+import json
+import os
+from types import SimpleNamespace
+
+from validate_lead_quality import LeadValidator, build_company_payload, lead_fingerprint, save_batch_job
+
+
+def make_lead(name, domain):
+    return {"company_name": name, "company_domain": domain, "industry": "HVAC", "company_description": f"{name} HVAC"}
+
+
+class FakeBatches:
+    def __init__(self, items):
+        self.items = items
+
+    def retrieve(self, batch_id):
+        counts = SimpleNamespace(succeeded=len(self.items), errored=0, processing=0)
+        return SimpleNamespace(processing_status="ended", request_counts=counts)
+
+    def results(self, batch_id):
+        return iter(self.items)
+
+
+def batch_item(custom_id, scores):
+    text = json.dumps([{"id": entry_id, "percentage": percentage, "reason": "fit"} for entry_id, percentage in scores.items()])
+    message = SimpleNamespace(content=[SimpleNamespace(text=text)], usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message))
+
+
+def test_resumed_bulk_job_covering_more_companies_than_this_run(tmp_path):
+    job_file = str(tmp_path / "job.json")
+    validator = LeadValidator({"industry": "HVAC"}, cache_file=str(tmp_path / "cache.sqlite"), prefilter=False,
+                              bulk=True, batch_job_file=job_file, poll_interval=0, max_retries=0)
+
+    leads = [make_lead("Acme", "acme.co.uk"), make_lead("Bolt", "bolt.co.uk"), make_lead("Crest", "crest.co.uk")]
+    fingerprints = [lead_fingerprint(build_company_payload(lead)) for lead in leads]
+
+    # A crashed earlier run submitted all three companies; this run only asks about the first
+    save_batch_job(job_file, {
+        "batch_id": "batch-1",
+        "icp_hash": validator.icp_key,
+        "submitted_at": "2026-01-01T00:00:00",
+        "requests": {"prompt-0": {"C0": fingerprints[0], "C1": fingerprints[1], "C2": fingerprints[2]}}
+    })
+    validator.client = SimpleNamespace(messages=SimpleNamespace(batches=FakeBatches([
+        batch_item("prompt-0", {"C0": 90, "C1": 40, "C2": 70})
+    ])))
+
+    try:
+        results = validator.score(leads[:1])
+
+        assert results[0]["company_percentage"] == 90
+        assert not os.path.exists(job_file)
+        # The other companies' scores are kept for later runs
+        cached = validator.cache.get_many(validator.icp_key, fingerprints)
+        assert set(cached) == set(fingerprints)
+        assert cached[fingerprints[1]]["percentage"] == 40
+    finally:
+        validator.close()